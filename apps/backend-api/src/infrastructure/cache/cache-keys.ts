@@ -0,0 +1,13 @@
+// Response cache keys and TTLs. The ETL writes and invalidates the same keys
+// after each load (apps/data-processing/dags/application/cache_sync.py), so
+// change both sides together.
+//
+// top_power_plants:<params>  compact JSON of the non-null query params with
+//                            sorted keys (RedisService.generateCacheKey), e.g.
+//                            top_power_plants:{"limit":10,"state":"CA","year":2021}
+export const TOP_POWER_PLANTS_PREFIX = 'top_power_plants';
+export const AVAILABLE_STATES_KEY = 'available_states';
+export const AVAILABLE_YEARS_KEY = 'available_years';
+
+export const TOP_POWER_PLANTS_TTL_SECONDS = 300;
+export const DIMENSION_TTL_SECONDS = 600;
@@ -1,5 +1,5 @@
 import { IsOptional, IsInt, Min, Max, IsString, Length } from 'class-validator';
-import { Type, Expose } from 'class-transformer';
+import { Type, Expose, Transform } from 'class-transformer';
 import { ApiProperty, ApiPropertyOptional } from '@nestjs/swagger';
 
 export class GetTopPowerPlantsDto {
@@ -24,6 +24,8 @@ export class GetTopPowerPlantsDto {
   @IsOptional()
   @IsString()
   @Length(2, 2)
+  // Uppercased so ?state=tx shares the cache key the ETL warms for TX
+  @Transform(({ value }) => (typeof value === 'string' ? value.toUpperCase() : value))
   state?: string;
 
   @ApiPropertyOptional({
@@ -107,4 +109,19 @@ export class StatesResponseDto {
     timestamp: string;
     cached?: boolean;
   };
-} 
\ No newline at end of file
+}
+
+export class YearsResponseDto {
+  @ApiProperty()
+  success: boolean;
+
+  @ApiProperty({ type: [Number] })
+  data: number[];
+
+  @ApiProperty({ type: MetaDto })
+  meta: {
+    count: number;
+    timestamp: string;
+    cached?: boolean;
+  };
+}
@@ -9,8 +9,15 @@ import {
 import { ApiTags, ApiOperation, ApiResponse, ApiQuery } from '@nestjs/swagger';
 import { plainToClass } from 'class-transformer';
 import { PowerPlantsService } from './power-plants.service';
-import { GetTopPowerPlantsDto, PowerPlantResponseDto, StatesResponseDto, PowerPlantDto } from './dto/power-plant.dto';
+import { GetTopPowerPlantsDto, PowerPlantResponseDto, StatesResponseDto, YearsResponseDto, PowerPlantDto } from './dto/power-plant.dto';
 import { RedisService } from '../../infrastructure/cache/redis.service';
+import {
+  TOP_POWER_PLANTS_PREFIX,
+  AVAILABLE_STATES_KEY,
+  AVAILABLE_YEARS_KEY,
+  TOP_POWER_PLANTS_TTL_SECONDS,
+  DIMENSION_TTL_SECONDS,
+} from '../../infrastructure/cache/cache-keys';
 import { ConfigService } from '../../config/config.service';
 
 @ApiTags('power-plants')
@@ -35,7 +42,7 @@ export class PowerPlantsController {
     this.logger.log(`API Call - GET /power-plants/top with params: ${JSON.stringify(dto)}`);
     
     try {
-      const cacheKey = this.redisService.generateCacheKey('top_power_plants', dto);
+      const cacheKey = this.redisService.generateCacheKey(TOP_POWER_PLANTS_PREFIX, dto);
       
       const cachedResult = await this.redisService.get(cacheKey);
       if (cachedResult) {
@@ -65,7 +72,7 @@ export class PowerPlantsController {
       };
 
       if (powerPlantDtos.length > 0) {
-        await this.redisService.set(cacheKey, JSON.stringify(response), 300);
+        await this.redisService.set(cacheKey, JSON.stringify(response), TOP_POWER_PLANTS_TTL_SECONDS);
       }
       
       this.logger.log(`API Response - GET /power-plants/top: ${powerPlantDtos.length} power plants returned`);
@@ -94,7 +101,7 @@ export class PowerPlantsController {
     this.logger.log('API Call - GET /power-plants/states');
     
     try {
-      const cacheKey = 'available_states';
+      const cacheKey = AVAILABLE_STATES_KEY;
       
       const cachedResult = await this.redisService.get(cacheKey);
       if (cachedResult) {
@@ -117,7 +124,7 @@ export class PowerPlantsController {
       };
 
       if (states.length > 0) {
-        await this.redisService.set(cacheKey, JSON.stringify(response), 600);
+        await this.redisService.set(cacheKey, JSON.stringify(response), DIMENSION_TTL_SECONDS);
       }
       
       this.logger.log(`API Response - GET /power-plants/states: ${states.length} states returned`);
@@ -138,4 +145,56 @@ export class PowerPlantsController {
       );
     }
   }
+
+  @Get('years')
+  @ApiOperation({ summary: 'Get all available years' })
+  @ApiResponse({ status: 200, description: 'Years retrieved successfully', type: YearsResponseDto })
+  async getYears(): Promise<YearsResponseDto> {
+    this.logger.log('API Call - GET /power-plants/years');
+    
+    try {
+      const cacheKey = AVAILABLE_YEARS_KEY;
+      
+      const cachedResult = await this.redisService.get(cacheKey);
+      if (cachedResult) {
+        this.logger.log(`Cache hit for key: ${cacheKey}`);
+        const parsedResult = JSON.parse(cachedResult);
+        parsedResult.meta.cached = true;
+        return parsedResult;
+      }
+
+      const years = await this.powerPlantsService.getYears();
+      
+      const response: YearsResponseDto = {
+        success: true,
+        data: years,
+        meta: {
+          count: years.length,
+          timestamp: new Date().toISOString(),
+          cached: false,
+        }
+      };
+
+      if (years.length > 0) {
+        await this.redisService.set(cacheKey, JSON.stringify(response), DIMENSION_TTL_SECONDS);
+      }
+      
+      this.logger.log(`API Response - GET /power-plants/years: ${years.length} years returned`);
+      return response;
+
+    } catch (error) {
+      this.logger.error(`Error in getYears: ${error.message}`);
+      throw new HttpException(
+        {
+          success: false,
+          error: {
+            code: 'INTERNAL_ERROR',
+            message: 'Failed to retrieve years',
+            details: this.configService.isDevelopment ? error.message : undefined,
+          },
+        },
+        HttpStatus.INTERNAL_SERVER_ERROR,
+      );
+    }
+  }
 } 
\ No newline at end of file
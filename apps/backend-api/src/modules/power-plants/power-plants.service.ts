@@ -4,6 +4,10 @@ import { Repository } from 'typeorm';
 import { PowerPlant } from '../../domain/entities/power-plant.entity';
 import { GetTopPowerPlantsDto } from './dto/power-plant.dto';
 
+// Scope sentinels used by the egrid_top_plants rollup for "all states" / "all years"
+const ALL_STATES = '*';
+const ALL_YEARS = 0;
+
 @Injectable()
 export class PowerPlantsService {
   private readonly logger = new Logger(PowerPlantsService.name);
@@ -16,6 +20,12 @@ export class PowerPlantsService {
   async getTopPowerPlants(dto: GetTopPowerPlantsDto): Promise<PowerPlant[]> {
     this.logger.log(`Getting top ${dto.limit} power plants with filters: ${JSON.stringify(dto)}`);
     
+    const fromRollup = await this.getTopPowerPlantsFromRollup(dto);
+    if (fromRollup) {
+      this.logger.log(`Retrieved ${fromRollup.length} top power plants from rollup`);
+      return fromRollup;
+    }
+    
     const query = this.powerPlantRepository
       .createQueryBuilder('egrid_data')
       .select([
@@ -47,6 +57,19 @@ export class PowerPlantsService {
   async getStates(): Promise<string[]> {
     this.logger.log('Retrieving available states');
     
+    if (await this.getRollupTopK() !== null) {
+      const rows = await this.powerPlantRepository.manager
+        .createQueryBuilder()
+        .select('totals.state', 'state')
+        .from('egrid_state_totals', 'totals')
+        .orderBy('totals.state', 'ASC')
+        .getRawMany();
+      
+      const states = rows.map(row => row.state).filter(Boolean);
+      this.logger.log(`Retrieved ${states.length} states from rollup`);
+      return states;
+    }
+    
     const result = await this.powerPlantRepository
       .createQueryBuilder('egrid_data')
       .select('DISTINCT egrid_data.state', 'state')
@@ -61,6 +84,19 @@ export class PowerPlantsService {
   async getYears(): Promise<number[]> {
     this.logger.log('Retrieving available years');
     
+    if (await this.getRollupTopK() !== null) {
+      const rows = await this.powerPlantRepository.manager
+        .createQueryBuilder()
+        .select('totals.year', 'year')
+        .from('egrid_year_totals', 'totals')
+        .orderBy('totals.year', 'DESC')
+        .getRawMany();
+      
+      const years = rows.map(row => parseInt(row.year)).filter(Boolean);
+      this.logger.log(`Retrieved ${years.length} years from rollup`);
+      return years;
+    }
+    
     const result = await this.powerPlantRepository
       .createQueryBuilder('egrid_data')
       .select('DISTINCT egrid_data.year', 'year')
@@ -71,4 +107,55 @@ export class PowerPlantsService {
     this.logger.log(`Retrieved ${years.length} years`);
     return years;
   }
-} 
\ No newline at end of file
+
+  // Reads the precomputed top-K list for the requested (state, year) scope.
+  // Returns null when rollups are not built yet or the limit exceeds top-K,
+  // so the caller falls back to querying egrid_data.
+  private async getTopPowerPlantsFromRollup(dto: GetTopPowerPlantsDto): Promise<PowerPlant[] | null> {
+    const limit = dto.limit || 12;
+    const topK = await this.getRollupTopK();
+    if (topK === null || limit > topK) {
+      return null;
+    }
+
+    const rows = await this.powerPlantRepository.manager
+      .createQueryBuilder()
+      .select('top.egrid_id', 'id')
+      .addSelect('top.gen_id', 'gen_id')
+      .addSelect('top.year', 'year')
+      .addSelect('top.state', 'state')
+      .addSelect('top.plant_name', 'plant_name')
+      .addSelect('top.net_generation', 'net_generation')
+      .from('egrid_top_plants', 'top')
+      .where('top.scope_state = :state', { state: dto.state ? dto.state.toUpperCase() : ALL_STATES })
+      .andWhere('top.scope_year = :year', { year: dto.year || ALL_YEARS })
+      .orderBy('top.rank', 'ASC')
+      .limit(limit)
+      .getRawMany();
+
+    return rows.map(row => this.powerPlantRepository.create({
+      id: row.id,
+      genId: row.gen_id,
+      year: row.year,
+      state: row.state,
+      plantName: row.plant_name,
+      netGeneration: row.net_generation,
+    }));
+  }
+
+  // Top-K the rollups were built with, or null if they are not available
+  private async getRollupTopK(): Promise<number | null> {
+    try {
+      const status = await this.powerPlantRepository.manager
+        .createQueryBuilder()
+        .select('status.top_k', 'top_k')
+        .from('egrid_rollup_status', 'status')
+        .where('status.id = 1')
+        .getRawOne();
+      return status ? Number(status.top_k) : null;
+    } catch (error) {
+      this.logger.warn(`Rollups unavailable, querying egrid_data: ${error.message}`);
+      return null;
+    }
+  }
+}
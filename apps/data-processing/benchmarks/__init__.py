@@ -0,0 +1,3 @@
+"""
+Benchmarks: per-stage micro-benchmarks for the CSV ETL pipeline
+"""
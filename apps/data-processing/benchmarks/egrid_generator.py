@@ -0,0 +1,149 @@
+"""
+Benchmarks: Synthetic eGRID CSV Generator
+Writes deterministic, realistic eGRID generator files of any size
+"""
+import argparse
+import csv
+import random
+from dataclasses import dataclass
+from typing import List, TextIO, Tuple
+
+HEADER = [
+    'Generator file sequence number',
+    'Data Year',
+    'Plant state abbreviation',
+    'Plant name',
+    'Generator ID',
+    'Generator annual net generation (MWh)',
+]
+DESCRIPTION_ROW = ['SEQGEN23', 'YEAR', 'PSTATEABB', 'PNAME', 'GENID', 'GENNTAN']
+
+STATES = [
+    'AK', 'AL', 'AR', 'AZ', 'CA', 'CO', 'CT', 'DC', 'DE', 'FL', 'GA', 'HI', 'IA', 'ID',
+    'IL', 'IN', 'KS', 'KY', 'LA', 'MA', 'MD', 'ME', 'MI', 'MN', 'MO', 'MS', 'MT', 'NC',
+    'ND', 'NE', 'NH', 'NJ', 'NM', 'NV', 'NY', 'OH', 'OK', 'OR', 'PA', 'PR', 'RI', 'SC',
+    'SD', 'TN', 'TX', 'UT', 'VA', 'VT', 'WA', 'WI', 'WV', 'WY',
+]
+NAME_PREFIXES = [
+    'Allison Creek', 'Annex Creek', 'Aurora', 'Blue Ridge', 'Cedar Bluff', 'Desert Sky',
+    'Eagle Point', 'Fox Hollow', 'Granite Falls', 'Harbor View', 'Iron Mountain',
+    'Juniper', 'Kettle River', 'Lone Pine', 'Mesa Verde', 'North Fork', 'Oak Grove',
+    'Prairie Wind', 'Quarry Lake', 'Red Rock', 'Silver Lake', 'Twin Oaks', 'Union Valley',
+]
+NAME_SUFFIXES = [
+    'Hydro', 'Solar', 'Wind Farm', 'Energy Center', 'Generating Station', 'Power Plant',
+    'Cogen', 'Fuel Cell', 'Energy LLC', 'Solar, LLC', 'Power, Inc.',
+]
+GENERATOR_IDS = ['1', '2', '3', 'GEN1', 'GEN2', 'UNIT4', 'CT1', 'ST1', '1A', 'PV1', 'WT1', 'S2.3']
+
+# Kinds of rows the transform stage must reject, cycled through deterministically
+BAD_ROW_KINDS = ['empty_generator_id', 'invalid_year', 'invalid_state', 'empty_plant_name']
+
+
+@dataclass
+class GeneratorOptions:
+    """Shape of the generated file"""
+    rows: int = 10_000
+    year: int = 2023
+    seed: int = 42
+    bad_row_rate: float = 0.01
+    duplicate_rate: float = 0.02
+    negative_rate: float = 0.03
+    empty_generation_rate: float = 0.005
+
+
+class EGridCSVGenerator:
+    """Streams synthetic eGRID rows; the same options always produce the same bytes"""
+
+    RECENT_KEYS = 4096  # Duplicates are drawn from a window of recently written keys
+
+    def __init__(self, options: GeneratorOptions):
+        self.options = options
+        self.random = random.Random(options.seed)
+        self._recent: List[Tuple[str, str, str]] = []
+        self._bad_rows = 0
+
+    def write(self, output: TextIO) -> None:
+        """Write the header, the description row and all data rows"""
+        writer = csv.writer(output, lineterminator='\n')
+        writer.writerow(HEADER)
+        writer.writerow(DESCRIPTION_ROW)
+        for sequence in range(1, self.options.rows + 1):
+            writer.writerow(self._row(sequence))
+
+    def _row(self, sequence: int) -> List[str]:
+        rng = self.random
+        roll = rng.random()
+
+        if roll < self.options.duplicate_rate and self._recent:
+            state, plant_name, generator_id = rng.choice(self._recent)
+        else:
+            state = rng.choice(STATES)
+            plant_name = f"{rng.choice(NAME_PREFIXES)} {rng.choice(NAME_SUFFIXES)} {rng.randint(1, 999)}"
+            generator_id = rng.choice(GENERATOR_IDS)
+            self._remember((state, plant_name, generator_id))
+
+        year = str(self.options.year)
+        net_generation = self._net_generation()
+
+        if rng.random() < self.options.bad_row_rate:
+            kind = BAD_ROW_KINDS[self._bad_rows % len(BAD_ROW_KINDS)]
+            self._bad_rows += 1
+            if kind == 'empty_generator_id':
+                generator_id = ''
+            elif kind == 'invalid_year':
+                year = rng.choice(['1850', '0', 'n/a'])
+            elif kind == 'invalid_state':
+                state = rng.choice(['ALA', 'X', ''])
+            else:
+                plant_name = ''
+
+        return [str(sequence), year, state, plant_name, generator_id, net_generation]
+
+    def _net_generation(self) -> str:
+        """Annual MWh in eGRID's display format: thousands separators, ' (n)' negatives"""
+        rng = self.random
+        if rng.random() < self.options.empty_generation_rate:
+            return ''
+
+        value = int(rng.lognormvariate(9, 2.5))
+        if rng.random() < self.options.negative_rate:
+            return f" ({min(value, 99_999):,})"
+        return f"{value:,}"
+
+    def _remember(self, key: Tuple[str, str, str]) -> None:
+        if len(self._recent) < self.RECENT_KEYS:
+            self._recent.append(key)
+        else:
+            self._recent[self.random.randrange(self.RECENT_KEYS)] = key
+
+
+def generate_file(path: str, options: GeneratorOptions) -> str:
+    """Generate a synthetic eGRID file at path and return the path"""
+    with open(path, 'w', newline='', encoding='utf-8') as output:
+        EGridCSVGenerator(options).write(output)
+    return path
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Generate a synthetic eGRID generator CSV')
+    parser.add_argument('path', help='Output CSV path')
+    parser.add_argument('--rows', type=int, default=GeneratorOptions.rows)
+    parser.add_argument('--year', type=int, default=GeneratorOptions.year)
+    parser.add_argument('--seed', type=int, default=GeneratorOptions.seed)
+    parser.add_argument('--bad-row-rate', type=float, default=GeneratorOptions.bad_row_rate)
+    parser.add_argument('--duplicate-rate', type=float, default=GeneratorOptions.duplicate_rate)
+    args = parser.parse_args()
+
+    generate_file(args.path, GeneratorOptions(
+        rows=args.rows,
+        year=args.year,
+        seed=args.seed,
+        bad_row_rate=args.bad_row_rate,
+        duplicate_rate=args.duplicate_rate
+    ))
+    print(f"📝 Wrote {args.rows} rows to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
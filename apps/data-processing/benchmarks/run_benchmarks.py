@@ -0,0 +1,313 @@
+"""
+Benchmarks: Per-Stage ETL Micro-Benchmarks
+Times parse, transform, validate and load on a synthetic eGRID file and
+compares throughput against a stored baseline
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+# Benchmarks import the DAG packages exactly as Airflow does
+DAGS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'dags')
+if DAGS_DIR not in sys.path:
+    sys.path.insert(0, DAGS_DIR)
+
+import pandas as pd  # noqa: E402
+
+from benchmarks.egrid_generator import GeneratorOptions, generate_file  # noqa: E402
+from domain.models.e_grid_data import FileInfo, ProcessingConstants  # noqa: E402
+from infrastructure.etl_config import get_pipeline_spec  # noqa: E402
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STAGES = ['parse', 'clean_numeric', 'transform', 'transform_row', 'dedup', 'validate']
+LOAD_STAGES = ['load_copy', 'load_insert']
+BENCHMARK_TABLE = 'egrid_data_benchmark'
+
+
+class LocalFileStore:
+    """Serves object reads from a local file so validation runs without MinIO"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def read_header_line(self, file_info: FileInfo, initial_size: int = 1024, max_size: int = 1024 * 1024) -> str:
+        with open(self.path, 'rb') as f:
+            return f.readline(max_size).decode('utf-8-sig').rstrip('\r\n')
+
+
+class BenchmarkRunner:
+    """Runs each stage in isolation over the same pre-generated input"""
+
+    def __init__(self, csv_path: str, repeat: int = 3, row_transform_limit: int = 100_000, validate_files: int = 1000):
+        self.csv_path = csv_path
+        self.repeat = repeat
+        self.row_transform_limit = row_transform_limit
+        self.validate_files = validate_files
+        self._chunks: Optional[List[pd.DataFrame]] = None
+        self._accepted: Optional[List[pd.DataFrame]] = None
+
+    def run(self, stages: List[str]) -> Dict[str, Dict[str, float]]:
+        results = {}
+        for stage in stages:
+            benchmark = getattr(self, f"bench_{stage}", None)
+            if benchmark is None:
+                raise ValueError(f"Unknown benchmark stage: {stage}")
+            results[stage] = benchmark()
+            logger.info(f"⏱️ {stage}: {results[stage]}")
+        return results
+
+    def _time(self, work: Callable[[], int], setup: Optional[Callable[[], None]] = None) -> Dict[str, float]:
+        """Best of `repeat` runs; work returns the number of rows it handled"""
+        best = None
+        rows = 0
+        for _ in range(self.repeat):
+            if setup is not None:
+                setup()
+            started = time.perf_counter()
+            rows = work()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return {
+            'seconds': round(best, 6),
+            'rows': rows,
+            'rows_per_second': round(rows / best, 1) if best else 0.0,
+        }
+
+    def _read_chunks(self):
+        # Same reader options as CSVProcessorOrchestrator._stream_chunks for whole files
+        spec = get_pipeline_spec()
+        return pd.read_csv(self.csv_path, chunksize=spec.chunk_size, **spec.read_options())
+
+    def chunks(self) -> List[pd.DataFrame]:
+        if self._chunks is None:
+            self._chunks = list(self._read_chunks())
+        return self._chunks
+
+    def accepted_frames(self) -> List[pd.DataFrame]:
+        if self._accepted is None:
+            from application.csv_processor import DataTransformationService
+            transformer = DataTransformationService()
+            self._accepted = [transformer.transform_chunk(chunk).accepted for chunk in self.chunks()]
+        return self._accepted
+
+    # Stages
+
+    def bench_parse(self) -> Dict[str, float]:
+        return self._time(lambda: sum(len(chunk) for chunk in self._read_chunks()))
+
+    def bench_clean_numeric(self) -> Dict[str, float]:
+        from application.csv_processor import DataTransformationService
+        values = [
+            value
+            for chunk in self.chunks()
+            for value in chunk['Generator annual net generation (MWh)'].tolist()
+        ][:self.row_transform_limit]
+
+        def work() -> int:
+            for value in values:
+                DataTransformationService.clean_numeric_value(value)
+            return len(values)
+
+        return self._time(work)
+
+    def bench_transform(self) -> Dict[str, float]:
+        from application.csv_processor import DataTransformationService
+        transformer = DataTransformationService()
+        chunks = self.chunks()
+
+        def work() -> int:
+            for chunk in chunks:
+                transformer.transform_chunk(chunk)
+            return sum(len(chunk) for chunk in chunks)
+
+        return self._time(work)
+
+    def bench_transform_row(self) -> Dict[str, float]:
+        """Legacy iterrows path, limited to row_transform_limit rows to keep runs short"""
+        from application.csv_processor import DataTransformationService
+        transformer = DataTransformationService()
+        chunks = []
+        remaining = self.row_transform_limit
+        for chunk in self.chunks():
+            if remaining <= 0:
+                break
+            chunks.append(chunk.head(remaining))
+            remaining -= len(chunks[-1])
+
+        def work() -> int:
+            for chunk in chunks:
+                transformer.process_csv_chunk(chunk)
+            return sum(len(chunk) for chunk in chunks)
+
+        return self._time(work)
+
+    def bench_dedup(self) -> Dict[str, float]:
+        """Run-wide duplicate detection over the transformed chunks (keep_last, in memory)"""
+        from application.deduplication import ChunkDeduplicator
+        frames = self.accepted_frames()
+
+        def work() -> int:
+            deduplicator = ChunkDeduplicator()
+            try:
+                for frame in frames:
+                    deduplicator.commit(deduplicator.apply(frame))
+            finally:
+                deduplicator.reset()
+            return sum(len(frame) for frame in frames)
+
+        return self._time(work)
+
+    def bench_validate(self) -> Dict[str, float]:
+        """Header validation of validate_files copies of the file (rows = files)"""
+        from application.csv_processor import FileValidationService
+        size = os.path.getsize(self.csv_path)
+        files = [
+            FileInfo(key=f"bench/egrid_{i}.csv", size=size, last_modified=datetime.utcnow(), bucket='bench', etag=str(i))
+            for i in range(self.validate_files)
+        ]
+        validator = FileValidationService(LocalFileStore(self.csv_path))
+        return self._time(lambda: len(validator.validate_files(files)[0]))
+
+    def bench_load_copy(self) -> Dict[str, float]:
+        return self._bench_load('copy')
+
+    def bench_load_insert(self) -> Dict[str, float]:
+        return self._bench_load('insert')
+
+    def _bench_load(self, load_mode: str) -> Dict[str, float]:
+        """Load all transformed rows into a scratch copy of egrid_data"""
+        from sqlalchemy import text
+        from infrastructure.db_client import DatabaseClient, DatabaseConfig
+
+        config = DatabaseConfig()
+        config.load_mode = load_mode
+        db_client = DatabaseClient(config)
+        frames = self.accepted_frames()
+        if load_mode == 'insert':
+            # Key-unique input, as the dedup stage delivers it in the pipeline
+            merged = pd.concat(frames).drop_duplicates(list(ProcessingConstants.UNIQUE_KEY), keep='last')
+            frames = [
+                merged.iloc[i:i + ProcessingConstants.CHUNK_SIZE]
+                for i in range(0, len(merged), ProcessingConstants.CHUNK_SIZE)
+            ]
+
+        def execute(sql: str) -> None:
+            with db_client.engine.begin() as connection:
+                connection.execute(text(sql))
+
+        execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+        execute(f"CREATE TABLE {BENCHMARK_TABLE} (LIKE egrid_data INCLUDING ALL)")
+        try:
+            return self._time(
+                lambda: sum(db_client.load_dataframe(frame, BENCHMARK_TABLE).total_loaded() for frame in frames),
+                setup=lambda: execute(f"TRUNCATE {BENCHMARK_TABLE}")
+            )
+        finally:
+            execute(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}")
+            db_client.engine.dispose()
+
+
+def compare_to_baseline(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    tolerance: float
+) -> List[str]:
+    """Return one message per stage whose throughput fell below baseline by more than tolerance"""
+    regressions = []
+    for stage, current in results.items():
+        reference = baseline.get('stages', {}).get(stage)
+        if not reference or not reference.get('rows_per_second'):
+            continue
+        floor = reference['rows_per_second'] * (1 - tolerance)
+        if current['rows_per_second'] < floor:
+            change = current['rows_per_second'] / reference['rows_per_second'] - 1
+            regressions.append(
+                f"{stage}: {current['rows_per_second']:,.0f} rows/s vs baseline "
+                f"{reference['rows_per_second']:,.0f} rows/s ({change:+.1%})"
+            )
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Per-stage ETL micro-benchmarks')
+    parser.add_argument('--rows', type=int, default=100_000, help='Synthetic rows to generate (10k-10M)')
+    parser.add_argument('--seed', type=int, default=GeneratorOptions.seed)
+    parser.add_argument('--input', help='Benchmark an existing eGRID CSV instead of generating one')
+    parser.add_argument('--stages', default=','.join(DEFAULT_STAGES),
+                        help=f"Comma separated stages; load stages ({','.join(LOAD_STAGES)}) need POSTGRES_* env")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per stage; the fastest is reported')
+    parser.add_argument('--row-transform-limit', type=int, default=100_000)
+    parser.add_argument('--validate-files', type=int, default=1000)
+    parser.add_argument('--output', default='benchmark_results.json', help='Where to write results JSON')
+    parser.add_argument('--baseline', help='Baseline results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.15, help='Allowed throughput drop vs baseline')
+    parser.add_argument('--save-baseline', help='Also write these results as the new baseline')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    # Per-chunk warnings from the services would dominate the output
+    logging.getLogger('application').setLevel(logging.ERROR)
+    logging.getLogger('infrastructure').setLevel(logging.ERROR)
+
+    stages = [stage.strip() for stage in args.stages.split(',') if stage.strip()]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        csv_path = args.input
+        if csv_path is None:
+            csv_path = os.path.join(workdir, 'egrid_synthetic.csv')
+            started = time.perf_counter()
+            generate_file(csv_path, GeneratorOptions(rows=args.rows, seed=args.seed))
+            logger.info(f"📝 Generated {args.rows} rows in {time.perf_counter() - started:.1f}s")
+
+        runner = BenchmarkRunner(csv_path, args.repeat, args.row_transform_limit, args.validate_files)
+        results = {
+            'meta': {
+                'input': args.input or 'synthetic',
+                'rows': args.rows if args.input is None else None,
+                'seed': args.seed,
+                'input_bytes': os.path.getsize(csv_path),
+                'repeat': args.repeat,
+                'python': platform.python_version(),
+                'pandas': pd.__version__,
+                'platform': platform.platform(),
+                'timestamp': datetime.utcnow().isoformat(),
+            },
+            'stages': runner.run(stages),
+        }
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    logger.info(f"💾 Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"📌 Baseline saved to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('rows') != results['meta']['rows']:
+            logger.warning("⚠️ Baseline was recorded with a different row count; throughput may not be comparable")
+
+        regressions = compare_to_baseline(results['stages'], baseline, args.tolerance)
+        if regressions:
+            logger.error(f"❌ PERFORMANCE REGRESSION (tolerance {args.tolerance:.0%}):")
+            for message in regressions:
+                logger.error(f"❌   {message}")
+            return 1
+        logger.info(f"✅ No stage regressed more than {args.tolerance:.0%} against {args.baseline}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,221 @@
+"""
+Application Layer: API Cache Sync
+Invalidates and re-warms the backend API's Redis response cache for the
+(state, year) partitions an ETL run changed
+
+Key scheme, shared with apps/backend-api/src/infrastructure/cache/cache-keys.ts:
+    top_power_plants:<params>   GET /power-plants/top, TTL 300s
+                                <params> is compact JSON of the non-null query
+                                parameters with sorted keys, e.g.
+                                top_power_plants:{"limit":10,"state":"CA","year":2021}
+    available_states            GET /power-plants/states, TTL 600s
+    available_years             GET /power-plants/years, TTL 600s
+"""
+import json
+import os
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from infrastructure.redis_client import RedisCacheClient
+from infrastructure.rollup_repository import ALL_STATES, ALL_YEARS, RollupRepository
+
+logger = logging.getLogger(__name__)
+
+TOP_PLANTS_PREFIX = 'top_power_plants'
+STATES_KEY = 'available_states'
+YEARS_KEY = 'available_years'
+TOP_PLANTS_TTL_SECONDS = 300
+DIMENSION_TTL_SECONDS = 600
+
+
+def top_plants_key(limit: Optional[int] = None, state: Optional[str] = None, year: Optional[int] = None) -> str:
+    """Cache key of GET /power-plants/top, identical to RedisService.generateCacheKey"""
+    params = {'limit': limit, 'state': state, 'year': year}
+    present = {name: value for name, value in sorted(params.items()) if value is not None}
+    return f"{TOP_PLANTS_PREFIX}:{json.dumps(present, separators=(',', ':'))}"
+
+
+def parse_top_plants_key(key: str) -> Optional[Dict[str, Any]]:
+    """Query parameters of a top plants key, or None if it is not one"""
+    prefix, _, params = key.partition(':')
+    if prefix != TOP_PLANTS_PREFIX:
+        return None
+    try:
+        parsed = json.loads(params)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+class CacheSyncConfig:
+    """Configuration for the post-load cache sync using environment variables"""
+    def __init__(self):
+        self.enabled = os.environ.get('ETL_CACHE_SYNC_ENABLED', 'true').lower() == 'true'
+        # 10 is the frontend's page size, 12 the API's default limit
+        self.warm_limits = sorted({
+            int(limit) for limit in os.environ.get('ETL_CACHE_WARM_LIMITS', '10,12').split(',') if limit.strip()
+        })
+
+
+class CacheSyncService:
+    """Application service keeping the API response cache in step with a load
+
+    Only top plants responses whose filters overlap a changed partition are
+    deleted; the unfiltered, per-state, per-year and per-partition responses
+    for the warm limits are then rebuilt from the rollups, so the first API
+    request after a run is a cache hit.
+    """
+
+    def __init__(
+        self,
+        cache: RedisCacheClient,
+        rollups: RollupRepository,
+        config: Optional[CacheSyncConfig] = None
+    ):
+        self.cache = cache
+        self.rollups = rollups
+        self.config = config or CacheSyncConfig()
+
+    def sync(self, partitions: Iterable[Tuple[str, int]]) -> Dict[str, int]:
+        """Invalidate and warm for the changed (state, year) partitions
+
+        Cache problems are logged and never fail the pipeline; stale entries
+        then expire with their TTL.
+        """
+        changed = {(str(state).upper(), int(year)) for state, year in partitions}
+        result = {'partitions': len(changed), 'invalidated': 0, 'warmed': 0}
+        if not self.config.enabled or not changed:
+            return result
+
+        try:
+            result['invalidated'] = self.invalidate(changed)
+            result['warmed'] = self.warm(changed)
+        except Exception as e:
+            logger.warning(f"⚠️ API cache sync incomplete, stale entries will expire by TTL: {e}")
+            result['error'] = 1
+
+        logger.info(
+            f"🔄 API cache sync: {result['invalidated']} keys invalidated, "
+            f"{result['warmed']} warmed for {len(changed)} partitions"
+        )
+        return result
+
+    def invalidate(self, changed: Set[Tuple[str, int]]) -> int:
+        """Delete the dimension lists and every top plants key overlapping a changed partition"""
+        stale = [STATES_KEY, YEARS_KEY]
+        stale.extend(
+            key for key in self.cache.iter_keys(f"{TOP_PLANTS_PREFIX}:*")
+            if self._is_stale(key, changed)
+        )
+        return self.cache.delete_keys(stale)
+
+    def warm(self, changed: Set[Tuple[str, int]]) -> int:
+        """Pre-populate the most requested responses from the rollups; returns keys written"""
+        top_k = self.rollups.get_top_k()
+        if top_k is None:
+            logger.info("🔄 Rollups not built yet, skipping cache warm-up")
+            return 0
+
+        timestamp = datetime.utcnow().isoformat(timespec='milliseconds') + 'Z'
+        warmed = 0
+
+        # Larger limits are served from egrid_data by the API and stay lazily cached
+        limits = [limit for limit in self.config.warm_limits if 0 < limit <= top_k]
+        if limits:
+            scopes = self._warm_scopes(changed)
+            plants = self.rollups.get_top_plants(scopes, max(limits))
+            values = {}
+            for (scope_state, scope_year), rows in plants.items():
+                state = None if scope_state == ALL_STATES else scope_state
+                year = None if scope_year == ALL_YEARS else scope_year
+                for limit in limits:
+                    # The API does not cache empty results either
+                    if rows:
+                        values[top_plants_key(limit, state, year)] = self._top_plants_response(
+                            rows[:limit], limit, state, year, timestamp
+                        )
+            self.cache.set_many(values, TOP_PLANTS_TTL_SECONDS)
+            warmed += len(values)
+
+        dimensions = {}
+        states = self.rollups.get_states()
+        if states:
+            dimensions[STATES_KEY] = self._list_response(states, timestamp)
+        years = self.rollups.get_years()
+        if years:
+            dimensions[YEARS_KEY] = self._list_response(years, timestamp)
+        self.cache.set_many(dimensions, DIMENSION_TTL_SECONDS)
+        warmed += len(dimensions)
+
+        return warmed
+
+    @staticmethod
+    def _is_stale(key: str, changed: Set[Tuple[str, int]]) -> bool:
+        params = parse_top_plants_key(key)
+        if params is None:
+            # Unknown layout under our prefix: drop it rather than risk serving stale data
+            return True
+
+        state = params.get('state')
+        year = params.get('year')
+        state = str(state).upper() if state is not None else None
+        if state is not None and year is not None:
+            return (state, year) in changed
+        if state is not None:
+            return any(state == changed_state for changed_state, _ in changed)
+        if year is not None:
+            return any(year == changed_year for _, changed_year in changed)
+        return True
+
+    @staticmethod
+    def _warm_scopes(changed: Set[Tuple[str, int]]) -> List[Tuple[str, int]]:
+        scopes = {(ALL_STATES, ALL_YEARS)}
+        for state, year in changed:
+            scopes.update({(state, ALL_YEARS), (ALL_STATES, year), (state, year)})
+        return sorted(scopes)
+
+    @staticmethod
+    def _top_plants_response(
+        rows: List[Dict[str, Any]],
+        limit: int,
+        state: Optional[str],
+        year: Optional[int],
+        timestamp: str
+    ) -> str:
+        """Serialize exactly as PowerPlantsController.getTopPowerPlants does"""
+        filters = {name: value for name, value in (('limit', limit), ('state', state), ('year', year)) if value is not None}
+        return json.dumps({
+            'success': True,
+            'data': [
+                {
+                    'id': row['id'],
+                    'genId': row['gen_id'],
+                    'year': row['year'],
+                    'state': row['state'],
+                    'plantName': row['plant_name'],
+                    # NUMERIC columns reach the API as strings
+                    'netGeneration': f"{row['net_generation']:.2f}",
+                }
+                for row in rows
+            ],
+            'meta': {
+                'count': len(rows),
+                'filters': filters,
+                'timestamp': timestamp,
+                'cached': False,
+            },
+        }, separators=(',', ':'))
+
+    @staticmethod
+    def _list_response(values: List[Any], timestamp: str) -> str:
+        """Serialize exactly as PowerPlantsController.getStates/getYears do"""
+        return json.dumps({
+            'success': True,
+            'data': values,
+            'meta': {
+                'count': len(values),
+                'timestamp': timestamp,
+                'cached': False,
+            },
+        }, separators=(',', ':'))
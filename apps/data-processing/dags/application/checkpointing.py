@@ -0,0 +1,127 @@
+"""
+Application Layer: Chunk Checkpointing
+Advances a file's (or shard's) checkpoint with every loaded chunk, so a
+retried task resumes after the last committed chunk instead of byte 0
+"""
+from dataclasses import replace
+from typing import Optional
+import logging
+
+import numpy as np
+import pandas as pd
+
+from domain.models.e_grid_data import ChunkCheckpoint, FileInfo, FileShard, LoadResult
+from infrastructure.checkpoint_repository import ChunkCheckpointRepository
+from infrastructure.db_client import BeforeCommit
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointTracker:
+    """Application service tracking how far one file (or shard) has been loaded
+
+    before_commit() returns the statement load_dataframe runs in the
+    chunk's own transaction. The new checkpoint becomes current through
+    loaded() only after that transaction has committed. Without a
+    repository the tracker keeps no state and every load starts at row 0.
+    """
+
+    def __init__(
+        self,
+        repository: Optional[ChunkCheckpointRepository],
+        file_info: FileInfo,
+        shard: Optional[FileShard] = None
+    ):
+        self.repository = repository
+        shard_index = shard.shard_index if shard else 0
+        stored = repository.get(file_info, shard_index) if repository is not None else None
+        if stored is not None and stored.is_resumable():
+            self.checkpoint = stored
+        else:
+            self.checkpoint = ChunkCheckpoint.start(file_info, shard_index)
+        self._pending: Optional[ChunkCheckpoint] = None
+
+    @property
+    def resumed(self) -> bool:
+        return self.checkpoint.rows_done > 0
+
+    def initial_load_result(self) -> LoadResult:
+        """Counts already committed by earlier attempts"""
+        return replace(self.checkpoint.loaded, failures=[])
+
+    def before_commit(
+        self,
+        rows: int,
+        records_df: pd.DataFrame,
+        rows_rejected: int,
+        byte_offset: Optional[int] = None
+    ) -> Optional[BeforeCommit]:
+        """Checkpoint statement for a chunk of `rows` parsed rows, loaded as records_df"""
+        if self.repository is None:
+            return None
+
+        def statement(chunk_result: LoadResult):
+            failed = [position for position, _ in chunk_result.failures]
+            self._pending = self._advance(
+                rows, records_df.drop(records_df.index[failed]) if failed else records_df,
+                chunk_result, rows_rejected + chunk_result.failed, byte_offset
+            )
+            return self.repository.upsert_statement(self._pending)
+        return statement
+
+    def loaded(self) -> None:
+        """The chunk passed to before_commit() has committed"""
+        if self._pending is not None:
+            self.checkpoint, self._pending = self._pending, None
+
+    def skipped(self, rows: int, rows_rejected: int, byte_offset: Optional[int] = None) -> None:
+        """Record a chunk that had nothing to load (every row rejected)"""
+        if self.repository is None:
+            return
+        checkpoint = self._advance(rows, None, LoadResult(), rows_rejected, byte_offset)
+        self.repository.save(checkpoint)
+        self.checkpoint = checkpoint
+
+    def complete(self) -> None:
+        """Mark the file (or shard) done, so a later reload of the same ETag starts over"""
+        if self.repository is None:
+            return
+        self.checkpoint = replace(self.checkpoint, completed=True)
+        self.repository.save(self.checkpoint)
+        logger.info(
+            f"🔖 {self.checkpoint.object_key} [{self.checkpoint.shard_index}]: "
+            f"{self.checkpoint.rows_done} rows in {self.checkpoint.chunks_done} chunks, digest {self.checkpoint.digest}"
+        )
+
+    def _advance(
+        self,
+        rows: int,
+        loaded_df: Optional[pd.DataFrame],
+        chunk_result: LoadResult,
+        rows_rejected: int,
+        byte_offset: Optional[int]
+    ) -> ChunkCheckpoint:
+        current = self.checkpoint
+        loaded = replace(current.loaded, failures=[])
+        loaded.add(chunk_result)
+        return replace(
+            current,
+            rows_done=current.rows_done + rows,
+            byte_offset=byte_offset,
+            chunks_done=current.chunks_done + 1,
+            digest=self.add_to_digest(current.digest, loaded_df) if loaded_df is not None else current.digest,
+            loaded=loaded,
+            rows_rejected=current.rows_rejected + rows_rejected
+        )
+
+    @staticmethod
+    def add_to_digest(previous: str, df: pd.DataFrame) -> str:
+        """Running sum (mod 2**64) of 64-bit row hashes, as hex
+
+        A sum does not depend on where chunks were cut, so a resumed load
+        ends with the same digest as an uninterrupted one.
+        """
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+        total = int(previous, 16) if previous else 0
+        total = (total + int(row_hashes.sum(dtype=np.uint64))) % (1 << 64)
+        return f"{total:016x}"
@@ -0,0 +1,170 @@
+"""
+Application Layer: Adaptive Chunk Sizing
+Chooses how many rows are read, transformed and loaded per chunk from a
+memory budget, the measured bytes per row and the observed load latency
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def frame_bytes_per_row(df: pd.DataFrame, sample_rows: int = 256) -> float:
+    """In-memory bytes per row, measured on a sample (deep sizing is O(rows) for strings)"""
+    if df.empty:
+        return 0.0
+    sample = df.iloc[:sample_rows]
+    return float(sample.memory_usage(deep=True, index=False).sum()) / len(sample)
+
+
+class AdaptiveChunkSizer:
+    """Application service adjusting rows per chunk while a batch runs
+
+    Multiplicative increase / decrease, one decision per chunk of about
+    the requested size:
+      - shrink to the memory cap when a chunk's working set (bytes per row
+        x WORKING_SET_FACTOR x chunks in flight) would exceed the budget
+      - halve when a load takes longer than max_load_seconds, or when the
+        per-row load time rises SLOWDOWN_RATIO above the reference (the
+        previous size's, or this size's when holding)
+      - double while the per-row load time stays within FLAT_RATIO of it
+    and hold otherwise. When growing made loads slower per row, the
+    previous size becomes a ceiling for the rest of the batch. Other
+    chunks (end of a file, blocks requested before a resize) do not
+    count, since their latency says nothing about the current size.
+    """
+
+    # A chunk is held as the parsed frame, the transformed frame and the COPY buffer at once
+    WORKING_SET_FACTOR = 4
+    FLAT_RATIO = 1.15
+    SLOWDOWN_RATIO = 1.5
+    SMOOTHING = 0.3  # Weight of the newest bytes-per-row measurement
+    CAP_HEADROOM = 0.9
+
+    def __init__(
+        self,
+        initial_rows: int,
+        min_rows: int = 250,
+        max_rows: int = 100_000,
+        memory_budget_bytes: int = 256 * 1024 * 1024,
+        max_load_seconds: float = 5.0,
+        chunks_in_flight: int = 1,
+        enabled: bool = True
+    ):
+        self.min_rows = min_rows
+        self.max_rows = max(max_rows, min_rows)
+        self.memory_budget_bytes = memory_budget_bytes
+        self.max_load_seconds = max_load_seconds
+        self.chunks_in_flight = max(1, chunks_in_flight)
+        self.enabled = enabled
+        self.initial_rows = self._clamp(initial_rows)
+        self.rows = self.initial_rows
+        self.bytes_per_row = 0.0
+        self.ceiling = self.max_rows
+        # (rows, seconds per row) the next chunk is compared with
+        self._reference: Optional[Tuple[int, float]] = None
+        self.rows_requested: List[int] = []
+        self.grown = 0
+        self.shrunk = 0
+
+    def seed(self, rows: int) -> None:
+        """Start from a size learned by an earlier run instead of initial_rows"""
+        if self.enabled and rows:
+            self.rows = self._clamp(rows)
+            logger.info(f"📐 Chunk size seeded at {self.rows} rows")
+
+    def memory_cap(self) -> int:
+        """Most rows per chunk the memory budget allows at the measured row size"""
+        if not self.bytes_per_row:
+            return self.max_rows
+        working_set_per_row = self.bytes_per_row * self.WORKING_SET_FACTOR * self.chunks_in_flight
+        return int(self.memory_budget_bytes / working_set_per_row)
+
+    def observe(self, rows: int, bytes_per_row: float, load_seconds: Optional[float]) -> None:
+        """Record one chunk (rows parsed, their in-memory size, load time) and pick the next size
+
+        load_seconds is None when nothing from the chunk was loaded.
+        """
+        requested = self.rows
+        self.rows_requested.append(requested)
+        if bytes_per_row:
+            self.bytes_per_row = (
+                bytes_per_row if not self.bytes_per_row
+                else self.SMOOTHING * bytes_per_row + (1 - self.SMOOTHING) * self.bytes_per_row
+            )
+        if not self.enabled:
+            return
+
+        cap = self.memory_cap()
+        if requested > cap:
+            self._resize(int(cap * self.CAP_HEADROOM), f"working set above the {self.memory_budget_bytes >> 20}MB budget")
+            return
+        if load_seconds is None or abs(rows - requested) > requested // 4:
+            return
+
+        seconds_per_row = load_seconds / rows
+        reference = self._reference
+        if load_seconds > self.max_load_seconds:
+            self.ceiling = max(self.min_rows, requested // 2)
+            self._reference = None
+            self._resize(requested // 2, f"load took {load_seconds:.2f}s")
+        elif reference is not None and seconds_per_row > reference[1] * self.SLOWDOWN_RATIO:
+            reference_rows = reference[0]
+            if reference_rows < requested:
+                self.ceiling = reference_rows
+            self._reference = None
+            self._resize(min(reference_rows, requested // 2), "per-row load time rising")
+        elif reference is None or seconds_per_row <= reference[1] * self.FLAT_RATIO:
+            self._reference = (requested, seconds_per_row)
+            # Headroom below the cap, so drift in the measured row size does not flip the size back
+            grown = min(requested * 2, int(cap * self.CAP_HEADROOM), self.ceiling)
+            self._resize(max(requested, grown), "load latency flat")
+        else:
+            self._reference = (requested, seconds_per_row)
+
+    def summary(self) -> Dict[str, Any]:
+        """Sizes chosen so far, for the run report"""
+        return {
+            'initial_rows': self.initial_rows,
+            'final_rows': self.rows,
+            'min_rows': min(self.rows_requested, default=self.rows),
+            'max_rows': max(self.rows_requested, default=self.rows),
+            'chunks': len(self.rows_requested),
+            'bytes_per_row': round(self.bytes_per_row, 1),
+            'grown': self.grown,
+            'shrunk': self.shrunk,
+        }
+
+    @staticmethod
+    def combine(summaries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Merge the summaries of several batches (mapped tasks) into one"""
+        summaries = [s for s in summaries if s and s.get('chunks')]
+        if not summaries:
+            return {}
+        finals = sorted(s['final_rows'] for s in summaries)
+        return {
+            'initial_rows': summaries[0]['initial_rows'],
+            'final_rows': finals[len(finals) // 2],  # Median over batches
+            'min_rows': min(s['min_rows'] for s in summaries),
+            'max_rows': max(s['max_rows'] for s in summaries),
+            'chunks': sum(s['chunks'] for s in summaries),
+            'bytes_per_row': round(sum(s['bytes_per_row'] for s in summaries) / len(summaries), 1),
+            'grown': sum(s['grown'] for s in summaries),
+            'shrunk': sum(s['shrunk'] for s in summaries),
+        }
+
+    def _resize(self, rows: int, reason: str) -> None:
+        rows = self._clamp(rows)
+        if rows == self.rows:
+            return
+        if rows > self.rows:
+            self.grown += 1
+        else:
+            self.shrunk += 1
+        logger.info(f"📐 Chunk size {self.rows} -> {rows} rows ({reason})")
+        self.rows = rows
+
+    def _clamp(self, rows: int) -> int:
+        return max(self.min_rows, min(self.max_rows, int(rows)))
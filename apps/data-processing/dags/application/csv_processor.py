@@ -2,54 +2,137 @@
 Application Layer: CSV Processing Use Cases
 Contains business workflows and processing logic
 """
+import csv
 import os
+import time
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Iterator, List, Dict, Any, Set, Tuple, Optional
 import logging
 
 from domain.models.e_grid_data import (
     EGridDataRecord, 
     FileInfo, 
+    FileShard,
+    LoadResult,
     ProcessingBatch, 
     ProcessingReport,
-    ProcessingConstants
+    ProcessingConstants,
+    RejectReason,
+    DuplicatePolicy,
+    DeltaStats
 )
+from domain.models.pipeline_spec import PipelineSpec
 from infrastructure.minio_client import MinIOClient
 from infrastructure.rabbitmq_client import RabbitMQClient
 from infrastructure.db_client import DatabaseClient
+from infrastructure.manifest_repository import FileManifestRepository
+from infrastructure.header_cache import HeaderCacheRepository
+from infrastructure.metrics import PipelineMetrics
+from infrastructure.parquet_snapshot import ParquetSnapshotStore
+from infrastructure.rollup_repository import RollupRepository
+from infrastructure.key_store import SpillingKeyStore
+from infrastructure.run_key_store import RunKeyStore
+from infrastructure.dead_letter import DeadLetterStore
+from infrastructure.checkpoint_repository import ChunkCheckpointRepository
+from infrastructure.row_hash_store import RowHashStore
+from infrastructure.partition_manager import YearPartitionManager
+from infrastructure.load_policy import BulkLoadPolicy
+from infrastructure.etl_config import get_pipeline_spec
+from application.shard_planner import CSVShardPlanner
+from application.pipeline import PipelinedChunkLoader
+from application.deduplication import ChunkDeduplicator
+from application.chunk_sizing import AdaptiveChunkSizer, frame_bytes_per_row
+from application.checkpointing import CheckpointTracker
+from application.delta import RowDeltaPlanner
 
 logger = logging.getLogger(__name__)
 
 
+class ProcessingConfig:
+    """Configuration for processing modes using environment variables"""
+    def __init__(self):
+        # 'vectorized' (columnar) or 'row' (legacy iterrows + EGridDataRecord)
+        self.transform_mode = os.environ.get('ETL_TRANSFORM_MODE', 'vectorized')
+        # Skip objects already loaded with the same ETag/size/last_modified
+        self.skip_unchanged = os.environ.get('ETL_SKIP_UNCHANGED', 'true').lower() == 'true'
+        # Files larger than this are split into record-aligned byte-range shards
+        self.shard_size_bytes = int(os.environ.get('ETL_SHARD_SIZE_BYTES', str(256 * 1024 * 1024)))
+        # 'sequential' (read -> transform -> load per chunk) or 'pipelined' (concurrent stages)
+        self.execution_mode = os.environ.get('ETL_EXECUTION_MODE', 'sequential')
+        # Size of the first block; later blocks are sized to the adaptive chunk row count
+        self.pipeline_block_bytes = int(os.environ.get('ETL_PIPELINE_BLOCK_BYTES', str(1024 * 1024)))
+        self.pipeline_queue_depth = int(os.environ.get('ETL_PIPELINE_QUEUE_DEPTH', '4'))
+        self.pipeline_parse_workers = int(os.environ.get('ETL_PIPELINE_PARSE_WORKERS', '1'))
+        # Also write cleaned rows to the curated year/state Parquet snapshot in MinIO
+        self.snapshot_enabled = os.environ.get('ETL_SNAPSHOT_ENABLED', 'false').lower() == 'true'
+        # Rows sharing the unique key: 'keep_first', 'keep_last' or 'sum'
+        self.dedup_policy = os.environ.get('ETL_DEDUP_POLICY', DuplicatePolicy.KEEP_LAST)
+        # 'run' applies the policy across all batches of a DAG run (keys kept in Postgres), 'batch' within each batch
+        self.dedup_scope = os.environ.get('ETL_DEDUP_SCOPE', 'run')
+        # Key hashes held in memory (about 32 bytes each) before the key set spills to disk
+        self.dedup_memory_keys = int(os.environ.get('ETL_DEDUP_MEMORY_KEYS', '2000000'))
+        self.dedup_spill_dir = os.environ.get('ETL_DEDUP_SPILL_DIR', '') or None
+        # Rows per chunk start at the spec's chunk_size and adapt within these bounds
+        self.adaptive_chunks = os.environ.get('ETL_ADAPTIVE_CHUNKS', 'true').lower() == 'true'
+        self.chunk_min_rows = int(os.environ.get('ETL_CHUNK_MIN_ROWS', '250'))
+        self.chunk_max_rows = int(os.environ.get('ETL_CHUNK_MAX_ROWS', '100000'))
+        # Memory the chunks being processed may use, and the slowest acceptable chunk load
+        self.chunk_memory_budget_bytes = int(os.environ.get('ETL_CHUNK_MEMORY_BUDGET_MB', '256')) * 1024 * 1024
+        self.chunk_max_load_seconds = float(os.environ.get('ETL_CHUNK_MAX_LOAD_SECONDS', '5'))
+        # Commit a checkpoint with every chunk and resume retried files after the last one
+        self.resume_from_checkpoint = os.environ.get('ETL_RESUME_FROM_CHECKPOINT', 'true').lower() == 'true'
+        # Send only rows that changed since the object's previous version (whole files, snapshot off)
+        self.delta_enabled = os.environ.get('ETL_DELTA_ENABLED', 'false').lower() == 'true'
+
+
+@dataclass
+class ChunkTransformResult:
+    """Result of a vectorized chunk transformation"""
+    accepted: pd.DataFrame
+    rejected: pd.DataFrame
+    warnings: Dict[str, int] = field(default_factory=dict)
+
+
 class FileValidationService:
     """Application service for file validation"""
     
-    def __init__(self, minio_client: MinIOClient):
+    def __init__(
+        self,
+        minio_client: MinIOClient,
+        header_cache: Optional[HeaderCacheRepository] = None,
+        max_workers: int = ProcessingConstants.VALIDATION_WORKERS,
+        required_columns: Optional[List[str]] = None
+    ):
         self.minio_client = minio_client
+        self.header_cache = header_cache
+        self.max_workers = max_workers
+        # Source columns mapped by the pipeline spec
+        self.required_columns = required_columns or get_pipeline_spec().source_columns
     
-    def validate_csv_structure(self, file_info: FileInfo) -> bool:
+    def read_header(self, file_info: FileInfo) -> List[str]:
+        """Read and parse the actual header row of a file"""
+        header_line = self.minio_client.read_header_line(
+            file_info,
+            ProcessingConstants.VALIDATION_SAMPLE_SIZE
+        )
+        return next(csv.reader([header_line]), [])
+    
+    def validate_csv_structure(self, file_info: FileInfo, columns: Optional[List[str]] = None) -> bool:
         """Validate CSV file structure contains required columns"""
         try:
             if not file_info.is_valid_size() or not file_info.is_csv_file():
                 return False
             
-            # Get sample content
-            sample = self.minio_client.get_file_sample(
-                file_info, 
-                ProcessingConstants.VALIDATION_SAMPLE_SIZE
-            )
+            if columns is None:
+                columns = self.read_header(file_info)
             
             # Check for required columns
-            required_columns = [
-                'Plant name',
-                'Generator annual net generation (MWh)',
-                'Generator ID',
-                'Data Year',
-                'Plant state abbreviation'
-            ]
-            
-            for column in required_columns:
-                if column not in sample:
+            for column in self.required_columns:
+                if column not in columns:
                     logger.warning(f"⚠️ Missing column '{column}' in {file_info.key}")
                     return False
             
@@ -61,22 +144,56 @@ class FileValidationService:
             return False
     
     def validate_files(self, files: List[FileInfo]) -> Tuple[List[FileInfo], List[FileInfo]]:
-        """Validate multiple files and return valid/invalid lists"""
+        """Validate multiple files concurrently and return valid/invalid lists
+        
+        Headers already cached for a file's ETag are validated without any
+        MinIO request; the rest are fetched on a thread pool and cached.
+        """
+        cached = self.header_cache.get_many(f.etag for f in files) if self.header_cache else {}
+        to_fetch = [f for f in files if f.etag not in cached and f.is_valid_size() and f.is_csv_file()]
+        
+        fetched: Dict[str, List[str]] = {}
+        if to_fetch:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {executor.submit(self.read_header, f): f for f in to_fetch}
+                for future in as_completed(futures):
+                    file_info = futures[future]
+                    try:
+                        fetched[file_info.key] = future.result()
+                    except Exception as e:
+                        logger.error(f"❌ Error reading header of {file_info.key}: {e}")
+        
+        if self.header_cache:
+            self.header_cache.put_many({
+                f.etag: fetched[f.key] for f in to_fetch if f.key in fetched
+            })
+        
         valid_files = []
         invalid_files = []
         
         for file_info in files:
-            if self.validate_csv_structure(file_info):
+            columns = cached.get(file_info.etag) if file_info.etag in cached else fetched.get(file_info.key)
+            if columns is not None and self.validate_csv_structure(file_info, columns):
                 valid_files.append(file_info)
             else:
                 invalid_files.append(file_info)
         
-        logger.info(f"✅ Validation complete: {len(valid_files)} valid, {len(invalid_files)} invalid")
+        logger.info(
+            f"✅ Validation complete: {len(valid_files)} valid, {len(invalid_files)} invalid "
+            f"({len(files) - len(to_fetch)} from header cache, {len(to_fetch)} fetched)"
+        )
         return valid_files, invalid_files
 
 
 class DataTransformationService:
-    """Application service for data transformation and cleaning"""
+    """Application service for data transformation and cleaning
+    
+    Source columns are looked up through the pipeline spec's mapping, so
+    the rules apply to any input whose headers map onto the output columns.
+    """
+    
+    def __init__(self, spec: Optional[PipelineSpec] = None):
+        self.spec = spec or get_pipeline_spec()
     
     @staticmethod
     def clean_numeric_value(value: Any) -> float:
@@ -111,18 +228,21 @@ class DataTransformationService:
         """Process a chunk of CSV data and return domain objects"""
         processed_records = []
         
+        source = self.spec.source_column
+        
         for _, row in chunk_df.iterrows():
             try:
                 # Extract and clean data
-                net_gen_raw = str(row.get('Generator annual net generation (MWh)', '0')).strip()
+                net_gen_raw = str(row.get(source('net_generation'), '0')).strip()
                 net_gen_cleaned = net_gen_raw.replace('"', '').replace(',', '')
                 
-                # Create domain object (validation happens in __post_init__)
+                # Create domain object (validation happens in __post_init__);
+                # a missing year fails int() and is rejected, as in transform_chunk
                 record = EGridDataRecord(
-                    generator_id=str(row.get('Generator ID', 'UNKNOWN')).strip(),
-                    year=int(row.get('Data Year', 2023)),
-                    state=str(row.get('Plant state abbreviation', '')).strip(),
-                    plant_name=str(row.get('Plant name', '')).strip(),
+                    generator_id=str(row.get(source('gen_id'), 'UNKNOWN')).strip(),
+                    year=int(row.get(source('year'), '')),
+                    state=str(row.get(source('state'), '')).strip(),
+                    plant_name=str(row.get(source('plant_name'), '')).strip(),
                     net_generation=self.clean_numeric_value(net_gen_cleaned)
                 )
                 
@@ -133,25 +253,187 @@ class DataTransformationService:
                 continue
         
         return processed_records
+    
+    def transform_chunk(self, chunk_df: pd.DataFrame) -> ChunkTransformResult:
+        """Vectorized equivalent of process_csv_chunk operating on whole columns
+        
+        Applies the EGridDataRecord.validate and clean_numeric_value rules
+        column-wise and returns accepted rows (output column names), rejected
+        rows with a reason code, and summary warning counters.
+        """
+        def text_column(output_column: str) -> pd.Series:
+            name = self.spec.source_column(output_column)
+            if name not in chunk_df.columns:
+                return pd.Series('', index=chunk_df.index, dtype=object)
+            return chunk_df[name].astype('string').str.strip().fillna('').astype(object)
+        
+        generator_id = text_column('gen_id')
+        state, state_invalid = self._state_column(chunk_df, text_column)
+        plant_name = text_column('plant_name')
+        
+        # Year: same range as EGridDataRecord.validate, evaluated once per chunk
+        year = np.trunc(pd.to_numeric(text_column('year'), errors='coerce'))
+        max_year = datetime.now().year + 1
+        year_valid = year.between(ProcessingConstants.MIN_VALID_YEAR, max_year)
+        
+        # Net generation: keep digits and decimal point only (strips quotes,
+        # commas, signs and parentheses), empty -> 0.0, cap extremely large values
+        net_gen_text = text_column('net_generation')
+        net_gen_cleaned = net_gen_text.str.replace(r'[^0-9.]', '', regex=True)
+        net_gen_present = net_gen_cleaned != ''
+        net_generation = pd.to_numeric(net_gen_cleaned.where(net_gen_present), errors='coerce')
+        unparseable = net_generation.isna() & net_gen_present
+        net_generation = net_generation.fillna(0.0)
+        capped = net_generation > ProcessingConstants.MAX_NET_GENERATION
+        net_generation = net_generation.clip(upper=ProcessingConstants.MAX_NET_GENERATION)
+        
+        # First failing rule wins, in the same order as EGridDataRecord.validate
+        reasons = pd.Series(
+            np.select(
+                [
+                    generator_id == '',
+                    ~year_valid,
+                    state_invalid,
+                    plant_name == '',
+                ],
+                [
+                    RejectReason.EMPTY_GENERATOR_ID,
+                    RejectReason.INVALID_YEAR,
+                    RejectReason.INVALID_STATE,
+                    RejectReason.EMPTY_PLANT_NAME,
+                ],
+                default=''
+            ),
+            index=chunk_df.index
+        )
+        accepted_mask = reasons == ''
+        
+        accepted = pd.DataFrame({
+            'gen_id': generator_id[accepted_mask],
+            'year': year[accepted_mask].astype('int64'),
+            'state': state[accepted_mask],
+            'plant_name': plant_name[accepted_mask],
+            'net_generation': net_generation[accepted_mask].astype('float64'),
+        })
+        rejected = chunk_df[~accepted_mask].assign(reject_reason=reasons[~accepted_mask])
+        
+        warnings = {
+            'net_generation_capped': int(capped.sum()),
+            'net_generation_unparseable': int(unparseable.sum()),
+        }
+        warnings.update(rejected['reject_reason'].value_counts().to_dict())
+        
+        if any(warnings.values()):
+            logger.warning(f"⚠️ Chunk transform warnings: {warnings}")
+        
+        return ChunkTransformResult(accepted=accepted, rejected=rejected, warnings=warnings)
+    
+    def transform(self, chunk_df: pd.DataFrame, mode: str = 'vectorized') -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """Transform a CSV chunk into output columns with process_csv_chunk ('row') or transform_chunk
+        
+        Returns the accepted rows and rejected row counts by reason code.
+        """
+        if mode == 'row':
+            records = self.process_csv_chunk(chunk_df)
+            
+            # Convert domain objects to output columns
+            accepted = pd.DataFrame(
+                [
+                    {
+                        'gen_id': r.generator_id,
+                        'year': r.year,
+                        'state': r.state,
+                        'plant_name': r.plant_name,
+                        'net_generation': r.net_generation
+                    }
+                    for r in records
+                ],
+                columns=['gen_id', 'year', 'state', 'plant_name', 'net_generation']
+            )
+            return accepted, {RejectReason.UNCLASSIFIED: len(chunk_df) - len(accepted)}
+        
+        result = self.transform_chunk(chunk_df)
+        return result.accepted, result.rejected['reject_reason'].value_counts().to_dict()
+    
+    def _state_column(
+        self,
+        chunk_df: pd.DataFrame,
+        text_column: Callable[[str], pd.Series]
+    ) -> Tuple[pd.Series, np.ndarray]:
+        """Upper-cased state per row and whether it fails the 2-character rule
+        
+        A state column read as category is cleaned and checked once per
+        distinct value, then expanded through the category codes.
+        """
+        source = chunk_df.get(self.spec.source_column('state'))
+        if source is None or not isinstance(source.dtype, pd.CategoricalDtype):
+            state = text_column('state')
+            return state.str.upper(), (state.str.len() != 2).to_numpy()
+        
+        categories = source.cat.categories.astype(str).str.strip()
+        # Missing values have code -1, which picks the appended '' / invalid entry
+        upper = np.append(categories.str.upper().to_numpy(dtype=object), '')
+        invalid = np.append(categories.str.len().to_numpy() != 2, True)
+        codes = source.cat.codes.to_numpy()
+        return pd.Series(upper[codes], index=chunk_df.index, dtype=object), invalid[codes]
 
 
 class BatchProcessingService:
     """Application service for batch processing operations"""
     
+    def __init__(self, shard_planner: Optional[CSVShardPlanner] = None, shard_size_bytes: int = 0):
+        self.shard_planner = shard_planner
+        self.shard_size_bytes = shard_size_bytes
+    
     def create_processing_batches(self, files: List[FileInfo]) -> List[ProcessingBatch]:
-        """Create processing batches from validated files"""
+        """Create processing batches from validated files
+        
+        Small files get one batch each; files above shard_size_bytes are
+        split into record-aligned shards with one batch per shard.
+        """
         batches = []
         
-        for i, file_info in enumerate(files):
+        for file_info in files:
+            if self._should_shard(file_info):
+                for shard in self.shard_planner.plan_shards(file_info, self.shard_size_bytes):
+                    batches.append(ProcessingBatch(
+                        batch_id=f"batch_{len(batches)}",
+                        files=[file_info],
+                        estimated_records=shard.estimated_records,
+                        shards=[shard]
+                    ))
+                continue
+            
             batch = ProcessingBatch(
-                batch_id=f"batch_{i}",
+                batch_id=f"batch_{len(batches)}",
                 files=[file_info],
-                estimated_records=file_info.size // 100  # Rough estimate
+                estimated_records=self._estimate_records(file_info)
             )
             batches.append(batch)
         
         logger.info(f"📊 Created {len(batches)} processing batches")
         return batches
+    
+    def _should_shard(self, file_info: FileInfo) -> bool:
+        """Business rule: only files well above the shard size are worth splitting
+        
+        Compressed objects are streamed whole, since their byte ranges do not decode on their own.
+        """
+        return (
+            self.shard_planner is not None
+            and self.shard_size_bytes > 0
+            and file_info.size > self.shard_size_bytes
+            and file_info.compression() is None
+        )
+    
+    def _estimate_records(self, file_info: FileInfo) -> int:
+        """Estimate records from sampled line lengths, falling back to a rough guess"""
+        if self.shard_planner is not None:
+            try:
+                return self.shard_planner.estimate_records(file_info)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not sample {file_info.key} for record estimate: {e}")
+        return file_info.size // 100  # Rough estimate
 
 
 class CSVProcessorOrchestrator:
@@ -161,20 +443,128 @@ class CSVProcessorOrchestrator:
         self, 
         minio_client: MinIOClient,
         rabbitmq_client: RabbitMQClient,
-        db_client: DatabaseClient
+        db_client: DatabaseClient,
+        config: Optional[ProcessingConfig] = None,
+        spec: Optional[PipelineSpec] = None
     ):
         self.minio_client = minio_client
         self.rabbitmq_client = rabbitmq_client
         self.db_client = db_client
+        self.config = config or ProcessingConfig()
+        # Columns, dtypes, skipped rows, chunk size and target table from etl_config.json
+        self.spec = spec or get_pipeline_spec()
         
         # Initialize services
-        self.file_validator = FileValidationService(minio_client)
-        self.data_transformer = DataTransformationService()
-        self.batch_processor = BatchProcessingService()
+        self.file_validator = FileValidationService(
+            minio_client, HeaderCacheRepository(db_client), required_columns=self.spec.source_columns
+        )
+        self.data_transformer = DataTransformationService(self.spec)
+        self.batch_processor = BatchProcessingService(
+            CSVShardPlanner(minio_client, header_rows=self.spec.header_rows),
+            self.config.shard_size_bytes
+        )
+        self.manifest = FileManifestRepository(db_client)
+        self.metrics = PipelineMetrics()
+        self.snapshot_store = ParquetSnapshotStore(minio_client)
+        self.rollups = RollupRepository(db_client)
+        # Year partitions of the target table, for full reloads swapped in one year at a time
+        self.partitions = YearPartitionManager(db_client, self.spec.table_name, self.spec.unique_key)
+        # Index deferral and ANALYZE around a run's load into the target table
+        self.load_policy = BulkLoadPolicy(db_client, self.spec.table_name)
+        self.dead_letter_store = DeadLetterStore(minio_client)
+        # The snapshot only publishes whole files, so a resumed file would leave it incomplete
+        self.checkpoints = (
+            ChunkCheckpointRepository(db_client)
+            if self.config.resume_from_checkpoint and not self.config.snapshot_enabled else None
+        )
+        # Rows rejected by database constraints and written to dead-letter objects
+        self.rows_dead_lettered = 0
+        # Unchanged rows are left out of the snapshot's chunks, so delta loads need it off
+        self.row_hashes = (
+            RowHashStore(minio_client)
+            if self.config.delta_enabled and not self.config.snapshot_enabled else None
+        )
+        # Insert, update and delete sets of delta loads in this processor
+        self.delta_stats = DeltaStats()
+        # (state, year) partitions written by this processor, for the rollup refresh
+        self.affected_partitions: Set[Tuple[str, int]] = set()
+        # Unique keys seen across every file and chunk of the current batch (or run, see share_duplicate_keys)
+        self.deduplicator = ChunkDeduplicator(
+            self.config.dedup_policy,
+            SpillingKeyStore(self.config.dedup_memory_keys, self.config.dedup_spill_dir),
+            key_columns=self.spec.unique_key
+        )
+        # Rows per chunk, learned while the batch runs (queued blocks count against the memory budget)
+        self.chunk_sizer = AdaptiveChunkSizer(
+            self.spec.chunk_size,
+            min_rows=self.config.chunk_min_rows,
+            max_rows=self.config.chunk_max_rows,
+            memory_budget_bytes=self.config.chunk_memory_budget_bytes,
+            max_load_seconds=self.config.chunk_max_load_seconds,
+            chunks_in_flight=self.config.pipeline_queue_depth + 1 if self.config.execution_mode == 'pipelined' else 1,
+            enabled=self.config.adaptive_chunks
+        )
+        self.pipelined_loader = PipelinedChunkLoader(
+            minio_client,
+            db_client,
+            self.metrics,
+            self.deduplicator,
+            self.spec,
+            self.chunk_sizer,
+            block_bytes=self.config.pipeline_block_bytes,
+            queue_depth=self.config.pipeline_queue_depth,
+            parse_workers=self.config.pipeline_parse_workers,
+            transform_mode=self.config.transform_mode
+        )
+    
+    def close(self) -> None:
+        """Release the RabbitMQ publisher; call at the end of a task that sent notifications"""
+        self.rabbitmq_client.close()
+    
+    def share_duplicate_keys(self, run_id: str) -> None:
+        """Resolve duplicate keys against every batch of the DAG run, not just this processor's
+        
+        keep_last is left on the local store: ON CONFLICT already keeps the
+        last row across batches, so only the correction count is per batch.
+        """
+        if self.config.dedup_scope == 'run' and self.config.dedup_policy != DuplicatePolicy.KEEP_LAST:
+            self.deduplicator.key_store = RunKeyStore(self.db_client, run_id)
+    
+    def clear_duplicate_keys(self, run_id: str) -> int:
+        """Drop the run-wide keys once every batch of the run has finished"""
+        if self.config.dedup_scope != 'run' or self.config.dedup_policy == DuplicatePolicy.KEEP_LAST:
+            return 0
+        key_store = RunKeyStore(self.db_client, run_id)
+        try:
+            return key_store.clear()
+        finally:
+            key_store.close()
     
     def scan_files(self) -> List[FileInfo]:
-        """Scan for CSV files to process"""
-        return self.minio_client.list_csv_files()
+        """Scan for CSV files to process, skipping objects already loaded unchanged"""
+        if not self.config.skip_unchanged:
+            return self.minio_client.list_csv_files()
+        
+        # Listing is consumed lazily, so manifest filtering overlaps with paging
+        scanned = 0
+        
+        def count_scanned(files):
+            nonlocal scanned
+            for file_info in files:
+                scanned += 1
+                yield file_info
+        
+        if self.minio_client.config.scan_prefixes:
+            listing = self.minio_client.iter_csv_files_partitioned(self.minio_client.config.scan_prefixes)
+        else:
+            listing = self.minio_client.iter_csv_files()
+        
+        changed_files = self.manifest.filter_changed(count_scanned(listing))
+        logger.info(
+            f"🗂️ Manifest check: {len(changed_files)} new or changed, "
+            f"{scanned - len(changed_files)} unchanged"
+        )
+        return changed_files
     
     def validate_files(self, files: List[FileInfo]) -> Tuple[List[FileInfo], List[FileInfo]]:
         """Validate files for processing"""
@@ -182,95 +572,410 @@ class CSVProcessorOrchestrator:
     
     def create_batches(self, files: List[FileInfo]) -> List[ProcessingBatch]:
         """Create processing batches"""
-        return self.batch_processor.create_processing_batches(files)
+        batches = self.batch_processor.create_processing_batches(files)
+        
+        # Sharded files are tracked as a whole; each shard reports into the same manifest row
+        for batch in batches:
+            for shard in batch.shards:
+                if shard.shard_index == 0:
+                    self.manifest.mark_sharded(shard.file, shard.shard_count)
+        
+        return batches
     
     def process_file_batch(self, batch: ProcessingBatch) -> int:
-        """Process a batch of files and return total records processed"""
+        """Process a batch of files (or file shards) and return total records processed"""
         total_records = 0
         
-        for file_info in batch.files:
-            records_in_file = self._process_single_file(file_info)
-            total_records += records_in_file
-            
+        try:
+            if batch.shards:
+                for shard in batch.shards:
+                    total_records += self._process_shard(shard)
+            else:
+                for file_info in batch.files:
+                    records_in_file = self._process_single_file(file_info)
+                    total_records += records_in_file
+        finally:
+            self.deduplicator.reset()
+            # Deliver notifications buffered while processing the batch, including a failed one's
+            self.rabbitmq_client.flush()
+        
+        self.metrics.push({'batch': batch.batch_id})
         return total_records
     
     def _process_single_file(self, file_info: FileInfo) -> int:
         """Process a single file"""
         logger.info(f"📥 Processing file: {file_info.key}")
-        
-        # Download file temporarily
-        local_path = f"/tmp/{file_info.key.replace('/', '_')}"
+        started = time.monotonic()
+        self.metrics.start_file()
         
         try:
-            self.minio_client.download_file(file_info, local_path)
+            # Read before mark_started overwrites it: the version the stored row hashes must match
+            previous_entry = self.manifest.get_entry(file_info) if self.row_hashes is not None else None
+            self.manifest.mark_started(file_info)
             
-            total_records = 0
+            load_result, rows_rejected = self._load_chunks(file_info, previous_entry=previous_entry)
             
-            # Read CSV with proper row handling:
-            # Use row 1 (header) for validation, skip row 2 (description), process data from row 3+
-            logger.info("🔍 Validating CSV structure using header row...")
-            validation_df = pd.read_csv(local_path, nrows=0)  # Read only header row for validation
+            total_records = load_result.total_loaded()
+            logger.info(
+                f"📊 Completed file {file_info.key}: {total_records} records "
+                f"({load_result.inserted} inserted, {load_result.updated} updated, "
+                f"{load_result.skipped} skipped)"
+            )
+            self.manifest.mark_loaded(
+                file_info, load_result, rows_rejected, self._elapsed_ms(started)
+            )
+            self.metrics.finish_file('loaded', time.monotonic() - started)
+            return total_records
             
-            # Validate required columns exist
-            required_columns = [
-                'Plant name',
-                'Generator annual net generation (MWh)',
-                'Generator ID',
-                'Data Year',
-                'Plant state abbreviation'
-            ]
+        except Exception as e:
+            self._handle_processing_error(file_info, e, started)
+            return 0
+    
+    def _process_shard(self, shard: FileShard) -> int:
+        """Process one record-aligned byte range of a large file"""
+        file_info = shard.file
+        logger.info(
+            f"📥 Processing shard {shard.shard_index + 1}/{shard.shard_count} of {file_info.key} "
+            f"(bytes {shard.start}-{shard.end})"
+        )
+        started = time.monotonic()
+        self.metrics.start_file()
+        
+        try:
+            load_result, rows_rejected = self._load_chunks(file_info, shard)
+            
+            total_records = load_result.total_loaded()
+            logger.info(
+                f"📊 Completed shard {shard.shard_index + 1}/{shard.shard_count} of "
+                f"{file_info.key}: {total_records} records"
+            )
+            self.manifest.mark_shard_loaded(
+                file_info, shard.shard_index, load_result, rows_rejected, self._elapsed_ms(started)
+            )
+            self.metrics.finish_file('loaded', time.monotonic() - started)
+            return total_records
             
-            missing_columns = [col for col in required_columns if col not in validation_df.columns]
-            if missing_columns:
-                logger.error(f"❌ Missing required columns in {file_info.key}: {missing_columns}")
-                return 0
+        except Exception as e:
+            self._handle_processing_error(file_info, e, started, shard)
+            return 0
+    
+    def _load_chunks(
+        self,
+        file_info: FileInfo,
+        shard: Optional[FileShard] = None,
+        previous_entry: Optional[Dict[str, Any]] = None
+    ) -> Tuple[LoadResult, int]:
+        """Stream a file (or shard), transform and load it chunk by chunk
+        
+        Returns the accumulated load result and the number of rejected rows.
+        With the snapshot enabled, cleaned chunks are also written as Parquet
+        and published only once the whole file (or shard) has loaded. Rows
+        the database rejected go to a dead-letter object, even if the file
+        fails later, since the rest of their chunk is already committed.
+        A file that an earlier attempt left unfinished resumes after its
+        last committed chunk. A whole file loaded from the start goes through
+        the delta planner, which leaves out rows unchanged since
+        previous_entry's version and deletes rows the file no longer has.
+        """
+        # Shared with other loads; a year reload waits for it (see YearPartitionManager.load_lock)
+        with self.partitions.load_lock():
+            tracker = CheckpointTracker(self.checkpoints, file_info, shard)
+            if tracker.resumed:
+                logger.info(
+                    f"⏩ Resuming {file_info.key} after {tracker.checkpoint.rows_done} rows "
+                    f"({tracker.checkpoint.chunks_done} chunks already committed)"
+                )
+            delta = RowDeltaPlanner(
+                self.row_hashes if shard is None and not tracker.resumed else None,
+                file_info,
+                previous_entry,
+                self.spec.unique_key,
+                self.deduplicator.hash_keys,
+                self.db_client,
+                self.spec.table_name
+            )
+            snapshot = self.snapshot_store.open_writer(file_info, shard) if self.config.snapshot_enabled else None
+            dead_letter = self.dead_letter_store.open_writer(file_info, shard, tracker.checkpoint.rows_done)
             
-            logger.info("✅ CSV validation passed, processing data from row 3 onwards...")
+            def on_loaded(records_df: pd.DataFrame, chunk_result: LoadResult) -> None:
+                if chunk_result.failures:
+                    positions = [position for position, _ in chunk_result.failures]
+                    dead_letter.write(records_df.iloc[positions], [error for _, error in chunk_result.failures])
+                    records_df = records_df.drop(records_df.index[positions])
+                self.affected_partitions.update(
+                    (state, int(year))
+                    for state, year in records_df[['state', 'year']].drop_duplicates().itertuples(index=False, name=None)
+                )
+                if snapshot is not None:
+                    snapshot.write(records_df)
             
-            # Process in chunks: Row 1 = headers, skip row 2 (descriptions), process row 3+
-            for chunk_df in pd.read_csv(
-                local_path, 
-                skiprows=[1],  # Skip only row 2 (index 1), use row 1 as headers
-                chunksize=ProcessingConstants.CHUNK_SIZE
-            ):
-                # Transform data to domain objects
-                records = self.data_transformer.process_csv_chunk(chunk_df)
+            try:
+                # Checkpoints written by the sequential reader have no byte offset to start a block at
+                resumable_by_offset = not tracker.resumed or tracker.checkpoint.byte_offset is not None
+                if self.config.execution_mode == 'pipelined' and resumable_by_offset:
+                    load_result, rows_rejected, _ = self.pipelined_loader.run(
+                        file_info, shard, on_loaded, tracker, self._resume_columns(file_info, shard, tracker), delta
+                    )
+                else:
+                    load_result, rows_rejected = self._stream_chunks(file_info, shard, on_loaded, tracker, delta)
                 
-                # Convert to dict format for queuing
-                record_dicts = [
-                    {
-                        'gen_id': r.generator_id,
-                        'year': r.year,
-                        'state': r.state,
-                        'plant_name': r.plant_name,
-                        'net_generation': r.net_generation
-                    }
-                    for r in records
-                ]
+                self.affected_partitions.update(delta.finish(self.db_client, self.spec.table_name))
+                tracker.complete()
+                if snapshot is not None:
+                    snapshot.commit()
+            except Exception:
+                delta.abort()
+                if snapshot is not None:
+                    snapshot.abort()
+                raise
+            finally:
+                self.delta_stats.add(delta.stats)
+                try:
+                    self.rows_dead_lettered += dead_letter.close()
+                except Exception as e:
+                    logger.error(f"❌ Could not write dead-letter rows for {file_info.key}: {e}")
+            
+            return load_result, rows_rejected
+    
+    def _stream_chunks(
+        self,
+        file_info: FileInfo,
+        shard: Optional[FileShard],
+        on_loaded: Callable[[pd.DataFrame, LoadResult], None],
+        tracker: CheckpointTracker,
+        delta: RowDeltaPlanner
+    ) -> Tuple[LoadResult, int]:
+        """Sequential mode: read, transform and load one chunk at a time
+        
+        Each chunk is read at the size the chunk sizer currently asks for.
+        A resumed load starts at the checkpoint's byte offset when it has
+        one, and otherwise reads past the rows already committed.
+        """
+        checkpoint = tracker.checkpoint
+        load_result = tracker.initial_load_result()
+        rows_rejected = checkpoint.rows_rejected
+        
+        start, end = (shard.start, shard.end) if shard else (0, None)
+        rows_to_skip = 0
+        
+        # Only mapped columns are parsed; a missing one fails the read with a ValueError
+        if tracker.resumed and checkpoint.byte_offset is not None:
+            start = checkpoint.byte_offset
+            read_options = self.spec.read_options(self._resume_columns(file_info, shard, tracker))
+        elif shard is None or shard.contains_header():
+            read_options = self.spec.read_options()
+            rows_to_skip = checkpoint.rows_done
+        else:
+            # Later shards start at a record boundary; the header is propagated by name
+            read_options = self.spec.read_options(shard.columns)
+            rows_to_skip = checkpoint.rows_done
+        
+        # Stream straight from MinIO and process in chunks
+        with self.minio_client.open_csv_stream(file_info, start, end) as stream, \
+                pd.read_csv(stream, iterator=True, **read_options) as reader:
+            while rows_to_skip > 0:
+                rows_to_skip -= len(reader.get_chunk(min(rows_to_skip, ProcessingConstants.CHUNK_SIZE * 10)))
+            chunk_index = 0
+            while True:
+                try:
+                    chunk_df = reader.get_chunk(self.chunk_sizer.rows)
+                except StopIteration:
+                    break
+                if chunk_index == 0:
+                    logger.info("✅ CSV header validation passed, processing data rows...")
+                chunk_index += 1
+                load_seconds = None
                 
-                # Insert directly into database
-                if record_dicts:
-                    inserted_count = self.db_client.bulk_insert_records(record_dicts)
-                    total_records += inserted_count
+                # Transform data to insertable records
+                transform_started = time.perf_counter()
+                records_df, rejected_by_reason = self._transform_chunk(chunk_df)
+                # Other batches of the run wait while this chunk resolves, loads and records its keys
+                with self.deduplicator.hold():
+                    dedup = self.deduplicator.apply(records_df)
+                    if dedup.duplicates:
+                        rejected_by_reason[RejectReason.DUPLICATE_KEY] = dedup.duplicates
+                    self.metrics.observe_transform(
+                        len(chunk_df), time.perf_counter() - transform_started, rejected_by_reason
+                    )
+                    chunk_rejected = len(chunk_df) - len(dedup.records)
+                    rows_rejected += chunk_rejected
+                    delta_chunk = delta.filter(records_df, dedup)
+                    records_df = delta_chunk.records
+                    load_result.skipped += delta_chunk.unchanged
+                    failed: List[int] = []
+                    
+                    # Load directly into database, committing the checkpoint with the rows
+                    if not records_df.empty:
+                        load_started = time.perf_counter()
+                        chunk_result = self.db_client.load_dataframe(
+                            records_df, self.spec.table_name, self.spec.unique_key,
+                            tracker.before_commit(len(chunk_df), records_df, chunk_rejected)
+                        )
+                        tracker.loaded()
+                        load_seconds = time.perf_counter() - load_started
+                        self.metrics.observe_load(chunk_result, load_seconds)
+                        load_result.add(chunk_result)
+                        rows_rejected += chunk_result.failed
+                        failed = [position for position, _ in chunk_result.failures]
+                        on_loaded(records_df, chunk_result)
+                    else:
+                        tracker.skipped(len(chunk_df), chunk_rejected)
+                    self.deduplicator.commit(dedup, delta_chunk.positions[failed])
+                    delta.commit(delta_chunk, failed)
                 
-                logger.info(f"✅ Processed chunk: {len(record_dicts)} records from {file_info.key}")
-            
-            logger.info(f"📊 Completed file {file_info.key}: {total_records} records")
-            return total_records
-            
-        except Exception as e:
-            logger.error(f"❌ Error processing file {file_info.key}: {e}")
-            self.rabbitmq_client.send_error_notification(
-                'file_processing_error',
-                str(e),
-                {'file': file_info.key}
-            )
-            return 0
+                self.chunk_sizer.observe(len(chunk_df), frame_bytes_per_row(chunk_df), load_seconds)
+                logger.info(f"✅ Processed chunk: {len(records_df)} records from {file_info.key}")
+        
+        self.metrics.observe_download((end if end is not None else file_info.size) - start)
+        return load_result, rows_rejected
+    
+    def _resume_columns(
+        self,
+        file_info: FileInfo,
+        shard: Optional[FileShard],
+        tracker: CheckpointTracker
+    ) -> Optional[List[str]]:
+        """Header for a load resuming mid-file, where the stream no longer starts with it"""
+        if not tracker.resumed:
+            return None
+        return shard.columns if shard is not None else self.file_validator.read_header(file_info)
+    
+    def _handle_processing_error(
+        self,
+        file_info: FileInfo,
+        error: Exception,
+        started: float,
+        shard: Optional[FileShard] = None
+    ) -> None:
+        """Record a failed file (or shard) in the manifest and notify"""
+        logger.error(f"❌ Error processing file {file_info.key}: {error}")
+        self.metrics.finish_file('failed', time.monotonic() - started)
+        try:
+            if shard is not None:
+                self.manifest.mark_shard_failed(file_info, shard.shard_index, str(error), self._elapsed_ms(started))
+            else:
+                self.manifest.mark_failed(file_info, str(error), self._elapsed_ms(started))
+        except Exception as manifest_error:
+            logger.error(f"❌ Could not record failure in manifest: {manifest_error}")
+        self.rabbitmq_client.send_error_notification(
+            'file_processing_error',
+            str(error),
+            {'file': file_info.key}
+        )
+    
+    @staticmethod
+    def _elapsed_ms(started: float) -> int:
+        """Milliseconds elapsed since a time.monotonic() reading"""
+        return int((time.monotonic() - started) * 1000)
+    
+    def _transform_chunk(self, chunk_df: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        """Transform a CSV chunk into output columns using the configured transform mode"""
+        return self.data_transformer.transform(chunk_df, self.config.transform_mode)
+    
+    def restore_from_snapshot(
+        self,
+        years: Optional[List[int]] = None,
+        states: Optional[List[str]] = None
+    ) -> LoadResult:
+        """Reload egrid_data from the Parquet snapshot instead of reparsing the CSV files
+        
+        Rows are merged like a regular load, so it waits for a year reload
+        in progress. The (state, year) partitions it wrote are added to
+        affected_partitions for the rollup refresh.
+        """
+        load_result = LoadResult()
+        partitions = 0
+        
+        with self.partitions.load_lock():
+            for frame in self.snapshot_store.iter_frames(years, states):
+                partitions += 1
+                load_result.add(self.db_client.load_dataframe(frame, self.spec.table_name, self.spec.unique_key))
+                self.affected_partitions.update(
+                    (state, int(year))
+                    for state, year in frame[['state', 'year']].drop_duplicates().itertuples(index=False, name=None)
+                )
+        
+        logger.info(
+            f"🧊 Restored {load_result.total_loaded()} records from {partitions} snapshot partitions "
+            f"({load_result.inserted} inserted, {load_result.updated} updated)"
+        )
+        return load_result
+    
+    def reload_year(self, year: int) -> Dict[str, Any]:
+        """Rebuild one year of egrid_data off to the side and swap it in for the live partition
+        
+        Rows come from the Parquet snapshot when it is enabled, otherwise
+        every valid CSV file is re-read and its rows of that year kept;
+        repeated keys follow the dedup policy, as within a batch. The live
+        partition keeps serving queries until the swap, and a failed reload
+        only drops its own table. Regular loads are held off for the whole
+        reload, since the swap would discard rows they merge meanwhile.
+        """
+        started = time.monotonic()
+        # Regular loads wait until the swap, so nothing they merge is swapped away with the old partition
+        with self.partitions.load_lock(exclusive=True):
+            load_table = self.partitions.begin_reload(year)
+            rows_copied = 0
             
-        finally:
-            # Clean up temporary file
-            if os.path.exists(local_path):
-                os.remove(local_path)
+            try:
+                for frame in self._year_frames(year):
+                    dedup = self.deduplicator.apply(frame)
+                    rows_copied += self.db_client.copy_records(dedup.records, load_table)
+                    self.deduplicator.commit(dedup)
+                result = self.partitions.publish_reload(year, load_table)
+            except Exception:
+                self.partitions.abort_reload(load_table)
+                raise
+            finally:
+                self.deduplicator.reset()
+        
+        logger.info(
+            f"🧱 Reloaded year {year}: {result['rows']} records from {rows_copied} copied "
+            f"in {time.monotonic() - started:.1f}s, replacing {result['replaced']}"
+        )
+        return result
+    
+    def rollback_year(self, year: int) -> Dict[str, Any]:
+        """Put the previous generation of a reloaded year back in place"""
+        with self.partitions.load_lock(exclusive=True):
+            result = self.partitions.rollback(year)
+        # Stored row hashes now describe rows newer than the database's; next loads go in full
+        if self.row_hashes is not None:
+            self.row_hashes.clear()
+        return result
+    
+    def _year_frames(self, year: int) -> Iterator[pd.DataFrame]:
+        """Transformed rows of one year from the snapshot or from every valid CSV file"""
+        if self.config.snapshot_enabled:
+            yield from self.snapshot_store.iter_frames(years=[year])
+            return
+        
+        valid_files, _ = self.validate_files(self.minio_client.list_csv_files())
+        for file_info in valid_files:
+            logger.info(f"📥 Reading year {year} from {file_info.key}")
+            with self.minio_client.open_csv_stream(file_info) as stream, \
+                    pd.read_csv(stream, iterator=True, **self.spec.read_options()) as reader:
+                while True:
+                    try:
+                        chunk_df = reader.get_chunk(self.chunk_sizer.rows)
+                    except StopIteration:
+                        break
+                    records_df, _ = self._transform_chunk(chunk_df)
+                    records_df = records_df[records_df['year'] == year]
+                    if not records_df.empty:
+                        yield records_df
+    
+    def prepare_bulk_load(self, batches: List[ProcessingBatch]) -> Dict[str, Any]:
+        """Defer the target's secondary indexes if the run's batches are large for the table"""
+        return self.load_policy.prepare(sum(batch.estimated_records for batch in batches))
+    
+    def finish_bulk_load(self, partitions: List[Tuple[str, int]]) -> Dict[str, Any]:
+        """Rebuild deferred indexes and refresh statistics of the partitions the run wrote"""
+        return self.load_policy.finish(partitions)
+    
+    def refresh_rollups(self, partitions: List[Tuple[str, int]]) -> int:
+        """Refresh the API rollups for the (state, year) partitions touched by this run"""
+        return self.rollups.refresh(partitions)
     
     def check_if_processing_needed(self, table_class) -> bool:
         """Check if data processing is needed"""
@@ -292,7 +997,9 @@ class CSVProcessorOrchestrator:
             files_validated=len(valid_files),
             files_invalid=len(invalid_files),
             total_records_processed=total_records,
-            status='completed'
+            status='completed',
+            rows_dead_lettered=self.rows_dead_lettered,
+            chunk_sizes=self.chunk_sizer.summary()
         )
         
         # Send completion notification
@@ -304,9 +1011,12 @@ class CSVProcessorOrchestrator:
             'files_invalid': report.files_invalid,
             'total_records_processed': report.total_records_processed,
             'success_rate': report.success_rate(),
-            'status': report.status
+            'status': report.status,
+            'rows_dead_lettered': report.rows_dead_lettered,
+            'chunk_sizes': report.chunk_sizes
         }
         
         self.rabbitmq_client.send_completion_notification(report_dict)
+        self.rabbitmq_client.flush()
         
         return report 
\ No newline at end of file
@@ -0,0 +1,127 @@
+"""
+Application Layer: Run-wide Duplicate Detection
+Resolves rows sharing the unique key across every chunk and file a processor
+loads, so duplicate keys never reach the database
+"""
+import contextlib
+from dataclasses import dataclass
+from typing import Optional, Sequence
+import logging
+
+import numpy as np
+import pandas as pd
+
+from domain.models.e_grid_data import DuplicatePolicy, ProcessingConstants
+from infrastructure.key_store import SpillingKeyStore
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DedupOutcome:
+    """Rows to load for one chunk, plus the key state to commit once they are loaded"""
+    records: pd.DataFrame
+    duplicates: int  # Input rows that will not be loaded as rows of their own
+    corrections: int  # Output rows replacing a row loaded earlier in the run (keep_last/sum)
+    hashes: np.ndarray
+    values: np.ndarray
+    seen: np.ndarray  # Per output row: key already loaded earlier in the run
+
+
+class ChunkDeduplicator:
+    """Application service applying a duplicate policy across all chunks of a run
+
+    Keys are tracked as 64-bit hashes of the unique key columns, so memory
+    is independent of key length. Duplicates inside a chunk are collapsed
+    in pandas. A key already loaded earlier in the run is dropped
+    (keep_first), or re-sent once as an update carrying the newest value
+    (keep_last) or the running total (sum).
+
+    Key state is committed only after the chunk has loaded, so a failed
+    chunk does not hide later occurrences of its keys.
+    """
+
+    def __init__(
+        self,
+        policy: str = DuplicatePolicy.KEEP_LAST,
+        key_store: Optional[SpillingKeyStore] = None,
+        key_columns: Sequence[str] = ProcessingConstants.UNIQUE_KEY,
+        value_column: str = 'net_generation'
+    ):
+        if policy not in DuplicatePolicy.ALL:
+            raise ValueError(f"Unknown duplicate policy {policy!r}, expected one of {DuplicatePolicy.ALL}")
+        self.policy = policy
+        self.key_store = key_store if key_store is not None else SpillingKeyStore(max_memory_keys=2_000_000)
+        self.key_columns = list(key_columns)
+        self.value_column = value_column
+
+    def apply(self, df: pd.DataFrame) -> DedupOutcome:
+        """Resolve duplicates in a transformed chunk without changing the key state"""
+        if df.empty:
+            return DedupOutcome(
+                df, 0, 0, np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.float64), np.empty(0, dtype=bool)
+            )
+
+        hashes = self.hash_keys(df)
+        rows = df
+        if self.policy == DuplicatePolicy.SUM:
+            totals = df[self.value_column].groupby(hashes, sort=False).transform('sum')
+            first = ~pd.Series(hashes).duplicated(keep='first').to_numpy()
+            rows = df.assign(**{self.value_column: totals.to_numpy()})[first]
+            hashes = hashes[first]
+        else:
+            keep = 'first' if self.policy == DuplicatePolicy.KEEP_FIRST else 'last'
+            unique = ~pd.Series(hashes).duplicated(keep=keep).to_numpy()
+            rows = df[unique]
+            hashes = hashes[unique]
+
+        seen, stored = self.key_store.lookup(hashes)
+        values = rows[self.value_column].to_numpy(dtype=np.float64)
+
+        if self.policy == DuplicatePolicy.KEEP_FIRST:
+            rows, hashes, values = rows[~seen], hashes[~seen], values[~seen]
+            seen = seen[~seen]
+            corrections = 0
+        elif self.policy == DuplicatePolicy.SUM:
+            values = values + stored
+            rows = rows.assign(**{self.value_column: values})
+            corrections = int(seen.sum())
+        else:
+            corrections = int(seen.sum())
+
+        return DedupOutcome(
+            records=rows,
+            duplicates=len(df) - len(rows),
+            corrections=corrections,
+            hashes=hashes,
+            values=values,
+            seen=seen
+        )
+
+    def commit(self, outcome: DedupOutcome, failed_positions: Sequence[int] = ()) -> None:
+        """Record the keys of a loaded chunk, except rows the database rejected"""
+        hashes, values = outcome.hashes, outcome.values
+        if len(failed_positions):
+            loaded = np.ones(len(hashes), dtype=bool)
+            loaded[list(failed_positions)] = False
+            hashes, values = hashes[loaded], values[loaded]
+        if len(hashes):
+            self.key_store.upsert(hashes, values)
+
+    def hold(self) -> contextlib.AbstractContextManager:
+        """Serialize apply() through commit() with other processors sharing the key store
+
+        keep_last needs no lock: ON CONFLICT already lets the last writer win.
+        """
+        if self.policy == DuplicatePolicy.KEEP_LAST:
+            return contextlib.nullcontext()
+        return self.key_store.hold()
+
+    def reset(self) -> None:
+        """Release the key store; a local store forgets its keys, a run-wide one keeps them"""
+        self.key_store.close()
+
+    def hash_keys(self, df: pd.DataFrame) -> np.ndarray:
+        # Hash the text form so int/str dtype differences between transform modes agree
+        keys = df[self.key_columns].astype(str)
+        return pd.util.hash_pandas_object(keys, index=False).to_numpy(dtype=np.uint64)
@@ -0,0 +1,198 @@
+"""
+Application Layer: Row-hash Delta Loading
+Compares the normalized rows of a re-uploaded file with the rows loaded from
+its previous version, so only inserted, changed and removed rows reach the database
+"""
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+import logging
+
+import numpy as np
+import pandas as pd
+
+from domain.models.e_grid_data import DeltaStats, FileInfo, ProcessingConstants
+from infrastructure.db_client import DatabaseClient
+from infrastructure.manifest_repository import FileManifestRepository
+from infrastructure.row_hash_store import RowHashStore, RowHashWriter
+from application.deduplication import DedupOutcome
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeltaChunk:
+    """One deduplicated chunk split into the rows to load and the rows left out"""
+    records: pd.DataFrame  # Insert and update sets
+    positions: np.ndarray  # Positions of records in the deduplicated chunk
+    rows: Optional[pd.DataFrame] = None  # Deduplicated chunk with key_hash and row_hash, to store
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+
+class RowDeltaPlanner:
+    """Application service splitting one file into insert, update and delete sets
+
+    The rows last loaded from an object are kept in the RowHashStore with
+    the ETag they came from. They are only trusted to skip rows while that
+    ETag is the one the manifest last recorded as loaded (nothing else,
+    e.g. a sharded, resumed or failed load, has written the object's rows
+    since). Then:
+      - rows whose key and row hash match the previous version are not sent,
+        if the table still holds them with those values (another file or a
+        year reload may have rewritten the key since)
+      - rows with a new key form the insert set, changed rows the update set
+    Otherwise the whole file is loaded. Either way, keys of the stored
+    version missing from the file form the delete set, applied by finish()
+    to rows still stored with the stored values; a load that failed before
+    replacing the stored version thus leaves its deletes to the next one.
+    The file's rows are stored for the next version. Rows the deduplicator
+    re-sends for a key loaded earlier in the batch are always loaded.
+    Without a store the planner passes every row through.
+    """
+
+    def __init__(
+        self,
+        store: Optional[RowHashStore],
+        file_info: FileInfo,
+        previous_entry: Optional[Dict[str, Any]] = None,
+        key_columns: Sequence[str] = ProcessingConstants.UNIQUE_KEY,
+        hash_keys: Optional[Callable[[pd.DataFrame], np.ndarray]] = None,
+        db_client: Optional[DatabaseClient] = None,
+        table_name: str = 'egrid_data'
+    ):
+        self.store = store
+        self.file_info = file_info
+        self.key_columns = list(key_columns)
+        self.hash_keys = hash_keys
+        # Checks rows unchanged since the previous version against the table; without it they are skipped unchecked
+        self.db_client = db_client
+        self.table_name = table_name
+        self.stats = DeltaStats()
+        self._previous: Optional[pd.DataFrame] = None
+        # Whether _previous is what the database holds for the object, so unchanged rows can be skipped
+        self._trusted = False
+        self._writer: Optional[RowHashWriter] = None
+        self._seen: List[np.ndarray] = []
+        if store is None:
+            return
+
+        stored = store.load(file_info)
+        if stored is not None:
+            self._previous = stored[1].drop_duplicates('key_hash', keep='last').reset_index(drop=True)
+            self._trusted = (
+                previous_entry is not None
+                and previous_entry['status'] == FileManifestRepository.STATUS_LOADED
+                and previous_entry['etag'] == stored[0]
+            )
+        if self._trusted:
+            self._previous_index = pd.Index(self._previous['key_hash'].to_numpy(dtype=np.uint64))
+            self._previous_hashes = self._previous['row_hash'].to_numpy(dtype=np.uint64)
+            self.stats.files_delta = 1
+            logger.info(
+                f"🔀 Delta load of {file_info.key} against {len(self._previous)} rows "
+                f"of version {stored[0][:12]}"
+            )
+        elif self._previous is not None:
+            self.stats.files_full = 1
+            logger.info(
+                f"🔀 Version {stored[0][:12]} of {file_info.key} was not the last one loaded, "
+                f"loading it in full and deleting what it had that the file no longer has"
+            )
+        else:
+            self.stats.files_full = 1
+            logger.info(f"🔀 No stored previous version of {file_info.key}, loading it in full")
+        self._writer = store.open_writer(file_info)
+
+    def filter(self, accepted: pd.DataFrame, dedup: DedupOutcome) -> DeltaChunk:
+        """Rows of a deduplicated chunk that must be loaded
+
+        accepted is the chunk before deduplication, whose keys all count as
+        present in the file even when the deduplicator drops a row.
+        """
+        records = dedup.records
+        positions = np.arange(len(records))
+        if self._writer is None:
+            return DeltaChunk(records, positions)
+
+        rows = records.assign(key_hash=dedup.hashes, row_hash=self.hash_rows(records))
+        self._seen.append(self.hash_keys(accepted) if dedup.duplicates else dedup.hashes)
+        if not self._trusted or records.empty:
+            return DeltaChunk(records, positions, rows)
+
+        index = self._previous_index.get_indexer(dedup.hashes)
+        known = index >= 0
+        same = np.zeros(len(records), dtype=bool)
+        if known.any():
+            same[known] = self._previous_hashes[index[known]] == rows['row_hash'].to_numpy()[known]
+        same &= ~dedup.seen
+        if same.any() and self.db_client is not None:
+            # Only the table knows whether another source wrote the key after this file's previous version
+            same[same] = self.db_client.stored_matches(records[same], self.table_name, self.key_columns)
+
+        chunk = DeltaChunk(
+            records[~same],
+            positions[~same],
+            rows,
+            inserted=int((~known).sum()),
+            updated=int((known & ~same).sum()),
+            unchanged=int(same.sum())
+        )
+        self.stats.inserted += chunk.inserted
+        self.stats.updated += chunk.updated
+        self.stats.unchanged += chunk.unchanged
+        return chunk
+
+    def commit(self, chunk: DeltaChunk, failed_positions: Sequence[int] = ()) -> None:
+        """Store a chunk's rows once it has loaded, except rows the database rejected"""
+        if self._writer is None or chunk.rows is None:
+            return
+        rows = chunk.rows
+        if len(failed_positions):
+            stored = np.ones(len(rows), dtype=bool)
+            stored[chunk.positions[list(failed_positions)]] = False
+            rows = rows[stored]
+        self._writer.write(rows)
+
+    def finish(self, db_client: DatabaseClient, table_name: str) -> Set[Tuple[str, int]]:
+        """Apply the delete set and store the file's rows; returns the (state, year) partitions deleted from"""
+        if self._writer is None:
+            return set()
+
+        partitions: Set[Tuple[str, int]] = set()
+        if self._previous is not None:
+            seen = np.concatenate(self._seen) if self._seen else np.empty(0, dtype=np.uint64)
+            gone = self._previous[~self._previous['key_hash'].isin(seen)]
+            if not gone.empty:
+                self.stats.deleted = db_client.delete_matching_records(
+                    gone.drop(columns=['key_hash', 'row_hash']), table_name, self.key_columns
+                )
+                partitions = {
+                    (state, int(year))
+                    for state, year in gone[['state', 'year']].drop_duplicates().itertuples(index=False, name=None)
+                }
+            logger.info(
+                f"🔀 Delta of {self.file_info.key}: {self.stats.inserted} inserted, {self.stats.updated} updated, "
+                f"{self.stats.deleted} deleted, {self.stats.unchanged} unchanged rows not sent"
+            )
+
+        self._writer.commit()
+        self._writer = None
+        return partitions
+
+    def abort(self) -> None:
+        """Discard the rows collected so far; the stored version is left as it was"""
+        if self._writer is not None:
+            self._writer.abort()
+            self._writer = None
+
+    @staticmethod
+    def hash_rows(df: pd.DataFrame) -> np.ndarray:
+        """64-bit hash of each normalized row
+
+        Floats are rounded to the table's 2 decimals and every column is
+        hashed as text, so a value the database cannot tell apart hashes
+        the same and both transform modes agree.
+        """
+        normalized = df.round({col: 2 for col in df.columns if pd.api.types.is_float_dtype(df[col])})
+        return pd.util.hash_pandas_object(normalized.astype(str), index=False).to_numpy(dtype=np.uint64)
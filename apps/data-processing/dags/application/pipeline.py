@@ -0,0 +1,350 @@
+"""
+Application Layer: Pipelined Chunk Processing
+Runs download, parse/transform and load concurrently, connected by bounded queues
+"""
+import csv
+import queue
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Tuple
+import logging
+
+import pandas as pd
+
+from domain.models.e_grid_data import FileInfo, FileShard, LoadResult, RejectReason
+from domain.models.pipeline_spec import PipelineSpec
+from infrastructure.minio_client import MinIOClient
+from infrastructure.db_client import DatabaseClient
+from infrastructure.metrics import PipelineMetrics
+from application.deduplication import ChunkDeduplicator
+from application.chunk_sizing import AdaptiveChunkSizer, frame_bytes_per_row
+from application.checkpointing import CheckpointTracker
+from application.delta import RowDeltaPlanner
+
+logger = logging.getLogger(__name__)
+
+_END_OF_STREAM = object()
+
+
+@dataclass
+class StageTimings:
+    """Busy and wait time per pipeline stage, in seconds"""
+    busy: Dict[str, float] = field(default_factory=dict)
+    waiting: Dict[str, float] = field(default_factory=dict)
+    wall_clock: float = 0.0
+
+    def add_busy(self, stage: str, seconds: float) -> None:
+        self.busy[stage] = self.busy.get(stage, 0.0) + seconds
+
+    def add_waiting(self, stage: str, seconds: float) -> None:
+        self.waiting[stage] = self.waiting.get(stage, 0.0) + seconds
+
+    def bottleneck(self) -> Optional[str]:
+        """The stage with the most busy time bounds the pipeline's wall-clock time"""
+        if not self.busy:
+            return None
+        return max(self.busy, key=self.busy.get)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            'busy_seconds': {k: round(v, 3) for k, v in self.busy.items()},
+            'waiting_seconds': {k: round(v, 3) for k, v in self.waiting.items()},
+            'wall_clock_seconds': round(self.wall_clock, 3),
+            'bottleneck': self.bottleneck()
+        }
+
+
+def _parse_and_transform(
+    block: bytes,
+    columns: List[str],
+    spec: PipelineSpec,
+    transform_mode: str
+) -> Tuple[pd.DataFrame, int, Dict[str, int], float, float]:
+    """Worker-process entry point: parse a record-aligned block and transform it
+
+    Returns the accepted frame, the number of rows parsed, rejected row
+    counts by reason code, the busy time and the parsed frame's bytes per row.
+    """
+    # Imported here so the worker process does not need the orchestrator's clients
+    from application.csv_processor import DataTransformationService
+
+    started = time.perf_counter()
+    chunk_df = pd.read_csv(BytesIO(block), **spec.read_options(columns))
+    accepted, rejected = DataTransformationService(spec).transform(chunk_df, transform_mode)
+
+    return accepted, len(chunk_df), rejected, time.perf_counter() - started, frame_bytes_per_row(chunk_df)
+
+
+class PipelinedChunkLoader:
+    """Application service running download -> parse/transform -> load as concurrent stages
+
+    A reader thread pulls record-aligned byte blocks from the object stream,
+    a process pool parses and transforms them, and the calling thread loads
+    results in order. Bounded queues apply backpressure so memory stays at
+    roughly queue_depth blocks regardless of file size.
+
+    Blocks start at block_bytes; once record sizes are known, each block is
+    sized to hold the chunk sizer's current row count. Each block carries
+    the absolute offset of its end, which becomes the checkpoint's
+    byte_offset once the block has loaded.
+    """
+
+    def __init__(
+        self,
+        minio_client: MinIOClient,
+        db_client: DatabaseClient,
+        metrics: PipelineMetrics,
+        deduplicator: ChunkDeduplicator,
+        spec: PipelineSpec,
+        chunk_sizer: AdaptiveChunkSizer,
+        block_bytes: int = 1024 * 1024,
+        queue_depth: int = 4,
+        parse_workers: int = 1,
+        transform_mode: str = 'vectorized'
+    ):
+        self.minio_client = minio_client
+        self.db_client = db_client
+        self.metrics = metrics
+        self.deduplicator = deduplicator
+        self.spec = spec
+        self.chunk_sizer = chunk_sizer
+        self.block_bytes = block_bytes
+        self.queue_depth = queue_depth
+        self.parse_workers = parse_workers
+        self.transform_mode = transform_mode
+
+    def run(
+        self,
+        file_info: FileInfo,
+        shard: Optional[FileShard] = None,
+        on_loaded: Optional[Callable[[pd.DataFrame, LoadResult], None]] = None,
+        tracker: Optional[CheckpointTracker] = None,
+        columns: Optional[List[str]] = None,
+        delta: Optional[RowDeltaPlanner] = None
+    ) -> Tuple[LoadResult, int, StageTimings]:
+        """Process one file (or shard); returns load result, rejected rows and stage timings
+
+        on_loaded, when given, receives every chunk and its load result after
+        it has been loaded. A tracker that resumed an earlier attempt starts
+        the stream at its byte_offset, with the header given as columns.
+        A compressed object is read through its decompressed stream, whose
+        offsets cannot be seeked to, so its checkpoints carry none.
+        A delta planner leaves out rows unchanged since the previous version.
+        """
+        timings = StageTimings()
+        tracker = tracker or CheckpointTracker(None, file_info, shard)
+        delta = delta or RowDeltaPlanner(None, file_info)
+        load_result = tracker.initial_load_result()
+        rows_rejected = tracker.checkpoint.rows_rejected
+        started = time.perf_counter()
+
+        start, end = (shard.start, shard.end) if shard else (0, None)
+        compressed = file_info.compression() is not None
+        if tracker.resumed:
+            start = tracker.checkpoint.byte_offset
+        futures: "queue.Queue[object]" = queue.Queue(maxsize=self.queue_depth)
+        stop = threading.Event()
+        reader_errors: List[BaseException] = []
+
+        with self.minio_client.open_csv_stream(file_info, start, end) as stream, \
+                ProcessPoolExecutor(max_workers=self.parse_workers) as pool:
+
+            if tracker.resumed:
+                offset = start
+            else:
+                columns, header_bytes = self._read_columns(stream, shard)
+                offset = start + header_bytes
+            missing_columns = [col for col in self.spec.source_columns if col not in columns]
+            if missing_columns:
+                raise ValueError(f"Missing required columns: {missing_columns}")
+
+            reader = threading.Thread(
+                target=self._read_blocks,
+                args=(stream, pool, columns, offset, futures, stop, reader_errors, timings, compressed),
+                name=f"pipeline-reader-{file_info.key}",
+                daemon=True
+            )
+            reader.start()
+
+            try:
+                while True:
+                    waited = time.perf_counter()
+                    item = futures.get()
+                    if item is _END_OF_STREAM:
+                        break
+
+                    future, block_end = item
+                    if compressed:
+                        block_end = None
+                    accepted, rows_parsed, rejected_by_reason, parse_seconds, bytes_per_row = future.result()
+                    timings.add_waiting('load', time.perf_counter() - waited)
+                    timings.add_busy('parse_transform', parse_seconds)
+
+                    # Key state is per run, so duplicates are resolved here rather than in the workers
+                    stage_started = time.perf_counter()
+                    # Other batches of the run wait while this chunk resolves, loads and records its keys
+                    with self.deduplicator.hold():
+                        dedup = self.deduplicator.apply(accepted)
+                        if dedup.duplicates:
+                            rejected_by_reason[RejectReason.DUPLICATE_KEY] = dedup.duplicates
+                        self.metrics.observe_transform(rows_parsed, parse_seconds, rejected_by_reason)
+                        chunk_rejected = rows_parsed - len(dedup.records)
+                        rows_rejected += chunk_rejected
+                        delta_chunk = delta.filter(accepted, dedup)
+                        accepted = delta_chunk.records
+                        load_result.skipped += delta_chunk.unchanged
+                        failed: List[int] = []
+
+                        load_started = time.perf_counter()
+                        load_seconds = None
+                        if not accepted.empty:
+                            chunk_result = self.db_client.load_dataframe(
+                                accepted, self.spec.table_name, self.spec.unique_key,
+                                tracker.before_commit(rows_parsed, accepted, chunk_rejected, block_end)
+                            )
+                            tracker.loaded()
+                            load_seconds = time.perf_counter() - load_started
+                            self.metrics.observe_load(chunk_result, load_seconds)
+                            load_result.add(chunk_result)
+                            rows_rejected += chunk_result.failed
+                            failed = [position for position, _ in chunk_result.failures]
+                            if on_loaded is not None:
+                                on_loaded(accepted, chunk_result)
+                        else:
+                            tracker.skipped(rows_parsed, chunk_rejected, block_end)
+                        self.deduplicator.commit(dedup, delta_chunk.positions[failed])
+                        delta.commit(delta_chunk, failed)
+                    self.chunk_sizer.observe(rows_parsed, bytes_per_row, load_seconds)
+                    timings.add_busy('load', time.perf_counter() - stage_started)
+            finally:
+                stop.set()
+                self._drain(futures)
+                reader.join()
+
+        if reader_errors:
+            raise reader_errors[0]
+        if compressed:
+            self.metrics.observe_download(file_info.size)
+
+        timings.wall_clock = time.perf_counter() - started
+        logger.info(f"⏱️ Stage timings for {file_info.key}: {timings.to_dict()}")
+        return load_result, rows_rejected, timings
+
+    def _read_columns(self, stream, shard: Optional[FileShard]) -> Tuple[List[str], int]:
+        """Consume the header and the rows the spec skips, or take the propagated header
+
+        Returns the columns and the number of bytes consumed.
+        """
+        if shard is not None and not shard.contains_header():
+            return shard.columns, 0
+
+        raw_header = stream.readline()
+        consumed = len(raw_header)
+        for _ in range(self.spec.header_rows - 1):
+            consumed += len(stream.readline())  # e.g. eGRID column descriptions
+        header_line = raw_header.decode('utf-8-sig').rstrip('\r\n')
+        return next(csv.reader([header_line])), consumed
+
+    def _read_blocks(
+        self,
+        stream,
+        pool: ProcessPoolExecutor,
+        columns: List[str],
+        offset: int,
+        futures: "queue.Queue[object]",
+        stop: threading.Event,
+        errors: List[BaseException],
+        timings: StageTimings,
+        compressed: bool = False
+    ) -> None:
+        """Reader stage: split the stream into record-aligned blocks and submit them
+
+        Queued items are (future, absolute offset just past the block).
+        """
+        pending = b''
+        raw_bytes_per_row = 0.0
+        try:
+            while not stop.is_set():
+                read_size = self.block_bytes
+                if raw_bytes_per_row:
+                    read_size = max(1, int(self.chunk_sizer.rows * raw_bytes_per_row) - len(pending))
+                read_started = time.perf_counter()
+                data = stream.read(read_size)
+                timings.add_busy('download', time.perf_counter() - read_started)
+                if not compressed:
+                    # Decompressed bytes are not what was downloaded; run() counts the object instead
+                    self.metrics.observe_download(len(data))
+
+                if not data:
+                    if pending.strip():
+                        future = pool.submit(_parse_and_transform, pending, columns, self.spec, self.transform_mode)
+                        self._put(futures, (future, offset + len(pending)), stop, timings)
+                    break
+
+                buffer = pending + data
+                cut = self._record_cut(buffer)
+                if cut == 0:
+                    pending = buffer
+                    continue
+
+                block = buffer[:cut]
+                raw_bytes_per_row = len(block) / max(1, block.count(b'\n'))
+                offset += cut
+                future = pool.submit(_parse_and_transform, block, columns, self.spec, self.transform_mode)
+                self._put(futures, (future, offset), stop, timings)
+                pending = buffer[cut:]
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            self._put(futures, _END_OF_STREAM, stop, timings, force=True)
+
+    @staticmethod
+    def _record_cut(buffer: bytes) -> int:
+        """Offset just past the last newline that is not inside a quoted field
+
+        Blocks always start at a record boundary, so a newline is a record
+        boundary when the number of quote characters before it is even.
+        """
+        newline = buffer.rfind(b'\n')
+        while newline != -1:
+            if buffer.count(b'"', 0, newline) % 2 == 0:
+                return newline + 1
+            newline = buffer.rfind(b'\n', 0, newline)
+        return 0
+
+    @staticmethod
+    def _put(
+        futures: "queue.Queue[object]",
+        item: object,
+        stop: threading.Event,
+        timings: StageTimings,
+        force: bool = False
+    ) -> None:
+        """Blocking put that gives up once the consumer has stopped"""
+        waited = time.perf_counter()
+        while True:
+            try:
+                futures.put(item, timeout=0.5)
+                break
+            except queue.Full:
+                if stop.is_set() and not force:
+                    if isinstance(item, tuple):
+                        item[0].cancel()
+                    break
+                if stop.is_set() and force:
+                    return
+        timings.add_waiting('download', time.perf_counter() - waited)
+
+    @staticmethod
+    def _drain(futures: "queue.Queue[object]") -> None:
+        """Cancel queued work after the consumer stops early"""
+        while True:
+            try:
+                item = futures.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, tuple):
+                item[0].cancel()
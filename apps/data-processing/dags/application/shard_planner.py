@@ -0,0 +1,187 @@
+"""
+Application Layer: CSV Shard Planning
+Splits large CSV objects into record-aligned byte ranges that parse independently
+"""
+import csv
+import math
+from typing import List, Optional, Tuple
+import logging
+
+from domain.models.e_grid_data import FileInfo, FileShard, ProcessingConstants
+from infrastructure.minio_client import MinIOClient
+from infrastructure.compression import decompress_prefix
+
+logger = logging.getLogger(__name__)
+
+
+class CSVShardPlanner:
+    """Application service planning newline-aligned, quote-aware shards of CSV objects"""
+
+    MAX_WINDOW_SIZE = 4 * 1024 * 1024  # Give up aligning if a record spans more than 4MB
+    SAMPLE_WINDOWS = 8
+
+    def __init__(self, minio_client: MinIOClient, header_rows: int = 2):
+        self.minio_client = minio_client
+        # Header row + eGRID description row precede the data
+        self.header_rows = header_rows
+
+    def plan_shards(self, file_info: FileInfo, target_shard_size: int) -> List[FileShard]:
+        """Split a file into shards of roughly target_shard_size bytes"""
+        columns, data_start = self._read_header(file_info)
+        avg_record_size = self._sample_record_size(file_info, data_start, len(columns))
+
+        data_size = file_info.size - data_start
+        shard_count = max(1, math.ceil(data_size / target_shard_size))
+        step = data_size / shard_count
+
+        boundaries = [0]
+        for i in range(1, shard_count):
+            boundary = self._align_to_record(file_info, int(data_start + i * step), len(columns))
+            if boundary is not None and boundary > boundaries[-1]:
+                boundaries.append(boundary)
+        boundaries.append(file_info.size)
+
+        shard_count = len(boundaries) - 1
+        shards = []
+        for i in range(shard_count):
+            start, end = boundaries[i], boundaries[i + 1]
+            payload = end - max(start, data_start)
+            shards.append(FileShard(
+                file=file_info,
+                shard_index=i,
+                shard_count=shard_count,
+                start=start,
+                end=end,
+                columns=columns,
+                estimated_records=int(payload / avg_record_size) if avg_record_size else 0
+            ))
+
+        logger.info(
+            f"🧩 Planned {shard_count} shards for {file_info.key} "
+            f"(~{sum(s.estimated_records for s in shards)} records, {avg_record_size:.1f} bytes/record)"
+        )
+        return shards
+
+    def estimate_records(self, file_info: FileInfo) -> int:
+        """Estimate the number of data records from sampled record lengths"""
+        if file_info.compression() is not None:
+            return self._estimate_compressed_records(file_info)
+        columns, data_start = self._read_header(file_info)
+        avg_record_size = self._sample_record_size(file_info, data_start, len(columns))
+        if not avg_record_size:
+            return 0
+        return int((file_info.size - data_start) / avg_record_size)
+
+    def _estimate_compressed_records(self, file_info: FileInfo) -> int:
+        """Scale the records in a decompressed prefix by the object's compressed size
+
+        The prefix grows until it holds complete records past the header.
+        bz2, for one, emits nothing until a whole block has arrived.
+        """
+        codec = file_info.compression()
+        window_size = ProcessingConstants.SHARD_SAMPLE_SIZE
+        while True:
+            window = self.minio_client.read_range(file_info, 0, window_size)
+            records = decompress_prefix(codec, window).count(b'\n') - self.header_rows
+            if records > 0 or window_size >= file_info.size or window_size >= self.MAX_WINDOW_SIZE:
+                break
+            window_size *= 2
+
+        if records <= 0:
+            return 0
+        return int(records * file_info.size / min(window_size, file_info.size))
+
+    def _read_header(self, file_info: FileInfo) -> Tuple[List[str], int]:
+        """Return header columns and the byte offset where data records start"""
+        window_size = ProcessingConstants.SHARD_SAMPLE_SIZE
+        while True:
+            window = self.minio_client.read_range(file_info, 0, window_size)
+            offset = 0
+            lines = []
+            for _ in range(self.header_rows):
+                newline = window.find(b'\n', offset)
+                if newline == -1:
+                    break
+                lines.append(window[offset:newline])
+                offset = newline + 1
+
+            if len(lines) == self.header_rows or window_size >= file_info.size:
+                break
+            if window_size >= self.MAX_WINDOW_SIZE:
+                raise ValueError(f"Header of {file_info.key} exceeds {self.MAX_WINDOW_SIZE} bytes")
+            window_size *= 2
+
+        header_line = lines[0] if lines else window
+        columns = next(csv.reader([header_line.decode('utf-8-sig').rstrip('\r')]))
+        return columns, min(offset, file_info.size)
+
+    def _sample_record_size(self, file_info: FileInfo, data_start: int, field_count: int) -> float:
+        """Average bytes per record measured over evenly spaced sample windows"""
+        data_size = file_info.size - data_start
+        if data_size <= 0:
+            return 0.0
+
+        sample_size = ProcessingConstants.SHARD_SAMPLE_SIZE
+        windows = 1 if data_size <= sample_size * self.SAMPLE_WINDOWS else self.SAMPLE_WINDOWS
+        step = max(1, (data_size - sample_size) // max(1, windows - 1)) if windows > 1 else 0
+
+        sampled_bytes = 0
+        sampled_records = 0
+        for i in range(windows):
+            offset = data_start + i * step
+            window = self.minio_client.read_range(file_info, offset, offset + sample_size)
+            start = 0 if i == 0 else self._find_record_start(window, field_count)
+            if start is None:
+                continue
+            last_newline = window.rfind(b'\n')
+            if last_newline < start:
+                continue
+            sampled_bytes += last_newline + 1 - start
+            sampled_records += window.count(b'\n', start, last_newline + 1)
+
+        if sampled_records == 0:
+            return float(data_size)
+        return sampled_bytes / sampled_records
+
+    def _align_to_record(self, file_info: FileInfo, offset: int, field_count: int) -> Optional[int]:
+        """Move an offset forward to the start of the next complete record"""
+        window_size = ProcessingConstants.SHARD_SAMPLE_SIZE
+        while window_size <= self.MAX_WINDOW_SIZE:
+            window = self.minio_client.read_range(file_info, offset, offset + window_size)
+            start = self._find_record_start(window, field_count)
+            if start is not None:
+                return offset + start
+            if offset + window_size >= file_info.size:
+                return None
+            window_size *= 2
+
+        logger.warning(f"⚠️ Could not align shard boundary at {offset} in {file_info.key}")
+        return None
+
+    @classmethod
+    def _find_record_start(cls, window: bytes, field_count: int) -> Optional[int]:
+        """Find the first newline in a window that is a real record boundary
+
+        A newline inside a quoted field is rejected because the text after it
+        does not parse as records with the expected number of fields; two
+        following lines must parse cleanly before a boundary is accepted.
+        """
+        newline = window.find(b'\n')
+        while newline != -1:
+            candidate = newline + 1
+            following = window[candidate:].split(b'\n', 2)
+            if len(following) < 3:
+                return None  # Need two complete lines after the candidate
+            if cls._is_record(following[0], field_count) and cls._is_record(following[1], field_count):
+                return candidate
+            newline = window.find(b'\n', candidate)
+        return None
+
+    @staticmethod
+    def _is_record(line: bytes, field_count: int) -> bool:
+        """Check a single line parses as one CSV record with field_count fields"""
+        text = line.decode('utf-8', errors='replace').rstrip('\r')
+        if text.count('"') % 2:
+            return False
+        rows = list(csv.reader([text]))
+        return len(rows) == 1 and len(rows[0]) == field_count
@@ -2,8 +2,8 @@
 Domain Model: EGrid Data Entity
 Following Clean Architecture principles - Core business entity
 """
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import asdict, dataclass, field
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 
 
@@ -52,22 +52,49 @@ class FileInfo:
     size: int
     last_modified: datetime
     bucket: str
+    etag: Optional[str] = None
     
     def is_valid_size(self) -> bool:
         """Business rule: File must have content"""
         return self.size > 0
     
     def is_csv_file(self) -> bool:
-        """Business rule: File must be CSV"""
-        return self.key.lower().endswith('.csv')
+        """Business rule: File must be CSV, plain or compressed"""
+        return self.key.lower().endswith('.csv') or self.compression() is not None
+    
+    def compression(self) -> Optional[str]:
+        """Codec of a compressed CSV object (see CSVCompression), None for plain CSV"""
+        key = self.key.lower()
+        return next((codec for suffix, codec in CSVCompression.SUFFIXES.items() if key.endswith(suffix)), None)
+
+
+@dataclass
+class FileShard:
+    """Domain entity representing a record-aligned byte range of a large file"""
+    file: FileInfo
+    shard_index: int
+    shard_count: int
+    start: int  # Inclusive byte offset, always at the start of a record
+    end: int  # Exclusive byte offset
+    columns: List[str]  # Header propagated to shards that do not contain it
+    estimated_records: int
+    
+    def size(self) -> int:
+        """Number of bytes covered by the shard"""
+        return self.end - self.start
+    
+    def contains_header(self) -> bool:
+        """Business rule: only the first shard holds the header and description rows"""
+        return self.start == 0
 
 
 @dataclass
 class ProcessingBatch:
-    """Domain entity representing a batch of files for processing"""
+    """Domain entity representing a batch of files (or shards of one file) for processing"""
     batch_id: str
     files: list[FileInfo]
     estimated_records: int
+    shards: list[FileShard] = field(default_factory=list)
     
     def total_size(self) -> int:
         """Calculate total size of all files in batch"""
@@ -85,6 +112,10 @@ class ProcessingReport:
     total_records_processed: int
     status: str
     duration_minutes: float = 0.0
+    rows_dead_lettered: int = 0  # Rows rejected by database constraints, see DeadLetterStore
+    chunk_sizes: Dict[str, Any] = field(default_factory=dict)  # Rows per chunk chosen by AdaptiveChunkSizer
+    delta: Dict[str, int] = field(default_factory=dict)  # Change sets of delta loads, see DeltaStats
+    load_policy: Dict[str, Any] = field(default_factory=dict)  # Index deferral and ANALYZE, see BulkLoadPolicy
     
     def success_rate(self) -> float:
         """Calculate processing success rate"""
@@ -93,11 +124,125 @@ class ProcessingReport:
         return (self.files_validated / self.files_scanned) * 100
 
 
+@dataclass
+class LoadResult:
+    """Domain entity representing the outcome of loading records into a table"""
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    # Rows rejected by database constraints while the rest of their batch was loaded
+    failed: int = 0
+    # (row position in the loaded batch, database error) per failed row; not accumulated by add()
+    failures: List[Tuple[int, str]] = field(default_factory=list, repr=False)
+    
+    def total_loaded(self) -> int:
+        """Rows that were written (inserted or updated)"""
+        return self.inserted + self.updated
+    
+    def add(self, other: 'LoadResult') -> None:
+        """Accumulate another load result into this one"""
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+        self.failed += other.failed
+
+
+@dataclass
+class ChunkCheckpoint:
+    """Domain entity: how far a file (or shard) has been loaded, committed with each chunk
+
+    rows_done counts data rows from the start of the file or shard, so a
+    retry can skip exactly what is already in the database. byte_offset
+    is the matching position in the object when the reader knows it.
+    """
+    bucket: str
+    object_key: str
+    etag: Optional[str]
+    shard_index: int = 0
+    rows_done: int = 0  # Parsed data rows, including rejected and deduplicated ones
+    byte_offset: Optional[int] = None  # Absolute offset of the next record
+    chunks_done: int = 0
+    digest: str = ''  # Running sum of the loaded rows' hashes, hex
+    loaded: LoadResult = field(default_factory=LoadResult)  # Accumulated, without failures
+    rows_rejected: int = 0
+    completed: bool = False
+    
+    @classmethod
+    def start(cls, file_info: FileInfo, shard_index: int = 0) -> 'ChunkCheckpoint':
+        """Checkpoint of a file (or shard) nothing has been loaded from yet"""
+        return cls(bucket=file_info.bucket, object_key=file_info.key, etag=file_info.etag, shard_index=shard_index)
+    
+    def is_resumable(self) -> bool:
+        """Business rule: an unfinished checkpoint past the first row is resumed"""
+        return not self.completed and self.rows_done > 0
+
+
+@dataclass
+class DeltaStats:
+    """Domain entity counting the change sets of delta loads (see RowDeltaPlanner)"""
+    files_delta: int = 0  # Files compared against the row hashes of their previous version
+    files_full: int = 0  # Files loaded in full (no usable previous version)
+    unchanged: int = 0  # Rows not sent to the database
+    inserted: int = 0  # Rows with a key the previous version did not have
+    updated: int = 0  # Rows whose values changed
+    deleted: int = 0  # Rows of the previous version missing from the new one, deleted
+    
+    def add(self, other: 'DeltaStats') -> None:
+        """Accumulate another file's counts into this one"""
+        self.files_delta += other.files_delta
+        self.files_full += other.files_full
+        self.unchanged += other.unchanged
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.deleted += other.deleted
+    
+    def to_dict(self) -> Dict[str, int]:
+        """Serializable representation (e.g. for XCom)"""
+        return asdict(self)
+
+
 # Domain constants
 class ProcessingConstants:
     """Business constants for data processing"""
+    UNIQUE_KEY = ('gen_id', 'year', 'state', 'plant_name')
     MIN_VALID_YEAR = 1900
     MAX_NET_GENERATION = 1e15  # 1 petawatt-hour cap
     CHUNK_SIZE = 1000
     BATCH_SIZE = 100
-    VALIDATION_SAMPLE_SIZE = 1024  # First 1KB for validation 
\ No newline at end of file
+    VALIDATION_SAMPLE_SIZE = 1024  # First 1KB for validation, grown until the header row fits
+    VALIDATION_WORKERS = 8
+    SHARD_SAMPLE_SIZE = 64 * 1024  # Window read around shard boundaries and for line-length sampling
+
+
+class RejectReason:
+    """Reason codes attached to rows rejected by the transformation stage"""
+    EMPTY_GENERATOR_ID = 'empty_generator_id'
+    INVALID_YEAR = 'invalid_year'
+    INVALID_STATE = 'invalid_state'
+    EMPTY_PLANT_NAME = 'empty_plant_name'
+    # Row-mode transform logs the reason but only reports a count
+    UNCLASSIFIED = 'unclassified'
+    # Unique key already seen in this run (dropped or merged by the dedup policy)
+    DUPLICATE_KEY = 'duplicate_key'
+
+
+class DuplicatePolicy:
+    """How rows sharing a unique key within a run are resolved before loading"""
+    KEEP_FIRST = 'keep_first'
+    KEEP_LAST = 'keep_last'
+    SUM = 'sum'  # Net generation of all occurrences is added up
+
+    ALL = (KEEP_FIRST, KEEP_LAST, SUM)
+
+
+class CSVCompression:
+    """Codecs of compressed CSV objects, recognized by key suffix
+    
+    A compressed object is streamed whole: its byte ranges do not decode
+    on their own, so it is never sharded or resumed at a byte offset.
+    """
+    GZIP = 'gzip'
+    ZSTD = 'zstd'
+    BZ2 = 'bz2'
+    
+    SUFFIXES = {'.csv.gz': GZIP, '.csv.zst': ZSTD, '.csv.bz2': BZ2}
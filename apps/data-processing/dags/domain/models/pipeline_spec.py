@@ -0,0 +1,124 @@
+"""
+Domain Model: Pipeline Spec
+Typed, column-pruned read plan compiled from one etl_config.json entry
+"""
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from domain.models.e_grid_data import ProcessingConstants
+
+# Config type -> dtype a CSV column is read as. Numbers are read as text:
+# the transform strips quotes and thousands separators before converting.
+READ_DTYPES = {
+    'string': 'str',
+    'category': 'category',
+    'int': 'str',
+    'float': 'str',
+}
+
+# Output columns the transformation rules are written against
+TRANSFORM_COLUMNS = ('gen_id', 'year', 'state', 'plant_name', 'net_generation')
+
+
+@dataclass(frozen=True)
+class PipelineSpec:
+    """Domain entity describing how one configured input is read and loaded
+
+    Only the mapped source columns are parsed (usecols), each with an
+    explicit dtype, and rows between the header and data_start_row are
+    skipped. The transformer looks source columns up through the mapping,
+    and the loader writes to table_name keyed on unique_key.
+    """
+    name: str
+    table_name: str
+    column_mapping: Dict[str, str]  # Source header -> output column
+    read_dtypes: Dict[str, str]  # Source header -> pandas dtype
+    schedule_interval: str = '0 */1 * * *'
+    data_start_row: int = 3  # 1-based; row 1 is the header
+    chunk_size: int = ProcessingConstants.CHUNK_SIZE
+    unique_key: Tuple[str, ...] = ProcessingConstants.UNIQUE_KEY
+
+    @classmethod
+    def from_config(cls, entry: Dict[str, Any]) -> 'PipelineSpec':
+        """Compile one etl_config.json entry, failing fast on inconsistent settings"""
+        name = entry.get('name', '')
+        input_config = entry.get('input', {})
+        output_config = entry.get('output', {})
+        processing_config = entry.get('processing', {})
+
+        mapping = dict(output_config.get('mapping', {}))
+        if not mapping:
+            raise ValueError(f"Pipeline {name!r} has no output.mapping")
+
+        missing_outputs = [col for col in TRANSFORM_COLUMNS if col not in mapping.values()]
+        if missing_outputs:
+            raise ValueError(f"Pipeline {name!r} does not map output columns {missing_outputs}")
+
+        input_schema = input_config.get('schema', {})
+        read_dtypes = {}
+        for source in mapping:
+            source_type = input_schema.get(source, 'string')
+            if source_type not in READ_DTYPES:
+                raise ValueError(
+                    f"Pipeline {name!r}: unknown type {source_type!r} for column {source!r}, "
+                    f"expected one of {sorted(READ_DTYPES)}"
+                )
+            read_dtypes[source] = READ_DTYPES[source_type]
+
+        data_start_row = int(input_config.get('data_start_row', 2))
+        if data_start_row < 2:
+            raise ValueError(f"Pipeline {name!r}: data_start_row must be 2 or later (row 1 is the header)")
+        skip_rows = input_config.get('skip_rows')
+        if skip_rows is not None and int(skip_rows) != data_start_row - 2:
+            raise ValueError(
+                f"Pipeline {name!r}: skip_rows={skip_rows} disagrees with data_start_row={data_start_row}"
+            )
+
+        unique_key = tuple(processing_config.get('unique_constraint', ProcessingConstants.UNIQUE_KEY))
+        unmapped_keys = [col for col in unique_key if col not in mapping.values()]
+        if unmapped_keys:
+            raise ValueError(f"Pipeline {name!r}: unique_constraint columns {unmapped_keys} are not mapped")
+
+        return cls(
+            name=name,
+            table_name=output_config.get('table_name', name),
+            column_mapping=mapping,
+            read_dtypes=read_dtypes,
+            schedule_interval=entry.get('schedule_interval', '0 */1 * * *'),
+            data_start_row=data_start_row,
+            chunk_size=int(input_config.get('chunk_size', ProcessingConstants.CHUNK_SIZE)),
+            unique_key=unique_key
+        )
+
+    @property
+    def source_columns(self) -> List[str]:
+        """CSV headers that must be present; all other columns are never parsed"""
+        return list(self.column_mapping)
+
+    @property
+    def header_rows(self) -> int:
+        """Rows before the first data record (header plus skipped rows)"""
+        return self.data_start_row - 1
+
+    def source_column(self, output_column: str) -> str:
+        """CSV header feeding an output column"""
+        for source, output in self.column_mapping.items():
+            if output == output_column:
+                return source
+        raise KeyError(f"Output column {output_column!r} is not mapped in pipeline {self.name!r}")
+
+    def read_options(self, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """pandas.read_csv keyword arguments for this input
+
+        Without columns the data starts with the header row; with columns
+        (a block or later shard carrying the propagated header) it does not.
+        """
+        options: Dict[str, Any] = {
+            'usecols': self.source_columns,
+            'dtype': dict(self.read_dtypes),
+        }
+        if columns is None:
+            options['skiprows'] = list(range(1, self.header_rows))
+        else:
+            options.update(header=None, names=columns)
+        return options
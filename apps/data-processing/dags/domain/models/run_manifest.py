@@ -0,0 +1,140 @@
+"""
+Domain Model: Run Manifest
+Compact, versioned description of one pipeline run's files and batches
+"""
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from domain.models.e_grid_data import FileInfo, FileShard, ProcessingBatch
+
+
+@dataclass
+class RunManifest:
+    """Domain entity holding the scanned, validated and batched files of a run
+
+    Serialized column-wise with each file stored once; valid/invalid lists
+    and batches refer to files by index, and shard headers are shared.
+    """
+    FORMAT_VERSION = 1
+
+    run_id: str
+    files: List[FileInfo] = field(default_factory=list)
+    valid_files: List[FileInfo] = field(default_factory=list)
+    invalid_files: List[FileInfo] = field(default_factory=list)
+    batches: List[ProcessingBatch] = field(default_factory=list)
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+    def to_payload(self) -> Dict[str, Any]:
+        """Compact serializable representation"""
+        all_files = self.files + self.valid_files + self.invalid_files + [
+            f for batch in self.batches for f in batch.files
+        ] + [shard.file for batch in self.batches for shard in batch.shards]
+
+        index: Dict[Tuple[str, str], int] = {}
+        ordered: List[FileInfo] = []
+        for file_info in all_files:
+            identity = (file_info.bucket, file_info.key)
+            if identity not in index:
+                index[identity] = len(ordered)
+                ordered.append(file_info)
+
+        buckets = sorted({f.bucket for f in ordered})
+        bucket_index = {bucket: i for i, bucket in enumerate(buckets)}
+        headers: List[List[str]] = []
+
+        def ref(file_info: FileInfo) -> int:
+            return index[(file_info.bucket, file_info.key)]
+
+        def header_ref(columns: List[str]) -> int:
+            if columns not in headers:
+                headers.append(columns)
+            return headers.index(columns)
+
+        return {
+            'version': self.FORMAT_VERSION,
+            'run_id': self.run_id,
+            'created_at': self.created_at.isoformat(),
+            'buckets': buckets,
+            'files': {
+                'bucket': [bucket_index[f.bucket] for f in ordered],
+                'key': [f.key for f in ordered],
+                'size': [f.size for f in ordered],
+                'last_modified': [f.last_modified.isoformat() for f in ordered],
+                'etag': [f.etag for f in ordered],
+            },
+            'scanned': [ref(f) for f in self.files],
+            'valid': [ref(f) for f in self.valid_files],
+            'invalid': [ref(f) for f in self.invalid_files],
+            'batches': [
+                {
+                    'id': batch.batch_id,
+                    'files': [ref(f) for f in batch.files],
+                    'est': batch.estimated_records,
+                    'shards': [
+                        [ref(s.file), s.shard_index, s.shard_count, s.start, s.end,
+                         header_ref(s.columns), s.estimated_records]
+                        for s in batch.shards
+                    ],
+                }
+                for batch in self.batches
+            ],
+            'headers': headers,
+        }
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any]) -> 'RunManifest':
+        """Typed loader for the representation produced by to_payload"""
+        version = payload.get('version')
+        if version != cls.FORMAT_VERSION:
+            raise ValueError(f"Unsupported run manifest version: {version}")
+
+        columns = payload['files']
+        buckets = payload['buckets']
+        files = [
+            FileInfo(
+                key=columns['key'][i],
+                size=columns['size'][i],
+                last_modified=datetime.fromisoformat(columns['last_modified'][i]),
+                bucket=buckets[columns['bucket'][i]],
+                etag=columns['etag'][i],
+            )
+            for i in range(len(columns['key']))
+        ]
+        headers = payload.get('headers', [])
+
+        batches = [
+            ProcessingBatch(
+                batch_id=batch['id'],
+                files=[files[i] for i in batch['files']],
+                estimated_records=batch['est'],
+                shards=[
+                    FileShard(
+                        file=files[file_ref],
+                        shard_index=shard_index,
+                        shard_count=shard_count,
+                        start=start,
+                        end=end,
+                        columns=headers[header],
+                        estimated_records=estimated,
+                    )
+                    for file_ref, shard_index, shard_count, start, end, header, estimated in batch['shards']
+                ],
+            )
+            for batch in payload['batches']
+        ]
+
+        return cls(
+            run_id=payload['run_id'],
+            files=[files[i] for i in payload['scanned']],
+            valid_files=[files[i] for i in payload['valid']],
+            invalid_files=[files[i] for i in payload['invalid']],
+            batches=batches,
+            created_at=datetime.fromisoformat(payload['created_at']),
+        )
+
+    def get_batch(self, batch_index: int) -> Optional[ProcessingBatch]:
+        """Return a batch by position, or None if out of range"""
+        if 0 <= batch_index < len(self.batches):
+            return self.batches[batch_index]
+        return None
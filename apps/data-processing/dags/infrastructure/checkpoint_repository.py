@@ -0,0 +1,127 @@
+"""
+Infrastructure Layer: Chunk Checkpoint Repository
+Persists per-file (and per-shard) load positions in Postgres, written in the
+same transaction as the chunk they follow, so retries resume where they stopped
+"""
+from typing import Any, Dict, Optional, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+import logging
+
+from domain.models.e_grid_data import ChunkCheckpoint, FileInfo, LoadResult
+from infrastructure.db_client import DatabaseClient
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkCheckpointRepository:
+    """Infrastructure adapter for the etl_chunk_checkpoint table"""
+
+    TABLE_NAME = 'etl_chunk_checkpoint'
+
+    # Run on first use, for databases created before the script existed
+    INIT_SCRIPT = '08_create_etl_chunk_checkpoint.sql'
+
+    # psycopg2 (pyformat) parameters, so the statement runs on a raw cursor or a session alike
+    UPSERT_SQL = f"""
+        INSERT INTO {TABLE_NAME} (
+            bucket, object_key, shard_index, etag, rows_done, byte_offset, chunks_done, digest,
+            rows_inserted, rows_updated, rows_skipped, rows_failed, rows_rejected, completed
+        )
+        VALUES (
+            %(bucket)s, %(object_key)s, %(shard_index)s, %(etag)s, %(rows_done)s, %(byte_offset)s,
+            %(chunks_done)s, %(digest)s, %(rows_inserted)s, %(rows_updated)s, %(rows_skipped)s,
+            %(rows_failed)s, %(rows_rejected)s, %(completed)s
+        )
+        ON CONFLICT (bucket, object_key, shard_index) DO UPDATE
+        SET etag = EXCLUDED.etag,
+            rows_done = EXCLUDED.rows_done,
+            byte_offset = EXCLUDED.byte_offset,
+            chunks_done = EXCLUDED.chunks_done,
+            digest = EXCLUDED.digest,
+            rows_inserted = EXCLUDED.rows_inserted,
+            rows_updated = EXCLUDED.rows_updated,
+            rows_skipped = EXCLUDED.rows_skipped,
+            rows_failed = EXCLUDED.rows_failed,
+            rows_rejected = EXCLUDED.rows_rejected,
+            completed = EXCLUDED.completed,
+            updated_at = CURRENT_TIMESTAMP
+    """
+
+    def __init__(self, db_client: DatabaseClient):
+        self.db_client = db_client
+
+    def ensure_table(self) -> None:
+        """Create the checkpoint table if it does not exist yet"""
+        self.db_client.apply_init_script(self.INIT_SCRIPT)
+
+    def get(self, file_info: FileInfo, shard_index: int = 0) -> Optional[ChunkCheckpoint]:
+        """Checkpoint of this version (ETag) of an object, if any"""
+        self.ensure_table()
+
+        session = self.db_client.get_session()
+        try:
+            row = session.execute(
+                text(f"""
+                    SELECT * FROM {self.TABLE_NAME}
+                    WHERE bucket = :bucket AND object_key = :object_key AND shard_index = :shard_index
+                """),
+                {'bucket': file_info.bucket, 'object_key': file_info.key, 'shard_index': shard_index}
+            ).mappings().first()
+        finally:
+            session.close()
+
+        if row is None or row['etag'] != file_info.etag:
+            return None
+        return ChunkCheckpoint(
+            bucket=row['bucket'],
+            object_key=row['object_key'],
+            etag=row['etag'],
+            shard_index=row['shard_index'],
+            rows_done=row['rows_done'],
+            byte_offset=row['byte_offset'],
+            chunks_done=row['chunks_done'],
+            digest=row['digest'],
+            loaded=LoadResult(
+                inserted=row['rows_inserted'],
+                updated=row['rows_updated'],
+                skipped=row['rows_skipped'],
+                failed=row['rows_failed']
+            ),
+            rows_rejected=row['rows_rejected'],
+            completed=row['completed']
+        )
+
+    def upsert_statement(self, checkpoint: ChunkCheckpoint) -> Tuple[str, Dict[str, Any]]:
+        """SQL and parameters writing a checkpoint, for the transaction that loads its chunk"""
+        self.ensure_table()
+        return self.UPSERT_SQL, {
+            'bucket': checkpoint.bucket,
+            'object_key': checkpoint.object_key,
+            'shard_index': checkpoint.shard_index,
+            'etag': checkpoint.etag,
+            'rows_done': checkpoint.rows_done,
+            'byte_offset': checkpoint.byte_offset,
+            'chunks_done': checkpoint.chunks_done,
+            'digest': checkpoint.digest,
+            'rows_inserted': checkpoint.loaded.inserted,
+            'rows_updated': checkpoint.loaded.updated,
+            'rows_skipped': checkpoint.loaded.skipped,
+            'rows_failed': checkpoint.loaded.failed,
+            'rows_rejected': checkpoint.rows_rejected,
+            'completed': checkpoint.completed,
+        }
+
+    def save(self, checkpoint: ChunkCheckpoint) -> None:
+        """Write a checkpoint in its own transaction (chunks with nothing to load, completion)"""
+        sql, params = self.upsert_statement(checkpoint)
+        session = self.db_client.get_session()
+        try:
+            session.connection().exec_driver_sql(sql, params)
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"❌ Error saving checkpoint for {checkpoint.object_key}: {e}")
+            raise
+        finally:
+            session.close()
@@ -0,0 +1,91 @@
+"""
+Infrastructure Layer: CSV Decompression
+Decompresses gzip, zstd and bz2 CSV objects on the fly while they stream,
+so they are parsed without being inflated in memory or on disk
+"""
+import bz2
+import io
+import zlib
+from typing import Any
+
+from domain.models.e_grid_data import CSVCompression
+
+
+def new_decompressor(codec: str) -> Any:
+    """Incremental decompressor for one gzip member, zstd frame or bz2 stream"""
+    if codec == CSVCompression.GZIP:
+        return zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+    if codec == CSVCompression.BZ2:
+        return bz2.BZ2Decompressor()
+    if codec == CSVCompression.ZSTD:
+        # Only needed for .csv.zst objects
+        import zstandard
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unsupported CSV compression {codec!r}")
+
+
+class DecompressingReader(io.RawIOBase):
+    """Raw file-like adapter yielding the decompressed bytes of a compressed stream
+
+    Concatenated members or frames (as written by parallel compressors)
+    are read one after the other. Compressed data is pulled from the
+    source read_size bytes at a time. With allow_truncated, a source that
+    ends mid-stream (e.g. a ranged prefix of the object) ends the output
+    instead of raising EOFError.
+    """
+
+    def __init__(self, source, codec: str, read_size: int = 256 * 1024, allow_truncated: bool = False):
+        self._source = source
+        self._codec = codec
+        self._read_size = read_size
+        self._allow_truncated = allow_truncated
+        self._decompressor = new_decompressor(codec)
+        self._member_started = False
+        self._unused = b''
+        self._output = b''
+        self._position = 0
+        self._eof = False
+        # Compressed bytes taken from the source so far
+        self.bytes_in = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while self._position >= len(self._output) and not self._eof:
+            self._output, self._position = self._decompress_more(), 0
+        count = min(len(buffer), len(self._output) - self._position)
+        buffer[:count] = self._output[self._position:self._position + count]
+        self._position += count
+        return count
+
+    def _decompress_more(self) -> bytes:
+        data = self._unused or self._source.read(self._read_size)
+        if not self._unused:
+            self.bytes_in += len(data)
+        self._unused = b''
+        if not data:
+            if self._member_started and not self._allow_truncated:
+                raise EOFError(f"Compressed {self._codec} stream ended before its end-of-stream marker")
+            self._eof = True
+            return b''
+
+        output = self._decompressor.decompress(data)
+        self._member_started = True
+        if self._decompressor.eof:
+            # Anything after the end marker is the next member or frame
+            self._unused = self._decompressor.unused_data
+            self._decompressor = new_decompressor(self._codec)
+            self._member_started = False
+        return output
+
+    def close(self) -> None:
+        if not self.closed:
+            self._source.close()
+        super().close()
+
+
+def decompress_prefix(codec: str, data: bytes) -> bytes:
+    """Decompress as much as the leading bytes of a compressed object allow"""
+    with DecompressingReader(io.BytesIO(data), codec, allow_truncated=True) as reader:
+        return reader.read()
@@ -2,15 +2,32 @@
 Infrastructure Layer: Database Client Adapter
 Handles database interactions using centralized config
 """
+import csv
+import io
 import os
+import struct
+import numpy as np
+import pandas as pd
+import psycopg2
 from sqlalchemy import create_engine, func, text
 from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import SQLAlchemyError
-from typing import Optional, List, Dict, Any
+from sqlalchemy.exc import DataError, IntegrityError, SQLAlchemyError
+from typing import Callable, Optional, List, Dict, Any, Sequence, Tuple
 import logging
 
+from domain.models.e_grid_data import LoadResult, ProcessingConstants
+
 logger = logging.getLogger(__name__)
 
+# Statement run after a chunk is loaded and before its transaction commits, given the
+# chunk's result (e.g. a checkpoint); SQL with psycopg2 (pyformat) parameters
+BeforeCommit = Callable[[LoadResult], Tuple[str, Dict[str, Any]]]
+
+# infra/db/init of this checkout; containers mount it and set ETL_DB_INIT_DIR
+DEFAULT_INIT_DIR = os.path.abspath(
+    os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', 'infra', 'db', 'init')
+)
+
 
 class DatabaseConfig:
     """Configuration for database connection using centralized config"""
@@ -21,6 +38,14 @@ class DatabaseConfig:
         self.database = os.environ.get('POSTGRES_DB', 'plant_analytics')
         self.username = os.environ.get('POSTGRES_USER', 'plantuser')
         self.password = os.environ.get('POSTGRES_PASSWORD', 'plantpassword123')
+        # 'copy' (COPY into staging + ON CONFLICT merge) or 'insert' (executemany)
+        self.load_mode = os.environ.get('ETL_LOAD_MODE', 'copy')
+        # COPY wire format: 'text' or 'binary'
+        self.copy_format = os.environ.get('ETL_COPY_FORMAT', 'text')
+        # Bisect a batch that violates a constraint so only the offending rows are rejected
+        self.isolate_failures = os.environ.get('ETL_LOAD_ISOLATE_FAILURES', 'true').lower() == 'true'
+        # infra/db/init, whose idempotent scripts create the ETL tables on databases older than them
+        self.init_dir = os.environ.get('ETL_DB_INIT_DIR', DEFAULT_INIT_DIR)
     
     def get_connection_string(self) -> str:
         """Get database connection string"""
@@ -34,30 +59,59 @@ class DatabaseClient:
         self.config = config
         self.engine = create_engine(config.get_connection_string())
         self.SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self._applied_scripts = set()
     
     def get_session(self) -> Session:
         """Get database session"""
         return self.SessionLocal()
     
-    def bulk_insert_records(self, records: List[Dict[str, Any]], table_name: str = 'egrid_data') -> int:
-        """Bulk insert records into the database"""
+    def apply_init_script(self, script: str) -> None:
+        """Run an infra/db/init script (once per client), e.g. for a table added after the database was created
+        
+        The scripts are idempotent (IF NOT EXISTS), the same ones Postgres
+        runs when it initializes a new database.
+        """
+        if script in self._applied_scripts:
+            return
+        
+        with open(os.path.join(self.config.init_dir, script), encoding='utf-8') as f:
+            sql = f.read()
+        
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql)
+            connection.commit()
+            self._applied_scripts.add(script)
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+    
+    def bulk_insert_records(
+        self,
+        records: List[Dict[str, Any]],
+        table_name: str = 'egrid_data',
+        key_columns: Optional[Sequence[str]] = None,
+        before_commit: Optional[BeforeCommit] = None
+    ) -> int:
+        """Bulk insert records into the database
+        
+        With key_columns, a row whose key already exists updates it instead
+        of failing the whole batch.
+        """
         if not records:
             return 0
             
         session = self.get_session()
         try:
-            # Build bulk insert SQL
-            columns = list(records[0].keys())
-            placeholders = ', '.join([f":{col}" for col in columns])
-            column_names = ', '.join(columns)
-            
-            sql = f"""
-                INSERT INTO {table_name} ({column_names})
-                VALUES ({placeholders})
-            """
+            sql = self._insert_sql(table_name, list(records[0].keys()), key_columns)
             
             # Execute bulk insert
             session.execute(text(sql), records)
+            if before_commit is not None:
+                session.connection().exec_driver_sql(*before_commit(LoadResult(inserted=len(records))))
             session.commit()
             
             logger.info(f"💾 Successfully inserted {len(records)} records into {table_name}")
@@ -70,6 +124,426 @@ class DatabaseClient:
         finally:
             session.close()
     
+    def insert_records_isolating(
+        self,
+        records: List[Dict[str, Any]],
+        table_name: str = 'egrid_data',
+        key_columns: Optional[Sequence[str]] = None,
+        before_commit: Optional[BeforeCommit] = None
+    ) -> LoadResult:
+        """Bulk insert under savepoints, bisecting around rows that violate a constraint
+        
+        Every good row is committed; rejected rows are reported in
+        LoadResult.failures by their position in records.
+        """
+        if not records:
+            return LoadResult()
+        
+        sql = text(self._insert_sql(table_name, list(records[0].keys()), key_columns))
+        session = self.get_session()
+        try:
+            def attempt(start: int, stop: int) -> Tuple[int, int]:
+                with session.begin_nested():
+                    session.execute(sql, records[start:stop])
+                return stop - start, 0
+            
+            inserted, _, failures = self._bisect(attempt, len(records), (IntegrityError, DataError))
+            result = LoadResult(inserted=inserted, failed=len(failures), failures=failures)
+            if before_commit is not None:
+                session.connection().exec_driver_sql(*before_commit(result))
+            session.commit()
+            
+            logger.info(
+                f"💾 Inserted {inserted} records into {table_name}"
+                + (f", {len(failures)} rejected by constraints" if failures else "")
+            )
+            return result
+            
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"❌ Error bulk inserting records: {e}")
+            raise
+        finally:
+            session.close()
+    
+    def load_dataframe(
+        self,
+        df: pd.DataFrame,
+        table_name: str = 'egrid_data',
+        key_columns: Sequence[str] = ProcessingConstants.UNIQUE_KEY,
+        before_commit: Optional[BeforeCommit] = None
+    ) -> LoadResult:
+        """Load a transformed frame using the configured load mode
+        
+        before_commit, when given, runs in the same transaction as the rows.
+        """
+        if df.empty:
+            return LoadResult()
+        
+        if self.config.load_mode == 'insert':
+            records = df.to_dict('records')
+            if self.config.isolate_failures:
+                return self.insert_records_isolating(records, table_name, key_columns, before_commit)
+            inserted = self.bulk_insert_records(records, table_name, key_columns, before_commit)
+            return LoadResult(inserted=inserted)
+        
+        return self.copy_merge_records(
+            df,
+            table_name,
+            key_columns=key_columns,
+            copy_format=self.config.copy_format,
+            isolate_failures=self.config.isolate_failures,
+            before_commit=before_commit
+        )
+    
+    def copy_merge_records(
+        self,
+        df: pd.DataFrame,
+        table_name: str = 'egrid_data',
+        key_columns: Sequence[str] = ProcessingConstants.UNIQUE_KEY,
+        copy_format: str = 'text',
+        isolate_failures: bool = False,
+        before_commit: Optional[BeforeCommit] = None
+    ) -> LoadResult:
+        """COPY rows into a temporary staging table and merge them in one statement
+        
+        Rows are streamed with COPY FROM STDIN, then upserted with
+        INSERT ... ON CONFLICT DO UPDATE. Rows whose values are unchanged, and
+        duplicate keys within the batch (last occurrence wins), are skipped.
+        
+        With isolate_failures, the merge runs under a savepoint. If a
+        constraint rejects it, the staged rows are re-merged in halves by
+        staging sequence until the offending rows are found. The data is
+        copied only once, and a single bad row in a chunk costs about
+        2 * log2(chunk size) extra statements. Rejected rows are reported in
+        LoadResult.failures by their position in df.
+        """
+        if df.empty:
+            return LoadResult()
+        
+        columns = list(df.columns)
+        staging_table = f"{table_name}_staging"
+        staging_columns = ', '.join(
+            f"{col} {self._staging_type(df[col])}" for col in columns
+        )
+        column_names = ', '.join(columns)
+        key_names = ', '.join(key_columns)
+        value_columns = [col for col in columns if col not in key_columns]
+        update_set = ', '.join(f"{col} = EXCLUDED.{col}" for col in value_columns)
+        changed = ' OR '.join(
+            f"{table_name}.{col} IS DISTINCT FROM EXCLUDED.{col}" for col in value_columns
+        )
+        conflict_action = (
+            f"DO UPDATE SET {update_set} WHERE {changed}" if value_columns else "DO NOTHING"
+        )
+        
+        merge_sql = f"""
+            WITH merged AS (
+                INSERT INTO {table_name} ({column_names})
+                SELECT DISTINCT ON ({key_names}) {column_names}
+                FROM {staging_table}
+                {{range_filter}}
+                ORDER BY {key_names}, staging_seq DESC
+                ON CONFLICT ({key_names}) {conflict_action}
+                RETURNING (xmax = 0) AS inserted
+            )
+            SELECT
+                count(*) FILTER (WHERE inserted),
+                count(*) FILTER (WHERE NOT inserted)
+            FROM merged
+        """
+        
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"""
+                CREATE TEMP TABLE {staging_table} (
+                    staging_seq BIGSERIAL,
+                    {staging_columns}
+                ) ON COMMIT DROP
+            """)
+            
+            if copy_format == 'binary':
+                buffer = self._to_copy_binary(df)
+                copy_options = "(FORMAT binary)"
+            else:
+                buffer = self._to_copy_text(df)
+                copy_options = ""
+            cursor.copy_expert(
+                f"COPY {staging_table} ({column_names}) FROM STDIN {copy_options}",
+                buffer
+            )
+            
+            failures: List[Tuple[int, str]] = []
+            if isolate_failures:
+                # staging_seq numbers the copied rows 1..len(df)
+                range_merge_sql = merge_sql.format(
+                    range_filter="WHERE staging_seq BETWEEN %(first)s AND %(last)s"
+                )
+                
+                def attempt(start: int, stop: int) -> Tuple[int, int]:
+                    cursor.execute("SAVEPOINT merge_range")
+                    try:
+                        cursor.execute(range_merge_sql, {'first': start + 1, 'last': stop})
+                        counts = cursor.fetchone()
+                    except (psycopg2.IntegrityError, psycopg2.DataError):
+                        cursor.execute("ROLLBACK TO SAVEPOINT merge_range")
+                        cursor.execute("RELEASE SAVEPOINT merge_range")
+                        raise
+                    # Released after every range, so bisection does not stack up open subtransactions
+                    cursor.execute("RELEASE SAVEPOINT merge_range")
+                    return counts
+                
+                inserted, updated, failures = self._bisect(
+                    attempt, len(df), (psycopg2.IntegrityError, psycopg2.DataError)
+                )
+            else:
+                cursor.execute(merge_sql.format(range_filter=''))
+                inserted, updated = cursor.fetchone()
+            
+            result = LoadResult(
+                inserted=inserted,
+                updated=updated,
+                skipped=len(df) - inserted - updated - len(failures),
+                failed=len(failures),
+                failures=failures
+            )
+            if before_commit is not None:
+                cursor.execute(*before_commit(result))
+            connection.commit()
+            logger.info(
+                f"💾 Merged {len(df)} records into {table_name}: "
+                f"{result.inserted} inserted, {result.updated} updated, {result.skipped} skipped"
+                + (f", {result.failed} rejected by constraints" if failures else "")
+            )
+            return result
+            
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"❌ Error merging records via COPY: {e}")
+            raise
+        finally:
+            connection.close()
+    
+    def copy_records(self, df: pd.DataFrame, table_name: str) -> int:
+        """Append rows with a plain COPY, e.g. into a table without indexes yet
+        
+        No conflict handling: duplicate keys are the caller's to resolve.
+        """
+        if df.empty:
+            return 0
+        
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.copy_expert(
+                f"COPY {table_name} ({', '.join(df.columns)}) FROM STDIN", self._to_copy_text(df)
+            )
+            connection.commit()
+            return len(df)
+        
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"❌ Error copying records into {table_name}: {e}")
+            raise
+        finally:
+            connection.close()
+    
+    def delete_matching_records(
+        self,
+        df: pd.DataFrame,
+        table_name: str = 'egrid_data',
+        key_columns: Sequence[str] = ProcessingConstants.UNIQUE_KEY
+    ) -> int:
+        """Delete the rows of df that are still stored with exactly these values
+        
+        Rows are copied into a staging table typed like the target, so values
+        compare after the rounding the load applied. A row another source has
+        overwritten since no longer matches and is kept.
+        """
+        if df.empty:
+            return 0
+        
+        columns = list(df.columns)
+        staging_table = f"{table_name}_delete_staging"
+        column_names = ', '.join(columns)
+        matches = ' AND '.join(
+            f"{table_name}.{col} = doomed.{col}" if col in key_columns
+            else f"{table_name}.{col} IS NOT DISTINCT FROM doomed.{col}"
+            for col in columns
+        )
+        
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"""
+                CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+                SELECT {column_names} FROM {table_name} WITH NO DATA
+            """)
+            cursor.copy_expert(f"COPY {staging_table} ({column_names}) FROM STDIN", self._to_copy_text(df))
+            cursor.execute(f"DELETE FROM {table_name} USING {staging_table} AS doomed WHERE {matches}")
+            deleted = cursor.rowcount
+            connection.commit()
+            logger.info(f"🗑️ Deleted {deleted} of {len(df)} records from {table_name}")
+            return deleted
+            
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"❌ Error deleting records via COPY: {e}")
+            raise
+        finally:
+            connection.close()
+    
+    def stored_matches(
+        self,
+        df: pd.DataFrame,
+        table_name: str = 'egrid_data',
+        key_columns: Sequence[str] = ProcessingConstants.UNIQUE_KEY
+    ) -> np.ndarray:
+        """Which rows of df are stored with exactly these values, as a boolean mask
+        
+        Compared like delete_matching_records, through a staging table typed
+        like the target. Read-only: the staging table is dropped on commit.
+        """
+        if df.empty:
+            return np.zeros(0, dtype=bool)
+        
+        columns = list(df.columns)
+        staging_table = f"{table_name}_match_staging"
+        column_names = ', '.join(columns)
+        matches = ' AND '.join(
+            f"{table_name}.{col} = candidate.{col}" if col in key_columns
+            else f"{table_name}.{col} IS NOT DISTINCT FROM candidate.{col}"
+            for col in columns
+        )
+        
+        connection = self.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"""
+                CREATE TEMP TABLE {staging_table} ON COMMIT DROP AS
+                SELECT {column_names} FROM {table_name} WITH NO DATA
+            """)
+            # Numbers the copied rows 1..len(df)
+            cursor.execute(f"ALTER TABLE {staging_table} ADD COLUMN staging_seq BIGSERIAL")
+            cursor.copy_expert(f"COPY {staging_table} ({column_names}) FROM STDIN", self._to_copy_text(df))
+            cursor.execute(f"SELECT candidate.staging_seq FROM {staging_table} AS candidate JOIN {table_name} ON {matches}")
+            matched = np.zeros(len(df), dtype=bool)
+            matched[[seq - 1 for seq, in cursor.fetchall()]] = True
+            connection.commit()
+            return matched
+            
+        except Exception as e:
+            connection.rollback()
+            logger.error(f"❌ Error matching records via COPY: {e}")
+            raise
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def _bisect(
+        attempt: Callable[[int, int], Tuple[int, int]],
+        count: int,
+        row_errors: Tuple[type, ...]
+    ) -> Tuple[int, int, List[Tuple[int, str]]]:
+        """Run attempt(start, stop) over rows [0, count), splitting ranges that raise row_errors
+        
+        attempt must undo its own partial work when it raises (e.g. by
+        rolling back to a savepoint). Returns inserted and updated totals,
+        plus (row position, error message) for each row that failed on its own.
+        """
+        inserted = updated = 0
+        failures: List[Tuple[int, str]] = []
+        ranges = [(0, count)]
+        while ranges:
+            start, stop = ranges.pop()
+            try:
+                range_inserted, range_updated = attempt(start, stop)
+                inserted += range_inserted
+                updated += range_updated
+            except row_errors as e:
+                if stop - start == 1:
+                    error = getattr(e, 'orig', None) or e
+                    failures.append((start, str(error).strip().splitlines()[0]))
+                else:
+                    # Left half is popped first, so rows are merged in their original order
+                    middle = (start + stop) // 2
+                    ranges.append((middle, stop))
+                    ranges.append((start, middle))
+        return inserted, updated, failures
+    
+    @staticmethod
+    def _insert_sql(table_name: str, columns: List[str], key_columns: Optional[Sequence[str]] = None) -> str:
+        """INSERT with named parameters, upserting on key_columns when given"""
+        placeholders = ', '.join([f":{col}" for col in columns])
+        sql = f"""
+            INSERT INTO {table_name} ({', '.join(columns)})
+            VALUES ({placeholders})
+        """
+        if key_columns:
+            value_columns = [col for col in columns if col not in key_columns]
+            update_set = ', '.join(f"{col} = EXCLUDED.{col}" for col in value_columns)
+            sql += f" ON CONFLICT ({', '.join(key_columns)}) " + (
+                f"DO UPDATE SET {update_set}" if value_columns else "DO NOTHING"
+            )
+        return sql
+    
+    @staticmethod
+    def _staging_type(column: pd.Series) -> str:
+        """Map a pandas column dtype to a staging table column type"""
+        if pd.api.types.is_integer_dtype(column):
+            return 'BIGINT'
+        if pd.api.types.is_float_dtype(column):
+            return 'DOUBLE PRECISION'
+        return 'TEXT'
+    
+    @staticmethod
+    def _to_copy_text(df: pd.DataFrame) -> io.StringIO:
+        """Serialize a frame to COPY text format (tab separated, \\N for NULL)"""
+        escaped = df.copy()
+        for col in escaped.columns:
+            if not (pd.api.types.is_integer_dtype(escaped[col]) or pd.api.types.is_float_dtype(escaped[col])):
+                escaped[col] = (
+                    escaped[col].astype('string')
+                    .str.replace('\\', '\\\\', regex=False)
+                    .str.replace('\t', '\\t', regex=False)
+                    .str.replace('\n', '\\n', regex=False)
+                    .str.replace('\r', '\\r', regex=False)
+                )
+        
+        buffer = io.StringIO()
+        escaped.to_csv(buffer, sep='\t', header=False, index=False, na_rep='\\N', quoting=csv.QUOTE_NONE)
+        buffer.seek(0)
+        return buffer
+    
+    @staticmethod
+    def _to_copy_binary(df: pd.DataFrame) -> io.BytesIO:
+        """Serialize a frame to PostgreSQL COPY binary format"""
+        encoders = []
+        for col in df.columns:
+            if pd.api.types.is_integer_dtype(df[col]):
+                encoders.append(lambda v: struct.pack('>iq', 8, int(v)))
+            elif pd.api.types.is_float_dtype(df[col]):
+                encoders.append(lambda v: struct.pack('>id', 8, float(v)))
+            else:
+                def encode_text(v):
+                    data = str(v).encode('utf-8')
+                    return struct.pack('>i', len(data)) + data
+                encoders.append(encode_text)
+        
+        null_field = struct.pack('>i', -1)
+        tuple_header = struct.pack('>h', len(encoders))
+        
+        buffer = io.BytesIO()
+        buffer.write(b'PGCOPY\n\xff\r\n\x00' + struct.pack('>ii', 0, 0))
+        for row in df.itertuples(index=False, name=None):
+            buffer.write(tuple_header)
+            for encode, value in zip(encoders, row):
+                buffer.write(null_field if pd.isna(value) else encode(value))
+        buffer.write(struct.pack('>h', -1))
+        buffer.seek(0)
+        return buffer
+    
     def get_record_count(self, table_class) -> int:
         """Get total record count for a table"""
         session = self.get_session()
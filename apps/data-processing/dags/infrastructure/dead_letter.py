@@ -0,0 +1,108 @@
+"""
+Infrastructure Layer: Dead-Letter Store
+Keeps rows the database rejected, with the error that rejected them, as
+Parquet objects in MinIO (not .csv, so the scanner never picks them up)
+"""
+import hashlib
+import os
+from datetime import datetime
+from io import BytesIO
+from typing import List, Optional
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from domain.models.e_grid_data import FileInfo, FileShard
+from infrastructure.minio_client import MinIOClient
+
+logger = logging.getLogger(__name__)
+
+
+class DeadLetterConfig:
+    """Configuration for dead-letter objects using environment variables"""
+    def __init__(self):
+        self.prefix = os.environ.get('ETL_DEAD_LETTER_PREFIX', 'dead_letter/egrid_data').strip('/')
+        self.bucket = os.environ.get('ETL_DEAD_LETTER_BUCKET', '') or None
+
+
+class DeadLetterWriter:
+    """Collects the rejected rows of one source file (or shard) and uploads them on close()
+
+    Rejected rows are rare, so they are buffered in memory.
+    """
+
+    def __init__(
+        self,
+        store: 'DeadLetterStore',
+        file_info: FileInfo,
+        shard: Optional[FileShard] = None,
+        first_row: int = 0
+    ):
+        self.store = store
+        self.file_info = file_info
+        self.shard_index = shard.shard_index if shard else 0
+        self.first_row = first_row
+        self._frames: List[pd.DataFrame] = []
+        self.rows = 0
+
+    def write(self, rows: pd.DataFrame, errors: List[str]) -> None:
+        """Add rejected rows (output columns) with one error message per row"""
+        if rows.empty:
+            return
+        self._frames.append(rows.reset_index(drop=True).assign(
+            error=errors,
+            source_key=self.file_info.key,
+            source_etag=self.file_info.etag,
+            shard_index=self.shard_index,
+            rejected_at=datetime.utcnow()
+        ))
+        self.rows += len(rows)
+
+    def close(self) -> int:
+        """Upload the collected rows, if any; returns how many were dead-lettered"""
+        if not self._frames:
+            return 0
+
+        key = self.store.object_key(self.file_info, self.shard_index, self.first_row)
+        buffer = BytesIO()
+        pq.write_table(pa.Table.from_pandas(pd.concat(self._frames, ignore_index=True), preserve_index=False), buffer)
+        self.store.minio_client.put_bytes(
+            key, buffer.getvalue(), bucket=self.store.bucket, content_type='application/vnd.apache.parquet'
+        )
+        logger.warning(f"☠️ {self.rows} rows of {self.file_info.key} rejected by the database, kept in {key}")
+        self._frames = []
+        return self.rows
+
+
+class DeadLetterStore:
+    """Infrastructure adapter for dead-letter objects
+
+    Layout under the prefix:
+        date=<YYYY-MM-DD>/<source>-<key hash>-<etag>-<shard>[-<first row>].parquet
+    with the rejected row's columns plus error, source_key, source_etag,
+    shard_index and rejected_at.
+    """
+
+    def __init__(self, minio_client: MinIOClient, config: Optional[DeadLetterConfig] = None):
+        self.minio_client = minio_client
+        self.config = config or DeadLetterConfig()
+        self.bucket = self.config.bucket or minio_client.config.bucket
+
+    def open_writer(
+        self,
+        file_info: FileInfo,
+        shard: Optional[FileShard] = None,
+        first_row: int = 0
+    ) -> DeadLetterWriter:
+        """Writer for one attempt; a resumed attempt (first_row > 0) gets its own object"""
+        return DeadLetterWriter(self, file_info, shard, first_row)
+
+    def object_key(self, file_info: FileInfo, shard_index: int, first_row: int = 0) -> str:
+        source = os.path.splitext(os.path.basename(file_info.key))[0]
+        key_hash = hashlib.sha1(file_info.key.encode('utf-8')).hexdigest()[:8]
+        version = (file_info.etag or 'noetag')[:12]
+        day = datetime.utcnow().strftime('%Y-%m-%d')
+        resumed = f"-{first_row}" if first_row else ''
+        return f"{self.config.prefix}/date={day}/{source}-{key_hash}-{version}-{shard_index}{resumed}.parquet"
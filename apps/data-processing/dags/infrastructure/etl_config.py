@@ -0,0 +1,47 @@
+"""
+Infrastructure Layer: ETL Config Loader
+Reads config/etl_config.json and compiles its entries into pipeline specs
+"""
+import json
+import os
+from functools import lru_cache
+from typing import Optional, Tuple
+import logging
+
+from domain.models.pipeline_spec import PipelineSpec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'config', 'etl_config.json')
+
+
+class EtlConfig:
+    """Location of the ETL config and the pipeline to run, from environment variables"""
+    def __init__(self):
+        self.path = os.environ.get('ETL_CONFIG_PATH', '') or DEFAULT_CONFIG_PATH
+        # Entry name in the config; the first entry when unset
+        self.pipeline = os.environ.get('ETL_PIPELINE', '') or None
+
+
+@lru_cache(maxsize=None)
+def load_pipeline_specs(path: str = DEFAULT_CONFIG_PATH) -> Tuple[PipelineSpec, ...]:
+    """Compile every entry of a config file (once per process)"""
+    with open(path, 'r') as f:
+        entries = json.load(f)
+    specs = tuple(PipelineSpec.from_config(entry) for entry in entries)
+    logger.info(f"🧾 Compiled {len(specs)} pipeline specs from {path}")
+    return specs
+
+
+def get_pipeline_spec(config: Optional[EtlConfig] = None) -> PipelineSpec:
+    """The configured pipeline's spec"""
+    config = config or EtlConfig()
+    specs = load_pipeline_specs(config.path)
+    if not specs:
+        raise ValueError(f"No pipelines configured in {config.path}")
+    if config.pipeline is None:
+        return specs[0]
+    for spec in specs:
+        if spec.name == config.pipeline:
+            return spec
+    raise ValueError(f"Pipeline {config.pipeline!r} not found in {config.path}")
@@ -0,0 +1,93 @@
+"""
+Infrastructure Layer: CSV Header Cache
+Caches parsed header rows by object ETag in memory and in Postgres
+"""
+import json
+import threading
+from typing import Dict, Iterable, List
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+import logging
+
+from infrastructure.db_client import DatabaseClient
+
+logger = logging.getLogger(__name__)
+
+
+class HeaderCacheRepository:
+    """Infrastructure adapter for the etl_header_cache table
+
+    An ETag identifies object content, so a cached header never goes stale;
+    re-validating an unchanged object needs no MinIO request at all.
+    """
+
+    TABLE_NAME = 'etl_header_cache'
+
+    # Run on first use, for databases created before the script existed
+    INIT_SCRIPT = '06_create_etl_header_cache.sql'
+
+    def __init__(self, db_client: DatabaseClient):
+        self.db_client = db_client
+        self._memory: Dict[str, List[str]] = {}
+        self._lock = threading.Lock()
+
+    def ensure_table(self) -> None:
+        """Create the cache table if it does not exist yet"""
+        self.db_client.apply_init_script(self.INIT_SCRIPT)
+
+    def get_many(self, etags: Iterable[str]) -> Dict[str, List[str]]:
+        """Look up cached headers for many ETags with at most one query"""
+        wanted = {etag for etag in etags if etag}
+        with self._lock:
+            found = {etag: self._memory[etag] for etag in wanted if etag in self._memory}
+        missing = list(wanted - found.keys())
+        if not missing:
+            return found
+
+        try:
+            self.ensure_table()
+            session = self.db_client.get_session()
+            try:
+                rows = session.execute(
+                    text(f"SELECT etag, columns FROM {self.TABLE_NAME} WHERE etag = ANY(:etags)"),
+                    {'etags': missing}
+                ).all()
+            finally:
+                session.close()
+        except SQLAlchemyError as e:
+            logger.warning(f"⚠️ Header cache lookup failed, falling back to MinIO: {e}")
+            return found
+
+        with self._lock:
+            for etag, columns in rows:
+                columns = json.loads(columns) if isinstance(columns, str) else columns
+                self._memory[etag] = columns
+                found[etag] = columns
+        return found
+
+    def put_many(self, headers: Dict[str, List[str]]) -> None:
+        """Store parsed headers by ETag"""
+        headers = {etag: columns for etag, columns in headers.items() if etag}
+        if not headers:
+            return
+
+        with self._lock:
+            self._memory.update(headers)
+
+        try:
+            self.ensure_table()
+            session = self.db_client.get_session()
+            try:
+                session.execute(
+                    text(f"""
+                        INSERT INTO {self.TABLE_NAME} (etag, columns)
+                        VALUES (:etag, CAST(:columns AS JSONB))
+                        ON CONFLICT (etag) DO NOTHING
+                    """),
+                    [{'etag': etag, 'columns': json.dumps(columns)} for etag, columns in headers.items()]
+                )
+                session.commit()
+            finally:
+                session.close()
+        except SQLAlchemyError as e:
+            logger.warning(f"⚠️ Could not persist header cache: {e}")
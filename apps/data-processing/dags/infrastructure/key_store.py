@@ -0,0 +1,207 @@
+"""
+Infrastructure Layer: Hashed Key Stores
+Compact sets of 64-bit key hashes (each with one float value) used to track
+unique keys across a run, in memory or spilled to a local SQLite file
+"""
+import contextlib
+import os
+import shutil
+import sqlite3
+import tempfile
+from typing import Optional, Tuple
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Slot marker for the open-addressing table; a real hash of 0 is stored as 1
+EMPTY_SLOT = np.uint64(0)
+
+
+def _normalize(hashes: np.ndarray) -> np.ndarray:
+    hashes = np.asarray(hashes, dtype=np.uint64)
+    return np.where(hashes == EMPTY_SLOT, np.uint64(1), hashes)
+
+
+class InMemoryKeyStore:
+    """Open-addressing hash table of uint64 key hashes with a float64 value each
+
+    Lookups and inserts are vectorized over a whole chunk with linear
+    probing, at 16 bytes per slot and at most half the slots in use.
+    """
+
+    MAX_LOAD_FACTOR = 0.5
+
+    def __init__(self, initial_capacity: int = 1 << 16):
+        capacity = 1 << max(4, int(initial_capacity - 1).bit_length())
+        self._keys = np.zeros(capacity, dtype=np.uint64)
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return self._keys.nbytes + self._values.nbytes
+
+    def lookup(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Which hashes are present, and their values (0.0 where absent)"""
+        hashes = _normalize(hashes)
+        slots = self._probe(hashes)
+        found = self._keys[slots] == hashes
+        return found, np.where(found, self._values[slots], 0.0)
+
+    def upsert(self, hashes: np.ndarray, values: np.ndarray) -> None:
+        """Insert or overwrite; hashes must be unique within the call"""
+        hashes = _normalize(hashes)
+        values = np.asarray(values, dtype=np.float64)
+        self._reserve(len(hashes))
+
+        pending = np.arange(len(hashes))
+        while pending.size:
+            slots = self._probe(hashes[pending])
+            existing = self._keys[slots] == hashes[pending]
+            self._values[slots[existing]] = values[pending[existing]]
+
+            # Several new hashes can probe to the same empty slot: the first claims it, the rest probe on
+            new_pending = pending[~existing]
+            new_slots = slots[~existing]
+            claimed_slots, first = np.unique(new_slots, return_index=True)
+            self._keys[claimed_slots] = hashes[new_pending[first]]
+            self._values[claimed_slots] = values[new_pending[first]]
+            self._size += len(claimed_slots)
+
+            retry = np.ones(len(new_pending), dtype=bool)
+            retry[first] = False
+            pending = new_pending[retry]
+
+    def items(self) -> Tuple[np.ndarray, np.ndarray]:
+        """All stored hashes and values"""
+        used = self._keys != EMPTY_SLOT
+        return self._keys[used], self._values[used]
+
+    def close(self) -> None:
+        self._keys = np.zeros(16, dtype=np.uint64)
+        self._values = np.zeros(16, dtype=np.float64)
+        self._size = 0
+
+    def _probe(self, hashes: np.ndarray) -> np.ndarray:
+        """Slot holding each hash, or the empty slot where its probe sequence ends"""
+        mask = np.uint64(len(self._keys) - 1)
+        slots = (hashes & mask).astype(np.int64)
+        result = np.empty(len(hashes), dtype=np.int64)
+        pending = np.arange(len(hashes))
+        while pending.size:
+            candidate = slots[pending]
+            current = self._keys[candidate]
+            done = (current == hashes[pending]) | (current == EMPTY_SLOT)
+            result[pending[done]] = candidate[done]
+            pending = pending[~done]
+            slots[pending] = (slots[pending] + 1) & int(mask)
+        return result
+
+    def _reserve(self, additional: int) -> None:
+        capacity = len(self._keys)
+        if self._size + additional <= capacity * self.MAX_LOAD_FACTOR:
+            return
+        while self._size + additional > capacity * self.MAX_LOAD_FACTOR:
+            capacity *= 2
+
+        keys, values = self.items()
+        self._keys = np.zeros(capacity, dtype=np.uint64)
+        self._values = np.zeros(capacity, dtype=np.float64)
+        self._size = 0
+        if len(keys):
+            self.upsert(keys, values)
+
+
+class SQLiteKeyStore:
+    """Disk-backed key store for inputs whose key set does not fit the memory budget"""
+
+    QUERY_BATCH_SIZE = 500  # Stays under SQLite's bound-parameter limit
+
+    def __init__(self, directory: Optional[str] = None):
+        self._workdir = tempfile.mkdtemp(prefix='egrid_keys_', dir=directory)
+        self._connection = sqlite3.connect(os.path.join(self._workdir, 'keys.sqlite'))
+        self._connection.execute("PRAGMA journal_mode = OFF")
+        self._connection.execute("PRAGMA synchronous = OFF")
+        self._connection.execute("CREATE TABLE keys (h INTEGER PRIMARY KEY, v REAL NOT NULL)")
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        # SQLite integers are signed: store the same 64 bits as int64
+        signed = _normalize(hashes).view(np.int64).tolist()
+        stored = {}
+        for start in range(0, len(signed), self.QUERY_BATCH_SIZE):
+            batch = signed[start:start + self.QUERY_BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            stored.update(self._connection.execute(
+                f"SELECT h, v FROM keys WHERE h IN ({placeholders})", batch
+            ).fetchall())
+
+        found = np.fromiter((h in stored for h in signed), dtype=bool, count=len(signed))
+        values = np.fromiter((stored.get(h, 0.0) for h in signed), dtype=np.float64, count=len(signed))
+        return found, values
+
+    def upsert(self, hashes: np.ndarray, values: np.ndarray) -> None:
+        rows = list(zip(
+            np.asarray(values, dtype=np.float64).tolist(),
+            _normalize(hashes).view(np.int64).tolist()
+        ))
+        with self._connection:
+            # Inserts first so the change count is the number of new keys
+            before = self._connection.total_changes
+            self._connection.executemany("INSERT OR IGNORE INTO keys (v, h) VALUES (?, ?)", rows)
+            self._size += self._connection.total_changes - before
+            self._connection.executemany("UPDATE keys SET v = ? WHERE h = ?", rows)
+
+    def close(self) -> None:
+        try:
+            self._connection.close()
+        finally:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+
+
+class SpillingKeyStore:
+    """Key store that starts in memory and moves to SQLite past max_memory_keys"""
+
+    def __init__(self, max_memory_keys: int, spill_dir: Optional[str] = None):
+        self.max_memory_keys = max_memory_keys
+        self.spill_dir = spill_dir
+        self._store = InMemoryKeyStore()
+
+    def __len__(self) -> int:
+        return len(self._store)
+
+    @property
+    def spilled(self) -> bool:
+        return isinstance(self._store, SQLiteKeyStore)
+
+    def lookup(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        return self._store.lookup(hashes)
+
+    def upsert(self, hashes: np.ndarray, values: np.ndarray) -> None:
+        if not self.spilled and len(self._store) + len(hashes) > self.max_memory_keys:
+            self._spill()
+        self._store.upsert(hashes, values)
+
+    def hold(self) -> contextlib.AbstractContextManager:
+        """No-op: a local store is only used by one processor"""
+        return contextlib.nullcontext()
+
+    def close(self) -> None:
+        self._store.close()
+        self._store = InMemoryKeyStore()
+
+    def _spill(self) -> None:
+        keys, values = self._store.items()
+        logger.info(f"💽 Key set passed {self.max_memory_keys} keys, spilling {len(keys)} keys to disk")
+        disk_store = SQLiteKeyStore(self.spill_dir)
+        disk_store.upsert(keys, values)
+        self._store.close()
+        self._store = disk_store
@@ -0,0 +1,294 @@
+"""
+Infrastructure Layer: Bulk Load Policy
+Drops the target table's secondary indexes ahead of a load that is large
+relative to the table, rebuilds them afterwards and refreshes statistics
+"""
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import text
+import logging
+
+from infrastructure.db_client import DatabaseClient
+
+logger = logging.getLogger(__name__)
+
+
+class LoadPolicyConfig:
+    """Configuration for index deferral and ANALYZE around loads using environment variables"""
+    def __init__(self):
+        self.defer_indexes = os.environ.get('ETL_INDEX_DEFER_ENABLED', 'true').lower() == 'true'
+        # Defer when a run's estimated rows reach this share of the table's rows...
+        self.defer_ratio = float(os.environ.get('ETL_INDEX_DEFER_RATIO', '0.25'))
+        # ...and at least this many rows, below which index upkeep is cheap anyway
+        self.defer_min_rows = int(os.environ.get('ETL_INDEX_DEFER_MIN_ROWS', '100000'))
+        # Rebuild with CREATE INDEX CONCURRENTLY when the table already served rows
+        self.rebuild_concurrently = os.environ.get('ETL_INDEX_REBUILD_CONCURRENTLY', 'true').lower() == 'true'
+        self.analyze_after_load = os.environ.get('ETL_ANALYZE_AFTER_LOAD', 'true').lower() == 'true'
+
+
+class BulkLoadPolicy:
+    """Infrastructure adapter deciding how a run's load treats the target's indexes
+
+    prepare() compares the run's estimated rows with the table's planner
+    row estimate. Above the threshold, every index that backs no
+    constraint is dropped; the unique key stays, since the merge's
+    ON CONFLICT needs it. Definitions are recorded in etl_deferred_index
+    in the same transaction as the drop, so finish() rebuilds them even
+    after a failed or interrupted run. A partitioned index is rebuilt
+    concurrently per partition and attached to its parent. finish() then
+    runs ANALYZE on the year partitions (or the table) the run wrote, and
+    on the partitioned parent, which autovacuum never analyzes.
+    """
+
+    TABLE_NAME = 'etl_deferred_index'
+
+    # Run on first use, for databases created before the script existed
+    INIT_SCRIPT = '10_create_etl_deferred_index.sql'
+
+    def __init__(
+        self,
+        db_client: DatabaseClient,
+        table_name: str = 'egrid_data',
+        config: Optional[LoadPolicyConfig] = None
+    ):
+        self.db_client = db_client
+        self.table_name = table_name
+        self.config = config or LoadPolicyConfig()
+
+    def ensure_table(self) -> None:
+        """Create the deferred index table if it does not exist yet"""
+        self.db_client.apply_init_script(self.INIT_SCRIPT)
+
+    def table_rows(self) -> int:
+        """Planner row estimate of the table, summed over its partitions"""
+        session = self.db_client.get_session()
+        try:
+            return int(session.execute(
+                text("""
+                    SELECT COALESCE(sum(GREATEST(c.reltuples, 0)), 0)
+                    FROM pg_class c
+                    WHERE c.oid = to_regclass(:table)
+                       OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(:table))
+                """),
+                {'table': self.table_name}
+            ).scalar())
+        finally:
+            session.close()
+
+    def prepare(self, estimated_rows: int) -> Dict[str, Any]:
+        """Decide on (and apply) index deferral for a load of about estimated_rows"""
+        self.ensure_table()
+        table_rows = self.table_rows()
+        decision = {
+            'estimated_rows': estimated_rows,
+            'table_rows': table_rows,
+            'indexes_deferred': [],
+            'already_deferred': self.pending(),
+        }
+        large = (
+            estimated_rows >= self.config.defer_min_rows
+            and estimated_rows >= self.config.defer_ratio * table_rows
+        )
+        if not self.config.defer_indexes or not large:
+            decision['action'] = 'maintain_indexes'
+            logger.info(
+                f"📇 Keeping indexes on {self.table_name}: ~{estimated_rows} rows into ~{table_rows}"
+            )
+            return decision
+
+        started = time.monotonic()
+        session = self.db_client.get_session()
+        try:
+            indexes = session.execute(
+                text("""
+                    SELECT c.relname AS index_name, pg_get_indexdef(x.indexrelid) AS definition
+                    FROM pg_index x
+                    JOIN pg_class c ON c.oid = x.indexrelid
+                    WHERE x.indrelid = to_regclass(:table)
+                      AND NOT EXISTS (SELECT 1 FROM pg_constraint con WHERE con.conindid = x.indexrelid)
+                """),
+                {'table': self.table_name}
+            ).mappings().all()
+            for index in indexes:
+                session.execute(
+                    text(f"""
+                        INSERT INTO {self.TABLE_NAME} (index_name, table_name, definition, concurrently)
+                        VALUES (:index_name, :table_name, :definition, :concurrently)
+                        ON CONFLICT (index_name) DO NOTHING
+                    """),
+                    {
+                        'index_name': index['index_name'],
+                        'table_name': self.table_name,
+                        'definition': index['definition'],
+                        'concurrently': self.config.rebuild_concurrently and table_rows > 0
+                    }
+                )
+                session.execute(text(f"DROP INDEX IF EXISTS {index['index_name']}"))
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+        decision['action'] = 'defer_indexes'
+        decision['indexes_deferred'] = [index['index_name'] for index in indexes]
+        decision['drop_seconds'] = round(time.monotonic() - started, 2)
+        logger.info(
+            f"📇 Deferred {len(indexes)} indexes on {self.table_name} for ~{estimated_rows} rows "
+            f"into ~{table_rows}: {', '.join(decision['indexes_deferred']) or 'none'}"
+        )
+        return decision
+
+    def pending(self) -> List[str]:
+        """Deferred indexes not rebuilt yet"""
+        self.ensure_table()
+        session = self.db_client.get_session()
+        try:
+            return list(session.execute(
+                text(f"SELECT index_name FROM {self.TABLE_NAME} WHERE table_name = :table ORDER BY deferred_at"),
+                {'table': self.table_name}
+            ).scalars())
+        finally:
+            session.close()
+
+    def finish(self, partitions: Iterable[Tuple[str, int]]) -> Dict[str, Any]:
+        """Rebuild deferred indexes, then ANALYZE what the load wrote
+
+        partitions are the (state, year) pairs the run loaded; without any,
+        nothing was written and statistics are left alone.
+        """
+        self.ensure_table()
+        result: Dict[str, Any] = {'indexes_rebuilt': [], 'rebuild_seconds': 0.0, 'analyzed': [], 'analyze_seconds': 0.0}
+
+        session = self.db_client.get_session()
+        try:
+            deferred = session.execute(
+                text(f"""
+                    SELECT index_name, definition, concurrently FROM {self.TABLE_NAME}
+                    WHERE table_name = :table ORDER BY deferred_at
+                """),
+                {'table': self.table_name}
+            ).mappings().all()
+        finally:
+            session.close()
+
+        started = time.monotonic()
+        for index in deferred:
+            index_started = time.monotonic()
+            self._rebuild(index['index_name'], index['definition'], index['concurrently'])
+            self._forget(index['index_name'])
+            result['indexes_rebuilt'].append(index['index_name'])
+            logger.info(
+                f"📇 Rebuilt {index['index_name']}"
+                + (" concurrently" if index['concurrently'] else "")
+                + f" in {time.monotonic() - index_started:.1f}s"
+            )
+        result['rebuild_seconds'] = round(time.monotonic() - started, 2)
+
+        years = sorted({int(year) for _, year in partitions})
+        if self.config.analyze_after_load and years:
+            started = time.monotonic()
+            tables = self._year_tables(years)
+            with self.db_client.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+                if tables != [self.table_name]:
+                    # Planner estimates across years come from the parent's statistics
+                    if connection.dialect.server_version_info >= (18,):
+                        tables.append(f"ONLY {self.table_name}")
+                    else:
+                        # Before PostgreSQL 18 the parent cannot be analyzed alone; this covers every partition
+                        tables = [self.table_name]
+                for table in tables:
+                    connection.exec_driver_sql(f"ANALYZE {table}")
+            result['analyzed'] = tables
+            result['analyze_seconds'] = round(time.monotonic() - started, 2)
+            logger.info(f"📈 Analyzed {len(tables)} tables in {result['analyze_seconds']}s: {', '.join(tables)}")
+        return result
+
+    def _rebuild(self, index_name: str, definition: str, concurrently: bool) -> None:
+        """Recreate one index from its pg_get_indexdef() definition"""
+        # "CREATE INDEX name ON [ONLY] schema.table USING ..." -> the part after the table
+        match = re.match(r'CREATE (UNIQUE )?INDEX \S+ ON (ONLY )?(\S+)( USING .*)$', definition)
+        unique, on_only, table, method_and_columns = match.groups()
+        unique = unique or ''
+
+        with self.db_client.engine.connect().execution_options(isolation_level='AUTOCOMMIT') as connection:
+            self._drop_if_invalid(connection, index_name)
+            if not concurrently:
+                # Non-concurrent CREATE INDEX on a partitioned table builds every partition's index too
+                connection.exec_driver_sql(
+                    f"CREATE {unique}INDEX IF NOT EXISTS {index_name} ON {table}{method_and_columns}"
+                )
+                return
+            if not on_only:
+                connection.exec_driver_sql(
+                    f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {table}{method_and_columns}"
+                )
+                return
+
+            # Partitioned tables cannot index concurrently: index each partition, then attach
+            connection.exec_driver_sql(
+                f"CREATE {unique}INDEX IF NOT EXISTS {index_name} ON ONLY {table}{method_and_columns}"
+            )
+            partitions = connection.execute(
+                text("""
+                    SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass(:table)
+                      AND NOT EXISTS (
+                          SELECT 1 FROM pg_inherits attached
+                          WHERE attached.inhparent = to_regclass(:index)
+                            AND attached.inhrelid IN (SELECT indexrelid FROM pg_index WHERE indrelid = c.oid)
+                      )
+                """),
+                {'table': table, 'index': index_name}
+            ).scalars().all()
+            for partition in partitions:
+                partition_index = f"{partition}_{index_name}"[:63]
+                self._drop_if_invalid(connection, partition_index)
+                connection.exec_driver_sql(
+                    f"CREATE {unique}INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition}{method_and_columns}"
+                )
+                connection.exec_driver_sql(f"ALTER INDEX {index_name} ATTACH PARTITION {partition_index}")
+
+    @staticmethod
+    def _drop_if_invalid(connection, index_name: str) -> None:
+        """Drop what an interrupted concurrent build left behind, so IF NOT EXISTS does not keep it"""
+        invalid = connection.execute(
+            text("""
+                SELECT 1 FROM pg_index x JOIN pg_class c ON c.oid = x.indexrelid
+                WHERE x.indexrelid = to_regclass(:index) AND NOT x.indisvalid AND c.relkind = 'i'
+            """),
+            {'index': index_name}
+        ).first()
+        if invalid is not None:
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index_name}")
+
+    def _forget(self, index_name: str) -> None:
+        session = self.db_client.get_session()
+        try:
+            session.execute(text(f"DELETE FROM {self.TABLE_NAME} WHERE index_name = :index_name"), {'index_name': index_name})
+            session.commit()
+        finally:
+            session.close()
+
+    def _year_tables(self, years: List[int]) -> List[str]:
+        """Year partitions holding the given years, or the table itself when it is not partitioned"""
+        session = self.db_client.get_session()
+        try:
+            tables = list(session.execute(
+                text("""
+                    SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid
+                    WHERE i.inhparent = to_regclass(:table)
+                      AND pg_get_expr(c.relpartbound, c.oid) = ANY(:bounds)
+                    ORDER BY c.relname
+                """),
+                {
+                    'table': self.table_name,
+                    'bounds': [f"FOR VALUES FROM ({year}) TO ({year + 1})" for year in years]
+                }
+            ).scalars())
+        finally:
+            session.close()
+        return tables or [self.table_name]
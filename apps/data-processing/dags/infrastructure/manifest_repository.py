@@ -0,0 +1,294 @@
+"""
+Infrastructure Layer: Ingested File Manifest Repository
+Persists per-object load status in Postgres so unchanged files can be skipped
+"""
+from datetime import datetime
+from typing import Dict, Any, Iterable, List, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+import logging
+
+from domain.models.e_grid_data import FileInfo, LoadResult
+from infrastructure.db_client import DatabaseClient
+
+logger = logging.getLogger(__name__)
+
+
+class FileManifestRepository:
+    """Infrastructure adapter for the etl_file_manifest table"""
+
+    TABLE_NAME = 'etl_file_manifest'
+
+    # Run on first use, for databases created before the script existed
+    INIT_SCRIPT = '05_create_etl_manifest.sql'
+
+    STATUS_PROCESSING = 'processing'
+    STATUS_LOADED = 'loaded'
+    STATUS_FAILED = 'failed'
+
+    def __init__(self, db_client: DatabaseClient):
+        self.db_client = db_client
+
+    def ensure_table(self) -> None:
+        """Create the manifest table if it does not exist yet"""
+        self.db_client.apply_init_script(self.INIT_SCRIPT)
+
+    def get_entries(self, bucket: str) -> Dict[str, Dict[str, Any]]:
+        """Return manifest entries for a bucket keyed by object key"""
+        self.ensure_table()
+
+        session = self.db_client.get_session()
+        try:
+            rows = session.execute(
+                text(f"""
+                    SELECT object_key, etag, size_bytes, last_modified, status
+                    FROM {self.TABLE_NAME}
+                    WHERE bucket = :bucket
+                """),
+                {'bucket': bucket}
+            ).mappings().all()
+            return {row['object_key']: dict(row) for row in rows}
+        finally:
+            session.close()
+
+    def get_entry(self, file_info: FileInfo) -> Optional[Dict[str, Any]]:
+        """Return the manifest entry of one object, if any"""
+        self.ensure_table()
+
+        session = self.db_client.get_session()
+        try:
+            row = session.execute(
+                text(f"""
+                    SELECT object_key, etag, size_bytes, last_modified, status
+                    FROM {self.TABLE_NAME}
+                    WHERE bucket = :bucket AND object_key = :object_key
+                """),
+                {'bucket': file_info.bucket, 'object_key': file_info.key}
+            ).mappings().first()
+            return dict(row) if row is not None else None
+        finally:
+            session.close()
+
+    def filter_changed(self, files: Iterable[FileInfo]) -> List[FileInfo]:
+        """Return only files that are new, changed, or not successfully loaded"""
+        entries_by_bucket: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        changed = []
+
+        for file_info in files:
+            if file_info.bucket not in entries_by_bucket:
+                entries_by_bucket[file_info.bucket] = self.get_entries(file_info.bucket)
+
+            entry = entries_by_bucket[file_info.bucket].get(file_info.key)
+            if entry is None or not self._is_unchanged(file_info, entry):
+                changed.append(file_info)
+
+        return changed
+
+    @staticmethod
+    def _is_unchanged(file_info: FileInfo, entry: Dict[str, Any]) -> bool:
+        """Business rule: a loaded object with the same identity is not reprocessed"""
+        return (
+            entry['status'] == FileManifestRepository.STATUS_LOADED
+            and entry['etag'] == file_info.etag
+            and entry['size_bytes'] == file_info.size
+            and entry['last_modified'] == file_info.last_modified
+        )
+
+    def mark_started(self, file_info: FileInfo) -> None:
+        """Record that processing of an object has started"""
+        self._upsert(file_info, {
+            'status': self.STATUS_PROCESSING,
+            'started_at': datetime.utcnow(),
+            'finished_at': None,
+            'duration_ms': None,
+            'error_message': None,
+        })
+
+    def mark_loaded(
+        self,
+        file_info: FileInfo,
+        load_result: LoadResult,
+        rows_rejected: int,
+        duration_ms: int
+    ) -> None:
+        """Record a successful load with row counts and timing"""
+        self._upsert(file_info, {
+            'status': self.STATUS_LOADED,
+            'rows_loaded': load_result.total_loaded(),
+            'rows_inserted': load_result.inserted,
+            'rows_updated': load_result.updated,
+            'rows_skipped': load_result.skipped,
+            'rows_rejected': rows_rejected,
+            'shards_total': 1,
+            'shards_done': 1,
+            'loaded_shards': [0],
+            'failed_shards': [],
+            'finished_at': datetime.utcnow(),
+            'duration_ms': duration_ms,
+            'error_message': None,
+        })
+
+    def mark_sharded(self, file_info: FileInfo, shard_count: int) -> None:
+        """Reset counters before the shards of a file are processed independently"""
+        self._upsert(file_info, {
+            'status': self.STATUS_PROCESSING,
+            'rows_loaded': 0,
+            'rows_inserted': 0,
+            'rows_updated': 0,
+            'rows_skipped': 0,
+            'rows_rejected': 0,
+            'shards_total': shard_count,
+            'shards_done': 0,
+            'loaded_shards': [],
+            'failed_shards': [],
+            'started_at': datetime.utcnow(),
+            'finished_at': None,
+            'duration_ms': 0,
+            'error_message': None,
+        })
+
+    def mark_shard_loaded(
+        self,
+        file_info: FileInfo,
+        shard_index: int,
+        load_result: LoadResult,
+        rows_rejected: int,
+        duration_ms: int
+    ) -> None:
+        """Add one shard's counts; the file becomes loaded once every shard has loaded
+
+        A shard that failed earlier and now loads (a retried task) clears
+        its failure, so the file is not left failed after all shards load.
+        """
+        self._update_shard(file_info, """
+            rows_loaded = rows_loaded + :rows_loaded,
+            rows_inserted = rows_inserted + :rows_inserted,
+            rows_updated = rows_updated + :rows_updated,
+            rows_skipped = rows_skipped + :rows_skipped,
+            rows_rejected = rows_rejected + :rows_rejected,
+            duration_ms = COALESCE(duration_ms, 0) + :duration_ms,
+            loaded_shards = CASE
+                WHEN :shard = ANY(loaded_shards) THEN loaded_shards
+                ELSE array_append(loaded_shards, :shard)
+            END,
+            failed_shards = array_remove(failed_shards, :shard),
+            shards_done = cardinality(array_remove(loaded_shards, :shard)) + 1,
+            status = CASE
+                WHEN cardinality(array_remove(failed_shards, :shard)) > 0 THEN :failed
+                WHEN cardinality(array_remove(loaded_shards, :shard)) + 1 >= shards_total THEN :loaded
+                ELSE :processing
+            END,
+            finished_at = CASE
+                WHEN cardinality(array_remove(loaded_shards, :shard)) + 1 >= shards_total THEN :now
+                ELSE finished_at
+            END,
+            error_message = CASE
+                WHEN cardinality(array_remove(failed_shards, :shard)) > 0 THEN error_message
+            END
+        """, {
+            'shard': shard_index,
+            'rows_loaded': load_result.total_loaded(),
+            'rows_inserted': load_result.inserted,
+            'rows_updated': load_result.updated,
+            'rows_skipped': load_result.skipped,
+            'rows_rejected': rows_rejected,
+            'duration_ms': duration_ms,
+            'failed': self.STATUS_FAILED,
+            'loaded': self.STATUS_LOADED,
+            'processing': self.STATUS_PROCESSING,
+            'now': datetime.utcnow(),
+        })
+
+    def mark_shard_failed(
+        self,
+        file_info: FileInfo,
+        shard_index: int,
+        error_message: str,
+        duration_ms: int
+    ) -> None:
+        """Record a failed shard; the file stays failed until that shard loads"""
+        self._update_shard(file_info, """
+            loaded_shards = array_remove(loaded_shards, :shard),
+            failed_shards = CASE
+                WHEN :shard = ANY(failed_shards) THEN failed_shards
+                ELSE array_append(failed_shards, :shard)
+            END,
+            shards_done = cardinality(array_remove(loaded_shards, :shard)),
+            status = :failed,
+            duration_ms = COALESCE(duration_ms, 0) + :duration_ms,
+            finished_at = :now,
+            error_message = :error_message
+        """, {
+            'shard': shard_index,
+            'error_message': error_message,
+            'duration_ms': duration_ms,
+            'failed': self.STATUS_FAILED,
+            'now': datetime.utcnow(),
+        })
+
+    def mark_failed(self, file_info: FileInfo, error_message: str, duration_ms: int) -> None:
+        """Record a failed load so the object is retried on the next scan"""
+        self._upsert(file_info, {
+            'status': self.STATUS_FAILED,
+            'finished_at': datetime.utcnow(),
+            'duration_ms': duration_ms,
+            'error_message': error_message,
+        })
+
+    def _update_shard(self, file_info: FileInfo, assignments: str, params: Dict[str, Any]) -> None:
+        """Apply one shard's outcome to the file's manifest row"""
+        self.ensure_table()
+
+        session = self.db_client.get_session()
+        try:
+            session.execute(
+                text(f"""
+                    UPDATE {self.TABLE_NAME}
+                    SET {assignments}, updated_at = CURRENT_TIMESTAMP
+                    WHERE bucket = :bucket AND object_key = :object_key
+                """),
+                {'bucket': file_info.bucket, 'object_key': file_info.key, **params}
+            )
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"❌ Error updating manifest for shard of {file_info.key}: {e}")
+            raise
+        finally:
+            session.close()
+
+    def _upsert(self, file_info: FileInfo, values: Dict[str, Any]) -> None:
+        """Insert or update the manifest row for an object"""
+        self.ensure_table()
+
+        params = {
+            'bucket': file_info.bucket,
+            'object_key': file_info.key,
+            'etag': file_info.etag,
+            'size_bytes': file_info.size,
+            'last_modified': file_info.last_modified,
+            **values
+        }
+        columns = list(params.keys())
+        updates = ', '.join(
+            f"{col} = EXCLUDED.{col}" for col in columns if col not in ('bucket', 'object_key')
+        )
+
+        session = self.db_client.get_session()
+        try:
+            session.execute(
+                text(f"""
+                    INSERT INTO {self.TABLE_NAME} ({', '.join(columns)})
+                    VALUES ({', '.join(f':{col}' for col in columns)})
+                    ON CONFLICT (bucket, object_key) DO UPDATE
+                    SET {updates}, updated_at = CURRENT_TIMESTAMP
+                """),
+                params
+            )
+            session.commit()
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"❌ Error updating manifest for {file_info.key}: {e}")
+            raise
+        finally:
+            session.close()
@@ -0,0 +1,209 @@
+"""
+Infrastructure Layer: Pipeline Metrics
+Prometheus counters and histograms for the ETL hot paths, exported by
+Pushgateway push and/or a node-exporter textfile
+"""
+import os
+import resource
+import sys
+from typing import Dict, Optional
+import logging
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    push_to_gateway,
+    write_to_textfile
+)
+
+from domain.models.e_grid_data import LoadResult, ProcessingReport
+
+logger = logging.getLogger(__name__)
+
+# Chunk latencies: CHUNK_SIZE rows take milliseconds to seconds
+CHUNK_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Whole files: seconds to the length of the hourly schedule
+FILE_DURATION_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600)
+
+
+class MetricsConfig:
+    """Configuration for metrics export using environment variables"""
+    def __init__(self):
+        # e.g. http://pushgateway:9091; empty disables pushing
+        self.pushgateway_url = os.environ.get('ETL_METRICS_PUSHGATEWAY', '')
+        # Directory scraped by node-exporter's textfile collector; empty disables it
+        self.textfile_dir = os.environ.get('ETL_METRICS_TEXTFILE_DIR', '')
+        self.job_name = os.environ.get('ETL_METRICS_JOB', 'etl_pipeline')
+
+    def is_enabled(self) -> bool:
+        return bool(self.pushgateway_url or self.textfile_dir)
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process right now (falls back to the peak)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes() -> int:
+    """Peak resident set size of this process since it started"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class PipelineMetrics:
+    """Infrastructure adapter collecting per-process pipeline metrics
+
+    Each Airflow task runs in its own process, so metrics live in a private
+    registry and are pushed once per batch instead of being scraped.
+    """
+
+    def __init__(self, config: Optional[MetricsConfig] = None):
+        self.config = config or MetricsConfig()
+        self.registry = CollectorRegistry()
+        self._file_peak_rss = 0
+        self._file_rows = 0
+        self._file_bytes = 0
+
+        self.download_bytes = Counter(
+            'etl_download_bytes', 'Bytes streamed from object storage', registry=self.registry
+        )
+        self.rows_parsed = Counter(
+            'etl_rows_parsed', 'CSV data rows parsed', registry=self.registry
+        )
+        self.rows_rejected = Counter(
+            'etl_rows_rejected', 'Rows rejected by validation rules', ['reason'], registry=self.registry
+        )
+        self.rows_loaded = Counter(
+            'etl_rows_loaded', 'Rows written to the database', ['result'], registry=self.registry
+        )
+        self.files_processed = Counter(
+            'etl_files_processed', 'Files or shards processed', ['status'], registry=self.registry
+        )
+        self.chunk_transform_seconds = Histogram(
+            'etl_chunk_transform_seconds', 'Transform latency per chunk',
+            buckets=CHUNK_LATENCY_BUCKETS, registry=self.registry
+        )
+        self.chunk_load_seconds = Histogram(
+            'etl_chunk_load_seconds', 'Database load latency per chunk',
+            buckets=CHUNK_LATENCY_BUCKETS, registry=self.registry
+        )
+        self.file_duration_seconds = Histogram(
+            'etl_file_duration_seconds', 'Wall-clock time per file or shard',
+            buckets=FILE_DURATION_BUCKETS, registry=self.registry
+        )
+        self.file_rows_per_second = Gauge(
+            'etl_file_rows_per_second', 'Rows parsed per second for the last file', registry=self.registry
+        )
+        self.file_bytes_per_second = Gauge(
+            'etl_file_bytes_per_second', 'Bytes streamed per second for the last file', registry=self.registry
+        )
+        self.file_peak_rss_bytes = Gauge(
+            'etl_file_peak_rss_bytes', 'Peak resident memory sampled while processing the last file',
+            registry=self.registry
+        )
+        self.process_peak_rss_bytes = Gauge(
+            'etl_process_peak_rss_bytes', 'Peak resident memory of the task process', registry=self.registry
+        )
+
+    # Hot path: one call per chunk
+
+    def observe_download(self, num_bytes: int) -> None:
+        self.download_bytes.inc(num_bytes)
+        self._file_bytes += num_bytes
+
+    def observe_transform(self, rows_parsed: int, seconds: float, rejected: Dict[str, int]) -> None:
+        """Record a transformed chunk; rejected maps reason code -> row count"""
+        self.rows_parsed.inc(rows_parsed)
+        self._file_rows += rows_parsed
+        self.chunk_transform_seconds.observe(seconds)
+        for reason, count in rejected.items():
+            if count:
+                self.rows_rejected.labels(reason=reason).inc(count)
+        self._sample_memory()
+
+    def observe_load(self, load_result: LoadResult, seconds: float) -> None:
+        self.chunk_load_seconds.observe(seconds)
+        self.rows_loaded.labels(result='inserted').inc(load_result.inserted)
+        self.rows_loaded.labels(result='updated').inc(load_result.updated)
+        self.rows_loaded.labels(result='skipped').inc(load_result.skipped)
+        self.rows_loaded.labels(result='failed').inc(load_result.failed)
+
+    # Per file
+
+    def start_file(self) -> None:
+        self._file_peak_rss = current_rss_bytes()
+        self._file_rows = 0
+        self._file_bytes = 0
+
+    def finish_file(self, status: str, seconds: float) -> None:
+        """Record a finished file (or shard) with its throughput and memory peak"""
+        self._sample_memory()
+        self.files_processed.labels(status=status).inc()
+        self.file_duration_seconds.observe(seconds)
+        if seconds > 0:
+            self.file_rows_per_second.set(self._file_rows / seconds)
+            self.file_bytes_per_second.set(self._file_bytes / seconds)
+        self.file_peak_rss_bytes.set(self._file_peak_rss)
+        self.process_peak_rss_bytes.set(peak_rss_bytes())
+
+    def _sample_memory(self) -> None:
+        self._file_peak_rss = max(self._file_peak_rss, current_rss_bytes())
+
+    # Export
+
+    def push(self, grouping_key: Dict[str, str]) -> None:
+        """Export the registry; failures are logged and never fail the pipeline"""
+        self._export(self.registry, grouping_key)
+
+    def push_report(self, report: ProcessingReport, batches_processed: int) -> None:
+        """Export run-level gauges so overlapping or slowing runs are visible"""
+        registry = CollectorRegistry()
+        gauges = {
+            'etl_run_duration_seconds': ('Wall-clock duration of the last run', report.duration_minutes * 60),
+            'etl_run_records_processed': ('Records loaded by the last run', report.total_records_processed),
+            'etl_run_files_scanned': ('Files scanned by the last run', report.files_scanned),
+            'etl_run_files_invalid': ('Files rejected by validation in the last run', report.files_invalid),
+            'etl_run_batches_processed': ('Batches processed by the last run', batches_processed),
+            'etl_run_rows_dead_lettered': ('Rows rejected by the database in the last run', report.rows_dead_lettered),
+            'etl_run_chunk_rows': ('Rows per chunk the last run settled on', report.chunk_sizes.get('final_rows', 0)),
+            'etl_run_rows_unchanged': ('Rows delta loads left out as unchanged in the last run', report.delta.get('unchanged', 0)),
+            'etl_run_rows_deleted': ('Rows delta loads deleted in the last run', report.delta.get('deleted', 0)),
+        }
+        for name, (documentation, value) in gauges.items():
+            Gauge(name, documentation, registry=registry).set(value)
+        Gauge(
+            'etl_run_last_completed_timestamp_seconds', 'Unix time the last run completed', registry=registry
+        ).set_to_current_time()
+        self._export(registry, {'batch': 'report'})
+
+    def _export(self, registry: CollectorRegistry, grouping_key: Dict[str, str]) -> None:
+        if not self.config.is_enabled():
+            return
+
+        if self.config.pushgateway_url:
+            try:
+                push_to_gateway(
+                    self.config.pushgateway_url,
+                    job=self.config.job_name,
+                    registry=registry,
+                    grouping_key=grouping_key,
+                    timeout=5
+                )
+            except Exception as e:
+                logger.warning(f"⚠️ Could not push metrics to {self.config.pushgateway_url}: {e}")
+
+        if self.config.textfile_dir:
+            suffix = '_'.join(str(v) for v in grouping_key.values()) or 'default'
+            path = os.path.join(self.config.textfile_dir, f"{self.config.job_name}_{suffix}.prom")
+            try:
+                os.makedirs(self.config.textfile_dir, exist_ok=True)
+                write_to_textfile(path, registry)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not write metrics textfile {path}: {e}")
@@ -2,13 +2,18 @@
 Infrastructure Layer: MinIO/S3 Client Adapter
 Handles external storage interactions using centralized config
 """
+import io
 import os
+import queue
 import boto3
-from typing import List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Optional, Sequence
 from botocore.exceptions import ClientError
 import logging
 
 from domain.models.e_grid_data import FileInfo
+from infrastructure.compression import DecompressingReader, decompress_prefix
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
@@ -27,7 +32,93 @@ class MinIOConfig:
         self.access_key = os.environ.get('MINIO_ROOT_USER', 'minioadmin')
         self.secret_key = os.environ.get('MINIO_ROOT_PASSWORD', 'minioadmin123')
         self.bucket = os.environ.get('MINIO_BUCKET', 'egrid-data')
+        # Comma-separated disjoint prefixes (e.g. "year=2022/,year=2023/") listed in parallel
+        self.scan_prefixes = [
+            p.strip() for p in os.environ.get('MINIO_SCAN_PREFIXES', '').split(',') if p.strip()
+        ]
+        self.list_page_size = int(os.environ.get('MINIO_LIST_PAGE_SIZE', '1000'))
+        self.list_workers = int(os.environ.get('MINIO_LIST_WORKERS', '4'))
         self.secure = False  # Use HTTP for internal communication
+        # Streaming reads: 0 = single GET body, N > 0 = N concurrent ranged GETs
+        self.stream_parallel_parts = int(os.environ.get('MINIO_STREAM_PARALLEL_PARTS', '0'))
+        self.stream_part_size = int(os.environ.get('MINIO_STREAM_PART_SIZE', str(8 * 1024 * 1024)))
+        self.stream_buffer_size = int(os.environ.get('MINIO_STREAM_BUFFER_SIZE', str(1024 * 1024)))
+
+
+class _StreamingBodyReader(io.RawIOBase):
+    """Raw file-like adapter over a get_object StreamingBody"""
+    
+    def __init__(self, body):
+        self._body = body
+    
+    def readable(self) -> bool:
+        return True
+    
+    def readinto(self, buffer) -> int:
+        data = self._body.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+    
+    def close(self) -> None:
+        if not self.closed:
+            self._body.close()
+        super().close()
+
+
+class _RangedObjectReader(io.RawIOBase):
+    """Raw file-like reader that fetches an object with concurrent ranged GETs
+    
+    Up to ``parallelism`` parts are in flight at once; parts are returned in
+    order, so memory stays bounded at roughly parallelism * part_size.
+    """
+    
+    def __init__(self, client, bucket: str, key: str, start: int, end: int, part_size: int, parallelism: int):
+        self._client = client
+        self._bucket = bucket
+        self._key = key
+        self._end = end
+        self._part_size = part_size
+        self._parallelism = parallelism
+        self._executor = ThreadPoolExecutor(max_workers=parallelism)
+        self._pending = deque()
+        self._next_offset = start
+        self._current = memoryview(b'')
+    
+    def readable(self) -> bool:
+        return True
+    
+    def _fetch(self, start: int, end: int) -> bytes:
+        response = self._client.get_object(
+            Bucket=self._bucket,
+            Key=self._key,
+            Range=f'bytes={start}-{end}'
+        )
+        return response['Body'].read()
+    
+    def _fill_window(self) -> None:
+        while len(self._pending) < self._parallelism and self._next_offset < self._end:
+            end = min(self._next_offset + self._part_size, self._end) - 1
+            self._pending.append(self._executor.submit(self._fetch, self._next_offset, end))
+            self._next_offset = end + 1
+    
+    def readinto(self, buffer) -> int:
+        while not self._current:
+            self._fill_window()
+            if not self._pending:
+                return 0
+            self._current = memoryview(self._pending.popleft().result())
+        
+        n = min(len(buffer), len(self._current))
+        buffer[:n] = self._current[:n]
+        self._current = self._current[n:]
+        return n
+    
+    def close(self) -> None:
+        if not self.closed:
+            for future in self._pending:
+                future.cancel()
+            self._executor.shutdown(wait=False)
+        super().close()
 
 
 class MinIOClient:
@@ -50,33 +141,91 @@ class MinIOClient:
             )
         return self._client
     
-    def list_csv_files(self) -> List[FileInfo]:
-        """List all CSV files in the configured bucket"""
+    def list_csv_files(self, prefix: str = '', start_after: Optional[str] = None) -> List[FileInfo]:
+        """List all CSV files (plain or compressed) in the configured bucket (every page, not just the first)"""
         logger.info(f"🔍 Scanning bucket '{self.config.bucket}' for CSV files...")
         
+        if self.config.scan_prefixes and not prefix:
+            csv_files = list(self.iter_csv_files_partitioned(self.config.scan_prefixes, start_after))
+        else:
+            csv_files = list(self.iter_csv_files(prefix, start_after))
+        
+        logger.info(f"✅ Found {len(csv_files)} CSV files")
+        return csv_files
+    
+    def iter_csv_files(self, prefix: str = '', start_after: Optional[str] = None) -> Iterator[FileInfo]:
+        """Lazily yield CSV files page by page using the S3 paginator
+        
+        start_after is a key watermark: only keys sorting after it are listed.
+        """
+        params = {
+            'Bucket': self.config.bucket,
+            'PaginationConfig': {'PageSize': self.config.list_page_size}
+        }
+        if prefix:
+            params['Prefix'] = prefix
+        if start_after:
+            params['StartAfter'] = start_after
+        
         try:
-            response = self.client.list_objects_v2(Bucket=self.config.bucket)
-            csv_files = []
-            
-            if 'Contents' in response:
-                for obj in response['Contents']:
-                    if obj['Key'].lower().endswith('.csv'):
-                        file_info = FileInfo(
-                            key=obj['Key'],
-                            size=obj['Size'],
-                            last_modified=obj['LastModified'],
-                            bucket=self.config.bucket
-                        )
-                        csv_files.append(file_info)
-                        logger.info(f"📄 Found: {obj['Key']} ({obj['Size']} bytes)")
-            
-            logger.info(f"✅ Found {len(csv_files)} CSV files")
-            return csv_files
+            pages = 0
+            for page in self.client.get_paginator('list_objects_v2').paginate(**params):
+                pages += 1
+                for obj in page.get('Contents', []):
+                    file_info = FileInfo(
+                        key=obj['Key'],
+                        size=obj['Size'],
+                        last_modified=obj['LastModified'],
+                        bucket=self.config.bucket,
+                        etag=obj.get('ETag', '').strip('"') or None
+                    )
+                    if not file_info.is_csv_file():
+                        continue
+                    logger.debug(f"📄 Found: {obj['Key']} ({obj['Size']} bytes)")
+                    yield file_info
+            logger.debug(f"📚 Listed {pages} pages under prefix '{prefix}'")
             
         except ClientError as e:
             logger.error(f"❌ Error listing files: {e}")
             raise
     
+    def iter_csv_files_partitioned(
+        self,
+        prefixes: Sequence[str],
+        start_after: Optional[str] = None
+    ) -> Iterator[FileInfo]:
+        """List disjoint prefixes in parallel, yielding files as soon as any page arrives"""
+        results: "queue.Queue[object]" = queue.Queue()
+        done = object()
+        errors: List[BaseException] = []
+        
+        def list_prefix(prefix: str) -> None:
+            try:
+                # Prefixes sorting entirely after the watermark are listed in full
+                watermark = start_after if start_after and start_after > prefix else None
+                for file_info in self.iter_csv_files(prefix, watermark):
+                    results.put(file_info)
+            except BaseException as e:
+                errors.append(e)
+            finally:
+                results.put(done)
+        
+        workers = min(self.config.list_workers, len(prefixes)) or 1
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for prefix in prefixes:
+                executor.submit(list_prefix, prefix)
+            
+            finished = 0
+            while finished < len(prefixes):
+                item = results.get()
+                if item is done:
+                    finished += 1
+                    continue
+                yield item
+        
+        if errors:
+            raise errors[0]
+    
     def get_file_sample(self, file_info: FileInfo, sample_size: int = 1024) -> str:
         """Get a sample of file content for validation"""
         try:
@@ -91,6 +240,96 @@ class MinIOClient:
             logger.error(f"❌ Error reading file sample {file_info.key}: {e}")
             raise
     
+    def open_stream(self, file_info: FileInfo, start: int = 0, end: Optional[int] = None) -> io.BufferedReader:
+        """Open an object (or the byte range [start, end)) as a buffered, read-only stream
+        
+        Data is consumed straight from the network, so parsing overlaps with
+        transfer and no local disk is needed.
+        """
+        end = file_info.size if end is None else end
+        
+        try:
+            if self.config.stream_parallel_parts > 0 and end - start > self.config.stream_part_size:
+                raw = _RangedObjectReader(
+                    self.client,
+                    file_info.bucket,
+                    file_info.key,
+                    start,
+                    end,
+                    self.config.stream_part_size,
+                    self.config.stream_parallel_parts
+                )
+            else:
+                request = {'Bucket': file_info.bucket, 'Key': file_info.key}
+                if start > 0 or end < file_info.size:
+                    request['Range'] = f'bytes={start}-{end - 1}'
+                response = self.client.get_object(**request)
+                raw = _StreamingBodyReader(response['Body'])
+            
+            logger.info(f"📡 Streaming {file_info.key} bytes {start}-{end} ({end - start} bytes)")
+            return io.BufferedReader(raw, buffer_size=self.config.stream_buffer_size)
+            
+        except ClientError as e:
+            logger.error(f"❌ Error opening stream for {file_info.key}: {e}")
+            raise
+    
+    def open_csv_stream(self, file_info: FileInfo, start: int = 0, end: Optional[int] = None) -> io.BufferedReader:
+        """Open a CSV object as a stream of CSV bytes, decompressing compressed objects on the fly
+        
+        Compressed objects are streamed whole; their byte ranges cannot be
+        decompressed on their own.
+        """
+        codec = file_info.compression()
+        if codec is None:
+            return self.open_stream(file_info, start, end)
+        if start > 0 or (end is not None and end < file_info.size):
+            raise ValueError(f"Cannot read bytes {start}-{end} of compressed object {file_info.key}")
+        
+        logger.info(f"🗜️ Decompressing {file_info.key} ({codec}) while streaming")
+        return io.BufferedReader(
+            DecompressingReader(self.open_stream(file_info), codec),
+            buffer_size=self.config.stream_buffer_size
+        )
+    
+    def read_range(self, file_info: FileInfo, start: int, end: int) -> bytes:
+        """Read the raw bytes [start, end) of an object"""
+        end = min(end, file_info.size)
+        if start >= end:
+            return b''
+        
+        try:
+            response = self.client.get_object(
+                Bucket=file_info.bucket,
+                Key=file_info.key,
+                Range=f'bytes={start}-{end - 1}'
+            )
+            return response['Body'].read()
+            
+        except ClientError as e:
+            logger.error(f"❌ Error reading range {start}-{end} of {file_info.key}: {e}")
+            raise
+    
+    def read_header_line(self, file_info: FileInfo, initial_size: int = 1024, max_size: int = 1024 * 1024) -> str:
+        """Read the first line of an object, growing the range until a newline is found
+        
+        Of a compressed object, only as much is fetched as it takes to
+        decompress the first line (sizes count compressed bytes).
+        """
+        codec = file_info.compression()
+        size = initial_size
+        while True:
+            data = self.read_range(file_info, 0, size)
+            if codec is not None:
+                data = decompress_prefix(codec, data)
+            newline = data.find(b'\n')
+            if newline != -1:
+                return data[:newline].decode('utf-8-sig').rstrip('\r')
+            if size >= file_info.size:
+                return data.decode('utf-8-sig').rstrip('\r')
+            if size >= max_size:
+                raise ValueError(f"Header row of {file_info.key} exceeds {max_size} bytes")
+            size *= 2
+    
     def download_file(self, file_info: FileInfo, local_path: str) -> None:
         """Download file to local filesystem"""
         try:
@@ -105,6 +344,69 @@ class MinIOClient:
             logger.error(f"❌ Error downloading {file_info.key}: {e}")
             raise
     
+    def put_bytes(self, key: str, data: bytes, bucket: Optional[str] = None, content_type: str = 'application/octet-stream') -> None:
+        """Upload an in-memory object"""
+        bucket = bucket or self.config.bucket
+        try:
+            self.client.put_object(Bucket=bucket, Key=key, Body=data, ContentType=content_type)
+            logger.info(f"📤 Uploaded {key} ({len(data)} bytes) to {bucket}")
+            
+        except ClientError as e:
+            logger.error(f"❌ Error uploading {key}: {e}")
+            raise
+    
+    def get_bytes(self, key: str, bucket: Optional[str] = None) -> bytes:
+        """Download a whole object into memory"""
+        bucket = bucket or self.config.bucket
+        try:
+            response = self.client.get_object(Bucket=bucket, Key=key)
+            return response['Body'].read()
+            
+        except ClientError as e:
+            logger.error(f"❌ Error downloading {key}: {e}")
+            raise
+    
+    def upload_file(self, local_path: str, key: str, bucket: Optional[str] = None) -> None:
+        """Upload a local file (multipart for large files)"""
+        bucket = bucket or self.config.bucket
+        try:
+            self.client.upload_file(local_path, bucket, key)
+            logger.info(f"📤 Uploaded {local_path} to {bucket}/{key}")
+            
+        except ClientError as e:
+            logger.error(f"❌ Error uploading {key}: {e}")
+            raise
+    
+    def iter_keys(self, prefix: str, bucket: Optional[str] = None) -> Iterator[str]:
+        """Lazily yield every object key under a prefix"""
+        bucket = bucket or self.config.bucket
+        try:
+            paginator = self.client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
+                    yield obj['Key']
+                    
+        except ClientError as e:
+            logger.error(f"❌ Error listing {prefix}: {e}")
+            raise
+    
+    def delete_keys(self, keys: Sequence[str], bucket: Optional[str] = None) -> None:
+        """Delete objects in batches of the S3 DeleteObjects limit"""
+        bucket = bucket or self.config.bucket
+        keys = list(keys)
+        try:
+            for i in range(0, len(keys), 1000):
+                self.client.delete_objects(
+                    Bucket=bucket,
+                    Delete={'Objects': [{'Key': key} for key in keys[i:i + 1000]], 'Quiet': True}
+                )
+            if keys:
+                logger.info(f"🗑️ Deleted {len(keys)} objects from {bucket}")
+                
+        except ClientError as e:
+            logger.error(f"❌ Error deleting objects: {e}")
+            raise
+    
     def file_exists(self, key: str) -> bool:
         """Check if file exists in bucket"""
         try:
@@ -0,0 +1,229 @@
+"""
+Infrastructure Layer: Parquet Snapshot Store
+Writes cleaned records to MinIO as Parquet partitioned by year/state and
+reads them back without reparsing the source CSV
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from io import BytesIO
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from domain.models.e_grid_data import FileInfo, FileShard
+from infrastructure.minio_client import MinIOClient
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_SCHEMA = pa.schema([
+    ('gen_id', pa.string()),
+    ('year', pa.int64()),
+    ('state', pa.string()),
+    ('plant_name', pa.string()),
+    ('net_generation', pa.float64()),
+])
+
+
+class ParquetSnapshotConfig:
+    """Configuration for the curated Parquet snapshot using environment variables"""
+    def __init__(self):
+        self.prefix = os.environ.get('ETL_SNAPSHOT_PREFIX', 'curated/egrid_data').strip('/')
+        self.compression = os.environ.get('ETL_SNAPSHOT_COMPRESSION', 'zstd')
+        self.bucket = os.environ.get('ETL_SNAPSHOT_BUCKET', '') or None
+
+
+class SnapshotWriter:
+    """Writes one source file (or shard) as Parquet files, one per year/state partition
+
+    Chunks are appended to local per-partition writers; nothing is visible in
+    MinIO until commit() uploads the files and the source's manifest entry.
+    """
+
+    def __init__(self, store: 'ParquetSnapshotStore', file_info: FileInfo, shard: Optional[FileShard] = None):
+        self.store = store
+        self.file_info = file_info
+        self.shard_index = shard.shard_index if shard else 0
+        self.shard_count = shard.shard_count if shard else 1
+        self._workdir = tempfile.mkdtemp(prefix='egrid_snapshot_')
+        self._writers: Dict[Tuple[int, str], pq.ParquetWriter] = {}
+        self._stats: Dict[Tuple[int, str], Dict[str, Any]] = {}
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append a cleaned chunk (output columns) to its partitions"""
+        if df.empty:
+            return
+
+        for (year, state), part in df.groupby(['year', 'state'], sort=False):
+            partition = (int(year), str(state))
+            writer = self._writers.get(partition)
+            if writer is None:
+                writer = pq.ParquetWriter(
+                    os.path.join(self._workdir, f"{partition[0]}_{partition[1]}.parquet"),
+                    SNAPSHOT_SCHEMA,
+                    compression=self.store.config.compression
+                )
+                self._writers[partition] = writer
+                self._stats[partition] = {'rows': 0, 'net_generation_min': None, 'net_generation_max': None}
+
+            writer.write_table(pa.Table.from_pandas(
+                part[SNAPSHOT_SCHEMA.names], schema=SNAPSHOT_SCHEMA, preserve_index=False
+            ))
+            stats = self._stats[partition]
+            stats['rows'] += len(part)
+            low, high = float(part['net_generation'].min()), float(part['net_generation'].max())
+            stats['net_generation_min'] = low if stats['net_generation_min'] is None else min(stats['net_generation_min'], low)
+            stats['net_generation_max'] = high if stats['net_generation_max'] is None else max(stats['net_generation_max'], high)
+
+    def commit(self) -> Dict[str, Any]:
+        """Upload partition files, then publish the manifest entry that makes them visible"""
+        try:
+            for writer in self._writers.values():
+                writer.close()
+
+            files = []
+            for (year, state), stats in sorted(self._stats.items()):
+                key = self.store.partition_key(self.file_info, self.shard_index, year, state)
+                local_path = os.path.join(self._workdir, f"{year}_{state}.parquet")
+                self.store.minio_client.upload_file(local_path, key, self.store.bucket)
+                files.append({
+                    'key': key,
+                    'year': year,
+                    'state': state,
+                    'bytes': os.path.getsize(local_path),
+                    **stats
+                })
+
+            entry = {
+                'version': ParquetSnapshotStore.MANIFEST_VERSION,
+                'source': {
+                    'bucket': self.file_info.bucket,
+                    'key': self.file_info.key,
+                    'etag': self.file_info.etag,
+                    'size': self.file_info.size,
+                },
+                'shard_index': self.shard_index,
+                'shard_count': self.shard_count,
+                'written_at': datetime.utcnow().isoformat(),
+                'files': files,
+            }
+            self.store.publish(entry)
+            logger.info(
+                f"🧊 Snapshot of {self.file_info.key}: {len(files)} partitions, "
+                f"{sum(f['rows'] for f in files)} rows"
+            )
+            return entry
+        finally:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+
+    def abort(self) -> None:
+        """Discard local files; the previous snapshot of the source stays in place"""
+        for writer in self._writers.values():
+            try:
+                writer.close()
+            except Exception:
+                pass
+        shutil.rmtree(self._workdir, ignore_errors=True)
+
+
+class ParquetSnapshotStore:
+    """Infrastructure adapter for the curated year/state-partitioned Parquet snapshot
+
+    Layout under the prefix:
+        year=<year>/state=<state>/<source>-<key hash>-<etag>-<shard>.parquet
+        _manifest/<source>.<shard>.json   (files, row counts and statistics)
+
+    Only files listed in a manifest entry are part of the snapshot, so a
+    reader never sees a partially written source.
+    """
+
+    MANIFEST_VERSION = 1
+
+    def __init__(self, minio_client: MinIOClient, config: Optional[ParquetSnapshotConfig] = None):
+        self.minio_client = minio_client
+        self.config = config or ParquetSnapshotConfig()
+        self.bucket = self.config.bucket or minio_client.config.bucket
+
+    def open_writer(self, file_info: FileInfo, shard: Optional[FileShard] = None) -> SnapshotWriter:
+        return SnapshotWriter(self, file_info, shard)
+
+    def partition_key(self, file_info: FileInfo, shard_index: int, year: int, state: str) -> str:
+        # Basename for readability, key hash so equal basenames in other folders do not collide
+        source = os.path.splitext(os.path.basename(file_info.key))[0]
+        key_hash = hashlib.sha1(file_info.key.encode('utf-8')).hexdigest()[:8]
+        version = (file_info.etag or 'noetag')[:12]
+        return f"{self.config.prefix}/year={year}/state={state}/{source}-{key_hash}-{version}-{shard_index}.parquet"
+
+    def manifest_key(self, source_key: str, shard_index: int) -> str:
+        return f"{self.config.prefix}/_manifest/{quote(source_key, safe='')}.{shard_index}.json"
+
+    def publish(self, entry: Dict[str, Any]) -> None:
+        """Write a manifest entry and delete files it superseded"""
+        key = self.manifest_key(entry['source']['key'], entry['shard_index'])
+        exists = any(k == key for k in self.minio_client.iter_keys(key, self.bucket))
+        previous = self._read_entry(key) if exists else None
+
+        self.minio_client.put_bytes(
+            key, json.dumps(entry).encode('utf-8'), bucket=self.bucket, content_type='application/json'
+        )
+
+        if previous:
+            current = {f['key'] for f in entry['files']}
+            stale = [f['key'] for f in previous.get('files', []) if f['key'] not in current]
+            if stale:
+                self.minio_client.delete_keys(stale, self.bucket)
+
+    def read_manifest(self) -> List[Dict[str, Any]]:
+        """Current manifest entries; shards left over from an older version of a source are dropped"""
+        entries = [
+            entry
+            for entry in (self._read_entry(key) for key in self.minio_client.iter_keys(f"{self.config.prefix}/_manifest/", self.bucket))
+            if entry is not None
+        ]
+
+        latest: Dict[str, Dict[str, Any]] = {}
+        for entry in entries:
+            source = entry['source']['key']
+            if source not in latest or entry['written_at'] > latest[source]['written_at']:
+                latest[source] = entry
+
+        return [
+            entry for entry in entries
+            if entry['source']['etag'] == latest[entry['source']['key']]['source']['etag']
+            and entry['shard_index'] < latest[entry['source']['key']]['shard_count']
+        ]
+
+    def iter_frames(
+        self,
+        years: Optional[Iterable[int]] = None,
+        states: Optional[Iterable[str]] = None
+    ) -> Iterator[pd.DataFrame]:
+        """Yield snapshot partitions as DataFrames, pruning by year/state from the manifest"""
+        years = set(years) if years is not None else None
+        states = {s.upper() for s in states} if states is not None else None
+
+        for entry in self.read_manifest():
+            for file in entry['files']:
+                if years is not None and file['year'] not in years:
+                    continue
+                if states is not None and file['state'] not in states:
+                    continue
+                data = self.minio_client.get_bytes(file['key'], self.bucket)
+                yield pq.read_table(BytesIO(data), schema=SNAPSHOT_SCHEMA).to_pandas()
+
+    def _read_entry(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            entry = json.loads(self.minio_client.get_bytes(key, self.bucket))
+        except Exception:
+            return None
+        if entry.get('version') != self.MANIFEST_VERSION:
+            logger.warning(f"⚠️ Ignoring snapshot manifest {key} with version {entry.get('version')}")
+            return None
+        return entry
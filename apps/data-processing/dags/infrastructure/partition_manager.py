@@ -0,0 +1,319 @@
+"""
+Infrastructure Layer: Year Partition Manager
+Swaps fully reloaded years into the year-partitioned egrid_data: rows are
+copied into a standalone table, indexed there and attached in place of the
+live partition, whose previous generation is kept for rollback
+"""
+import os
+import re
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+import logging
+
+import psycopg2
+
+from domain.models.e_grid_data import ProcessingConstants
+from infrastructure.db_client import DatabaseClient
+
+logger = logging.getLogger(__name__)
+
+
+class PartitionConfig:
+    """Configuration for year partition swaps using environment variables"""
+    def __init__(self):
+        # Detached generations of each year kept for rollback
+        self.keep_previous = int(os.environ.get('ETL_PARTITION_KEEP_PREVIOUS', '1'))
+        # Longest wait for the ACCESS EXCLUSIVE lock of one swap attempt
+        self.lock_timeout_ms = int(os.environ.get('ETL_PARTITION_LOCK_TIMEOUT_MS', '5000'))
+        self.swap_attempts = int(os.environ.get('ETL_PARTITION_SWAP_ATTEMPTS', '5'))
+
+
+class YearPartitionManager:
+    """Infrastructure adapter for the year partitions of egrid_data
+
+    The layout comes from infra/db/init/09_partition_egrid_data.sql. A
+    reload of a year is built in a standalone table named
+    <table>_y<year>_<UTC timestamp>, with the year's range CHECK so ATTACH
+    does not scan it, and receives the parent's constraints and indexes
+    only after all rows are in. The swap (DETACH old, ATTACH new) runs in
+    one transaction and only takes the parent's lock briefly; queries see
+    either the old year or the new one. Detached generations stay as
+    plain tables, so a rollback reattaches the previous one.
+    """
+
+    # SQLSTATE raised when lock_timeout expires
+    LOCK_NOT_AVAILABLE = '55P03'
+
+    def __init__(
+        self,
+        db_client: DatabaseClient,
+        table_name: str = 'egrid_data',
+        key_columns: Sequence[str] = ProcessingConstants.UNIQUE_KEY,
+        config: Optional[PartitionConfig] = None
+    ):
+        self.db_client = db_client
+        self.table_name = table_name
+        self.key_columns = list(key_columns)
+        self.config = config or PartitionConfig()
+
+    @contextmanager
+    def load_lock(self, exclusive: bool = False) -> Iterator[None]:
+        """Session advisory lock keeping year reloads and regular loads apart
+
+        Regular loads hold it shared, so they still run side by side. A
+        reload holds it exclusively from begin_reload until its swap, so no
+        row merged into the live partition meanwhile is swapped away.
+        """
+        connection = self.db_client.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            acquire = 'pg_advisory_lock' if exclusive else 'pg_advisory_lock_shared'
+            waited = time.monotonic()
+            cursor.execute(f"SELECT {acquire}(hashtext(%(key)s))", {'key': f"{self.table_name}:load"})
+            connection.commit()
+            if time.monotonic() - waited > 1:
+                logger.info(f"🔒 Waited {time.monotonic() - waited:.1f}s for the {self.table_name} load lock")
+            yield
+        finally:
+            try:
+                # Pooled connections outlive the session lock's owner, so release it explicitly
+                connection.cursor().execute("SELECT pg_advisory_unlock_all()")
+                connection.commit()
+            finally:
+                connection.close()
+
+    def is_partitioned(self) -> bool:
+        """Whether the table has been converted to year partitions"""
+        rows = self._query(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%(table)s)",
+            {'table': self.table_name}
+        )
+        return bool(rows)
+
+    def begin_reload(self, year: int) -> str:
+        """Create the empty, unindexed table a reload of `year` is copied into"""
+        if not self.is_partitioned():
+            raise RuntimeError(
+                f"{self.table_name} is not partitioned by year; apply 09_partition_egrid_data.sql first"
+            )
+        load_table = f"{self.table_name}_y{year}_{datetime.utcnow():%Y%m%d%H%M%S}"
+        self._execute(f"""
+            CREATE TABLE {load_table} (
+                LIKE {self.table_name} INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+                CONSTRAINT {load_table}_range CHECK (year >= {int(year)} AND year < {int(year) + 1})
+            )
+        """)
+        logger.info(f"🧱 Created {load_table} for a reload of year {year}")
+        return load_table
+
+    def publish_reload(self, year: int, load_table: str) -> Dict[str, Any]:
+        """Index a filled reload table and swap it in for the year's live partition
+
+        Rows repeating a key keep the one copied last. Returns the swap
+        details, including the (state, year) partitions whose rows changed
+        (those of the old and the new generation).
+        """
+        keys = ', '.join(self.key_columns)
+        connection = self.db_client.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"""
+                DELETE FROM {load_table} AS t
+                USING (
+                    SELECT ctid, row_number() OVER (PARTITION BY {keys} ORDER BY ctid DESC) AS copy_rank
+                    FROM {load_table}
+                ) AS ranked
+                WHERE t.ctid = ranked.ctid AND ranked.copy_rank > 1
+            """)
+            duplicates = cursor.rowcount
+            started = time.monotonic()
+            for statement in self._index_statements(cursor, load_table):
+                cursor.execute(statement)
+            cursor.execute(f"ANALYZE {load_table}")
+            cursor.execute(f"SELECT count(*) FROM {load_table}")
+            rows = cursor.fetchone()[0]
+            connection.commit()
+            logger.info(
+                f"🗂️ Indexed {load_table}: {rows} rows in {time.monotonic() - started:.1f}s"
+                + (f", {duplicates} repeated keys removed" if duplicates else "")
+            )
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+
+        current = self.current_partition(year)
+        partitions = self._state_years([current, load_table])
+        self._swap(year, current, load_table)
+        self._prune(year)
+        return {
+            'year': year,
+            'partition': load_table,
+            'replaced': current,
+            'rows': rows,
+            'duplicates_removed': duplicates,
+            'partitions': sorted(partitions)
+        }
+
+    def abort_reload(self, load_table: str) -> None:
+        """Drop a reload table that will not be published"""
+        self._execute(f"DROP TABLE IF EXISTS {load_table}")
+
+    def rollback(self, year: int) -> Dict[str, Any]:
+        """Reattach the newest detached generation older than the year's live partition"""
+        current = self.current_partition(year)
+        previous = [
+            name for name in self.detached_generations(year)
+            if current is None or self._generation(name) < self._generation(current)
+        ]
+        if not previous:
+            raise ValueError(f"No earlier generation of year {year} to roll back to")
+
+        target = previous[-1]
+        partitions = self._state_years([current, target])
+        self._swap(year, current, target)
+        logger.info(f"⏪ Rolled year {year} back from {current} to {target}")
+        return {'year': year, 'partition': target, 'replaced': current, 'partitions': sorted(partitions)}
+
+    def current_partition(self, year: int) -> Optional[str]:
+        """Name of the partition attached for `year`, if any"""
+        rows = self._query(
+            """
+            SELECT c.relname
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%(table)s)
+              AND pg_get_expr(c.relpartbound, c.oid) = %(bound)s
+            """,
+            {'table': self.table_name, 'bound': f"FOR VALUES FROM ({int(year)}) TO ({int(year) + 1})"}
+        )
+        return rows[0][0] if rows else None
+
+    def detached_generations(self, year: int) -> List[str]:
+        """Published generations of `year` that are not attached, oldest first
+
+        A reload table gets its primary key only when published, so one
+        still being filled is never offered for rollback.
+        """
+        rows = self._query(
+            """
+            SELECT c.relname
+            FROM pg_class c
+            WHERE c.relkind = 'r'
+              AND NOT c.relispartition
+              AND c.relnamespace = current_schema()::regnamespace
+              AND c.relname ~ %(pattern)s
+              AND EXISTS (SELECT 1 FROM pg_index x WHERE x.indrelid = c.oid AND x.indisprimary)
+            """,
+            {'pattern': f"^{re.escape(self.table_name)}_y{int(year)}(_[0-9]{{14}})?$"}
+        )
+        return sorted((name for name, in rows), key=self._generation)
+
+    def _swap(self, year: int, current: Optional[str], replacement: str) -> None:
+        """DETACH the current partition and ATTACH the replacement in one transaction
+
+        Both statements need the parent's ACCESS EXCLUSIVE lock; waiting
+        for it is bounded by lock_timeout and retried, so a long-running
+        query delays the swap instead of queueing every reader behind it.
+        """
+        connection = self.db_client.engine.raw_connection()
+        try:
+            for attempt in range(1, self.config.swap_attempts + 1):
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(f"SET LOCAL lock_timeout = {int(self.config.lock_timeout_ms)}")
+                    if current is not None:
+                        cursor.execute(f"ALTER TABLE {self.table_name} DETACH PARTITION {current}")
+                    cursor.execute(
+                        f"ALTER TABLE {self.table_name} ATTACH PARTITION {replacement} "
+                        f"FOR VALUES FROM ({int(year)}) TO ({int(year) + 1})"
+                    )
+                    connection.commit()
+                    logger.info(f"🔁 Year {year} now served by {replacement}" + (f" (detached {current})" if current else ""))
+                    return
+                except psycopg2.OperationalError as e:
+                    connection.rollback()
+                    if e.pgcode != self.LOCK_NOT_AVAILABLE or attempt == self.config.swap_attempts:
+                        raise
+                    logger.warning(f"⚠️ {self.table_name} busy, retrying partition swap ({attempt}/{self.config.swap_attempts})")
+                    time.sleep(attempt)
+                except Exception:
+                    connection.rollback()
+                    raise
+        finally:
+            connection.close()
+
+    def _prune(self, year: int) -> None:
+        """Drop detached generations beyond the ones kept for rollback"""
+        detached = self.detached_generations(year)
+        doomed = detached[:max(len(detached) - self.config.keep_previous, 0)]
+        for name in doomed:
+            self._execute(f"DROP TABLE IF EXISTS {name}")
+        if doomed:
+            logger.info(f"🗑️ Dropped {len(doomed)} old generations of year {year}")
+
+    def _index_statements(self, cursor, load_table: str) -> List[str]:
+        """Constraints and indexes of the parent, restated for a standalone table
+
+        Read from the catalog, so indexes added to the parent later (e.g.
+        by the rollup repository) are built here too instead of by ATTACH.
+        """
+        cursor.execute(
+            """
+            SELECT pg_get_indexdef(x.indexrelid), con.contype, pg_get_constraintdef(con.oid)
+            FROM pg_index x
+            LEFT JOIN pg_constraint con ON con.conindid = x.indexrelid AND con.conrelid = x.indrelid
+            WHERE x.indrelid = to_regclass(%(table)s)
+            ORDER BY x.indexrelid
+            """,
+            {'table': self.table_name}
+        )
+        statements = []
+        for number, (index_def, constraint_type, constraint_def) in enumerate(cursor.fetchall()):
+            if constraint_type in ('p', 'u'):
+                statements.append(f"ALTER TABLE {load_table} ADD CONSTRAINT {load_table}_c{number} {constraint_def}")
+            else:
+                unique = 'UNIQUE ' if index_def.startswith('CREATE UNIQUE') else ''
+                method_and_columns = index_def[index_def.index(' USING '):]
+                statements.append(f"CREATE {unique}INDEX {load_table}_i{number} ON {load_table}{method_and_columns}")
+        return statements
+
+    def _state_years(self, tables: List[Optional[str]]) -> Set[Tuple[str, int]]:
+        """Distinct (state, year) pairs stored in the given tables"""
+        partitions: Set[Tuple[str, int]] = set()
+        for table in tables:
+            if table is not None:
+                partitions.update(
+                    (state, int(year)) for state, year in self._query(f"SELECT DISTINCT state, year FROM {table}")
+                )
+        return partitions
+
+    def _generation(self, name: str) -> str:
+        """Sort key of a generation; the initial partition (no timestamp) is the oldest"""
+        stamp = name.rsplit('_', 1)[-1]
+        return stamp if re.fullmatch(r'[0-9]{14}', stamp) else ''
+
+    def _query(self, sql: str, params: Optional[Dict[str, Any]] = None) -> List[tuple]:
+        connection = self.db_client.engine.raw_connection()
+        try:
+            cursor = connection.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            connection.commit()
+            return rows
+        finally:
+            connection.close()
+
+    def _execute(self, sql: str) -> None:
+        connection = self.db_client.engine.raw_connection()
+        try:
+            connection.cursor().execute(sql)
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
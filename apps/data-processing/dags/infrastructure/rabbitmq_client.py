@@ -5,8 +5,11 @@ Handles message queue operations using centralized config
 import os
 import pika
 import json
+import threading
+import time
+from collections import deque
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -30,16 +33,49 @@ class RabbitMQConfig:
             self.username = os.environ.get('RABBITMQ_USER', 'egriduser')
             self.password = os.environ.get('RABBITMQ_PASSWORD', 'egridpass123')
             self.vhost = os.environ.get('RABBITMQ_VHOST', '/')
+        
+        # Publisher tuning
+        self.confirm_window = int(os.environ.get('RABBITMQ_CONFIRM_WINDOW', '100'))
+        self.send_buffer_size = int(os.environ.get('RABBITMQ_SEND_BUFFER_SIZE', '1000'))
+        self.linger_seconds = float(os.environ.get('RABBITMQ_LINGER_MS', '200')) / 1000
+        self.heartbeat = int(os.environ.get('RABBITMQ_HEARTBEAT', '60'))
 
 
-class RabbitMQClient:
-    """Infrastructure adapter for RabbitMQ operations"""
+class RabbitMQPublisher:
+    """Long-lived publisher with a reusable connection/channel and publisher confirms
+    
+    Messages are buffered in memory (bounded by send_buffer_size) and
+    published in windows of confirm_window messages. The channel is in
+    publisher confirm mode, so basic_publish returns once the broker has
+    acked the message and raises NackError or UnroutableError otherwise.
+    A failed message and the rest of its window are republished on a
+    fresh connection, so delivery is at least once. Queues are declared
+    once per window and the connection is re-opened transparently.
+    
+    There is no background flush: a BlockingConnection may only be used
+    from the thread that owns it. The linger time is checked when the
+    next message is published, so messages still buffered at the end of
+    a unit of work are only sent by flush() or close(), which callers
+    must invoke before their task returns.
+    """
+    
+    RECOVERABLE_ERRORS = (
+        pika.exceptions.AMQPConnectionError,
+        pika.exceptions.AMQPChannelError,  # Includes NackError and UnroutableError from confirm mode
+        pika.exceptions.StreamLostError,
+    )
     
     def __init__(self, config: RabbitMQConfig):
         self.config = config
+        self._connection = None
+        self._channel = None
+        self._declared_queues = set()
+        self._buffer = deque()
+        self._oldest_buffered_at: Optional[float] = None
+        self._lock = threading.RLock()
     
-    def _get_connection(self):
-        """Create RabbitMQ connection"""
+    def _connect(self) -> None:
+        """Open the connection and a channel in publisher confirm mode"""
         credentials = pika.PlainCredentials(
             self.config.username, 
             self.config.password
@@ -48,9 +84,109 @@ class RabbitMQClient:
             host=self.config.host,
             port=self.config.port,
             virtual_host=self.config.vhost,
-            credentials=credentials
+            credentials=credentials,
+            heartbeat=self.config.heartbeat
+        )
+        self._connection = pika.BlockingConnection(parameters)
+        self._channel = self._connection.channel()
+        self._channel.confirm_delivery()
+        self._declared_queues.clear()
+        logger.info(f"🔌 Connected publisher to RabbitMQ at {self.config.host}:{self.config.port}")
+    
+    def _ensure_channel(self):
+        """Return an open channel, reconnecting if needed"""
+        if self._connection is None or self._connection.is_closed or self._channel is None or self._channel.is_closed:
+            self._reset()
+            self._connect()
+        return self._channel
+    
+    def _reset(self) -> None:
+        """Drop the current connection after an error"""
+        try:
+            if self._connection is not None and self._connection.is_open:
+                self._connection.close()
+        except Exception:
+            pass
+        self._connection = None
+        self._channel = None
+        self._declared_queues.clear()
+    
+    def publish(self, queue: str, message: Dict[str, Any]) -> None:
+        """Buffer a message; flushes when the window fills or, at this call, the linger time has passed"""
+        with self._lock:
+            if len(self._buffer) >= self.config.send_buffer_size:
+                self.flush()
+            
+            if not self._buffer:
+                self._oldest_buffered_at = time.monotonic()
+            self._buffer.append((queue, json.dumps(message)))
+            
+            if self._flush_due():
+                self.flush()
+    
+    def _flush_due(self) -> bool:
+        return (
+            len(self._buffer) >= self.config.confirm_window
+            or time.monotonic() - (self._oldest_buffered_at or 0) >= self.config.linger_seconds
         )
-        return pika.BlockingConnection(parameters)
+    
+    def flush(self) -> int:
+        """Publish all buffered messages, one confirmed window at a time"""
+        with self._lock:
+            published = 0
+            while self._buffer:
+                window = [self._buffer[i] for i in range(min(self.config.confirm_window, len(self._buffer)))]
+                self._publish_window(window)
+                for _ in window:
+                    self._buffer.popleft()
+                published += len(window)
+            self._oldest_buffered_at = None
+            return published
+    
+    def _publish_window(self, window: List[tuple]) -> None:
+        """Publish one window, retrying its unconfirmed messages once on a fresh connection"""
+        confirmed = 0
+        for attempt in range(2):
+            try:
+                channel = self._ensure_channel()
+                for queue, _ in window:
+                    if queue not in self._declared_queues:
+                        channel.queue_declare(queue=queue, durable=True)
+                        self._declared_queues.add(queue)
+                for queue, body in window[confirmed:]:
+                    # Blocks until the broker confirms; mandatory turns an unroutable message into UnroutableError
+                    channel.basic_publish(
+                        exchange='',
+                        routing_key=queue,
+                        body=body,
+                        properties=pika.BasicProperties(delivery_mode=2),  # Persistent
+                        mandatory=True
+                    )
+                    confirmed += 1
+                return
+            except self.RECOVERABLE_ERRORS as e:
+                self._reset()
+                if attempt == 1:
+                    raise
+                logger.warning(f"⚠️ RabbitMQ publish failed, reconnecting: {e}")
+    
+    def close(self) -> None:
+        """Flush pending messages and close the connection"""
+        with self._lock:
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"❌ Error flushing RabbitMQ publisher on close: {e}")
+                self._buffer.clear()
+            self._reset()
+
+
+class RabbitMQClient:
+    """Infrastructure adapter for RabbitMQ operations"""
+    
+    def __init__(self, config: RabbitMQConfig):
+        self.config = config
+        self.publisher = RabbitMQPublisher(config)
     
     def queue_data_for_insertion(self, records: List[Dict[str, Any]]) -> None:
         """Queue processed records for database insertion"""
@@ -58,12 +194,6 @@ class RabbitMQClient:
             return
         
         try:
-            connection = self._get_connection()
-            channel = connection.channel()
-            
-            # Declare queue with durability
-            channel.queue_declare(queue='database_write_queue', durable=True)
-            
             # Queue records in batches for better performance
             batch_size = 100
             for i in range(0, len(records), batch_size):
@@ -75,15 +205,9 @@ class RabbitMQClient:
                     'records': batch,
                     'timestamp': datetime.now().isoformat()
                 }
-                
-                channel.basic_publish(
-                    exchange='',
-                    routing_key='database_write_queue',
-                    body=json.dumps(message),
-                    properties=pika.BasicProperties(delivery_mode=2)  # Persistent
-                )
+                self.publisher.publish('database_write_queue', message)
             
-            connection.close()
+            self.publisher.flush()
             logger.info(f"📤 Queued {len(records)} records for database insertion")
             
         except Exception as e:
@@ -91,33 +215,31 @@ class RabbitMQClient:
             raise
     
     def send_notification(self, notification_type: str, data: Dict[str, Any]) -> None:
-        """Send notification message"""
+        """Send notification message (buffered until the window fills or flush(), then published in one window)"""
         try:
-            connection = self._get_connection()
-            channel = connection.channel()
-            
-            channel.queue_declare(queue='notification_queue', durable=True)
-            
             message = {
                 'type': notification_type,
                 'data': data,
                 'timestamp': datetime.now().isoformat(),
                 'source': 'data_processing_pipeline'
             }
-            
-            channel.basic_publish(
-                exchange='',
-                routing_key='notification_queue',
-                body=json.dumps(message),
-                properties=pika.BasicProperties(delivery_mode=2)
-            )
-            
-            connection.close()
+            self.publisher.publish('notification_queue', message)
             logger.info(f"📧 Sent notification: {notification_type}")
             
         except Exception as e:
             logger.error(f"❌ Error sending notification: {e}")
     
+    def flush(self) -> None:
+        """Deliver any buffered notifications"""
+        try:
+            self.publisher.flush()
+        except Exception as e:
+            logger.error(f"❌ Error flushing notifications: {e}")
+    
+    def close(self) -> None:
+        """Deliver buffered notifications and close the publisher connection"""
+        self.publisher.close()
+    
     def send_error_notification(self, error_type: str, error_message: str, context: Dict[str, Any] = None) -> None:
         """Send error notification with context"""
         self.send_notification('error', {
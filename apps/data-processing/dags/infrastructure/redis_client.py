@@ -0,0 +1,80 @@
+"""
+Infrastructure Layer: Redis Cache Client Adapter
+Writes and invalidates the backend API's response cache
+"""
+import os
+from typing import Dict, Iterable, Iterator, Optional
+import logging
+
+import redis
+
+logger = logging.getLogger(__name__)
+
+
+class RedisConfig:
+    """Configuration for the API cache Redis using environment variables (same as the backend API)"""
+    def __init__(self):
+        self.host = os.environ.get('REDIS_HOST', 'redis')
+        self.port = int(os.environ.get('REDIS_PORT', '6379'))
+        self.password = os.environ.get('REDIS_PASSWORD', '') or None
+        self.db = int(os.environ.get('REDIS_DB', '0'))
+        self.socket_timeout = float(os.environ.get('REDIS_SOCKET_TIMEOUT', '5'))
+
+
+class RedisCacheClient:
+    """Infrastructure adapter for bulk cache operations
+
+    Any redis-py compatible client can be passed in (e.g. fakeredis in tests);
+    by default one is built from RedisConfig.
+    """
+
+    SCAN_COUNT = 500
+    DELETE_BATCH_SIZE = 500
+
+    def __init__(self, config: Optional[RedisConfig] = None, client=None):
+        self.config = config or RedisConfig()
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = redis.Redis(
+                host=self.config.host,
+                port=self.config.port,
+                password=self.config.password,
+                db=self.config.db,
+                socket_timeout=self.config.socket_timeout,
+                socket_connect_timeout=self.config.socket_timeout,
+                decode_responses=True
+            )
+        return self._client
+
+    def iter_keys(self, pattern: str) -> Iterator[str]:
+        """Incrementally iterate keys matching a glob pattern (SCAN, never KEYS)"""
+        for key in self.client.scan_iter(match=pattern, count=self.SCAN_COUNT):
+            yield key.decode('utf-8') if isinstance(key, bytes) else key
+
+    def delete_keys(self, keys: Iterable[str]) -> int:
+        """Delete keys in pipelined batches; returns how many existed"""
+        deleted = 0
+        batch = []
+        for key in keys:
+            batch.append(key)
+            if len(batch) >= self.DELETE_BATCH_SIZE:
+                deleted += self._delete_batch(batch)
+                batch = []
+        if batch:
+            deleted += self._delete_batch(batch)
+        return deleted
+
+    def set_many(self, values: Dict[str, str], ttl_seconds: int) -> None:
+        """SETEX every key in one pipeline round trip"""
+        if not values:
+            return
+        pipe = self.client.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.setex(key, ttl_seconds, value)
+        pipe.execute()
+
+    def _delete_batch(self, keys) -> int:
+        return int(self.client.delete(*keys))
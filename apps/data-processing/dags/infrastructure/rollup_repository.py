@@ -0,0 +1,235 @@
+"""
+Infrastructure Layer: eGRID Rollup Repository
+Maintains the top-plants and totals rollups read by the backend API
+"""
+import os
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+import logging
+
+from infrastructure.db_client import DatabaseClient
+
+logger = logging.getLogger(__name__)
+
+ALL_STATES = '*'
+ALL_YEARS = 0
+
+
+class RollupRepository:
+    """Infrastructure adapter refreshing rollups for the (state, year) partitions a load touched
+
+    Only the affected partitions are recomputed from egrid_data. The
+    all-years, all-states and overall top-K lists are recomputed from the
+    per-partition top-K rows, which always contain the overall top K.
+    """
+
+    # Run on first use, for databases created before the script existed
+    INIT_SCRIPT = '07_create_egrid_rollups.sql'
+
+    # Affected partitions arrive as two parallel arrays
+    AFFECTED_CTE = """
+        WITH affected AS (
+            SELECT * FROM unnest(CAST(:states AS varchar[]), CAST(:years AS integer[])) AS a(state, year)
+        )
+    """
+
+    def __init__(self, db_client: DatabaseClient, top_k: int = None):
+        self.db_client = db_client
+        self.top_k = top_k or int(os.environ.get('ETL_ROLLUP_TOP_K', '100'))
+
+    def ensure_tables(self) -> None:
+        """Create the rollup tables if they do not exist yet"""
+        self.db_client.apply_init_script(self.INIT_SCRIPT)
+
+    def refresh(self, partitions: Iterable[Tuple[str, int]]) -> int:
+        """Refresh rollups for the given (state, year) partitions; returns how many were refreshed
+
+        Rollups that were never built (or were built with a different top_k)
+        are rebuilt from every partition in egrid_data instead.
+        """
+        self.ensure_tables()
+
+        session = self.db_client.get_session()
+        try:
+            status = session.execute(text("SELECT top_k FROM egrid_rollup_status WHERE id = 1")).first()
+            if status is None or status.top_k != self.top_k:
+                logger.info(f"🧮 Building rollups for every partition (top_k={self.top_k})")
+                session.execute(text("TRUNCATE egrid_top_plants, egrid_state_year_totals, egrid_state_totals, egrid_year_totals"))
+                affected = [
+                    (row.state, row.year)
+                    for row in session.execute(text("SELECT DISTINCT state, year FROM egrid_data"))
+                ]
+            else:
+                affected = sorted(set(partitions))
+
+            if affected:
+                self._refresh_partitions(session, affected)
+
+            session.execute(
+                text("""
+                    INSERT INTO egrid_rollup_status (id, top_k, refreshed_at)
+                    VALUES (1, :top_k, CURRENT_TIMESTAMP)
+                    ON CONFLICT (id) DO UPDATE SET top_k = EXCLUDED.top_k, refreshed_at = EXCLUDED.refreshed_at
+                """),
+                {'top_k': self.top_k}
+            )
+            session.commit()
+
+            logger.info(f"🧮 Refreshed rollups for {len(affected)} (state, year) partitions")
+            return len(affected)
+
+        except SQLAlchemyError as e:
+            session.rollback()
+            logger.error(f"❌ Error refreshing rollups: {e}")
+            raise
+        finally:
+            session.close()
+
+    def get_top_k(self) -> Optional[int]:
+        """top_k the rollups were last built with, or None if they were never built"""
+        self.ensure_tables()
+        session = self.db_client.get_session()
+        try:
+            status = session.execute(text("SELECT top_k FROM egrid_rollup_status WHERE id = 1")).first()
+            return status.top_k if status else None
+        finally:
+            session.close()
+
+    def get_top_plants(self, scopes: Iterable[Tuple[str, int]], limit: int) -> Dict[Tuple[str, int], List[Dict[str, Any]]]:
+        """Top plants (rank order, at most limit) for each (scope_state, scope_year) in one query"""
+        scopes = sorted(set(scopes))
+        if not scopes:
+            return {}
+
+        session = self.db_client.get_session()
+        try:
+            rows = session.execute(
+                text("""
+                    WITH scopes AS (
+                        SELECT * FROM unnest(CAST(:states AS varchar[]), CAST(:years AS integer[])) AS s(state, year)
+                    )
+                    SELECT t.scope_state, t.scope_year, t.egrid_id, t.gen_id, t.year, t.state, t.plant_name, t.net_generation
+                    FROM egrid_top_plants t
+                    JOIN scopes s ON t.scope_state = s.state AND t.scope_year = s.year
+                    WHERE t.rank <= :limit
+                    ORDER BY t.scope_state, t.scope_year, t.rank
+                """),
+                {'states': [state for state, _ in scopes], 'years': [year for _, year in scopes], 'limit': limit}
+            )
+            plants: Dict[Tuple[str, int], List[Dict[str, Any]]] = {scope: [] for scope in scopes}
+            for row in rows:
+                plants[(row.scope_state, row.scope_year)].append({
+                    'id': row.egrid_id,
+                    'gen_id': row.gen_id,
+                    'year': row.year,
+                    'state': row.state,
+                    'plant_name': row.plant_name,
+                    'net_generation': row.net_generation,
+                })
+            return plants
+        finally:
+            session.close()
+
+    def get_states(self) -> List[str]:
+        """States with data, ascending (the API's state list)"""
+        session = self.db_client.get_session()
+        try:
+            return [row.state for row in session.execute(text("SELECT state FROM egrid_state_totals ORDER BY state"))]
+        finally:
+            session.close()
+
+    def get_years(self) -> List[int]:
+        """Years with data, newest first (the API's year list)"""
+        session = self.db_client.get_session()
+        try:
+            return [row.year for row in session.execute(text("SELECT year FROM egrid_year_totals ORDER BY year DESC"))]
+        finally:
+            session.close()
+
+    def _refresh_partitions(self, session, affected: List[Tuple[str, int]]) -> None:
+        """Recompute base partitions from egrid_data, then the derived all-states/all-years rows"""
+        states: Set[str] = {state for state, _ in affected}
+        years: Set[int] = {year for _, year in affected}
+        params = {
+            'states': [state for state, _ in affected],
+            'years': [year for _, year in affected],
+            'affected_states': sorted(states),
+            'affected_years': sorted(years),
+            'top_k': self.top_k,
+            'all_states': ALL_STATES,
+            'all_years': ALL_YEARS,
+        }
+
+        # Base partitions: top K and totals per (state, year)
+        session.execute(text(self.AFFECTED_CTE + """
+            DELETE FROM egrid_top_plants t USING affected a
+            WHERE t.scope_state = a.state AND t.scope_year = a.year
+        """), params)
+        session.execute(text(self.AFFECTED_CTE + """
+            INSERT INTO egrid_top_plants
+                (scope_state, scope_year, rank, egrid_id, gen_id, year, state, plant_name, net_generation)
+            SELECT state, year, rank, id, gen_id, year, state, plant_name, net_generation
+            FROM (
+                SELECT e.id, e.gen_id, e.year, e.state, e.plant_name, e.net_generation,
+                       row_number() OVER (PARTITION BY e.state, e.year ORDER BY e.net_generation DESC, e.id) AS rank
+                FROM egrid_data e
+                JOIN affected a ON e.state = a.state AND e.year = a.year
+            ) ranked
+            WHERE rank <= :top_k
+        """), params)
+        session.execute(text(self.AFFECTED_CTE + """
+            DELETE FROM egrid_state_year_totals t USING affected a
+            WHERE t.state = a.state AND t.year = a.year
+        """), params)
+        session.execute(text(self.AFFECTED_CTE + """
+            INSERT INTO egrid_state_year_totals (state, year, generator_count, total_net_generation, max_net_generation)
+            SELECT e.state, e.year, count(*), sum(e.net_generation), max(e.net_generation)
+            FROM egrid_data e
+            JOIN affected a ON e.state = a.state AND e.year = a.year
+            GROUP BY e.state, e.year
+        """), params)
+
+        # Derived top K: per state over all years, per year over all states, and overall
+        session.execute(text("""
+            DELETE FROM egrid_top_plants
+            WHERE (scope_year = :all_years AND scope_state = ANY(:affected_states))
+               OR (scope_state = :all_states AND (scope_year = ANY(:affected_years) OR scope_year = :all_years))
+        """), params)
+        derived_scopes = [
+            # (scope_state, scope_year, PARTITION BY, filter on base partitions)
+            ('state', ':all_years', 'PARTITION BY t.state', 't.state = ANY(:affected_states)'),
+            (':all_states', 'year', 'PARTITION BY t.year', 't.year = ANY(:affected_years)'),
+            (':all_states', ':all_years', '', 'TRUE'),
+        ]
+        for scope_state, scope_year, partition_by, condition in derived_scopes:
+            session.execute(text(f"""
+                INSERT INTO egrid_top_plants
+                    (scope_state, scope_year, rank, egrid_id, gen_id, year, state, plant_name, net_generation)
+                SELECT {scope_state}, {scope_year}, rank, egrid_id, gen_id, year, state, plant_name, net_generation
+                FROM (
+                    SELECT t.egrid_id, t.gen_id, t.year, t.state, t.plant_name, t.net_generation,
+                           row_number() OVER ({partition_by} ORDER BY t.net_generation DESC, t.egrid_id) AS rank
+                    FROM egrid_top_plants t
+                    WHERE t.scope_state <> :all_states AND t.scope_year <> :all_years AND {condition}
+                ) ranked
+                WHERE rank <= :top_k
+            """), params)
+
+        # Per-state and per-year totals (and dimension lists) from the partition totals
+        session.execute(text("DELETE FROM egrid_state_totals WHERE state = ANY(:affected_states)"), params)
+        session.execute(text("""
+            INSERT INTO egrid_state_totals (state, year_count, generator_count, total_net_generation)
+            SELECT state, count(*), sum(generator_count), sum(total_net_generation)
+            FROM egrid_state_year_totals
+            WHERE state = ANY(:affected_states)
+            GROUP BY state
+        """), params)
+        session.execute(text("DELETE FROM egrid_year_totals WHERE year = ANY(:affected_years)"), params)
+        session.execute(text("""
+            INSERT INTO egrid_year_totals (year, state_count, generator_count, total_net_generation)
+            SELECT year, count(*), sum(generator_count), sum(total_net_generation)
+            FROM egrid_state_year_totals
+            WHERE year = ANY(:affected_years)
+            GROUP BY year
+        """), params)
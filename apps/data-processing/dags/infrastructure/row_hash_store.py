@@ -0,0 +1,120 @@
+"""
+Infrastructure Layer: Row Hash Store
+Keeps the normalized rows last loaded from each source object, with their
+key and row hashes, as one Parquet object per source in MinIO
+"""
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from typing import Optional, Tuple
+from urllib.parse import quote
+import logging
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from domain.models.e_grid_data import FileInfo
+from infrastructure.minio_client import MinIOClient
+
+logger = logging.getLogger(__name__)
+
+ROW_HASH_SCHEMA = pa.schema([
+    ('gen_id', pa.string()),
+    ('year', pa.int64()),
+    ('state', pa.string()),
+    ('plant_name', pa.string()),
+    ('net_generation', pa.float64()),
+    ('key_hash', pa.uint64()),
+    ('row_hash', pa.uint64()),
+])
+
+
+class RowHashStoreConfig:
+    """Configuration for row hash objects using environment variables"""
+    def __init__(self):
+        self.prefix = os.environ.get('ETL_DELTA_PREFIX', 'state/row_hashes').strip('/')
+        self.compression = os.environ.get('ETL_DELTA_COMPRESSION', 'zstd')
+        self.bucket = os.environ.get('ETL_DELTA_BUCKET', '') or None
+
+
+class RowHashWriter:
+    """Writes the rows of one source object as they load; nothing replaces the stored version until commit()"""
+
+    def __init__(self, store: 'RowHashStore', file_info: FileInfo):
+        self.store = store
+        self.file_info = file_info
+        self._workdir = tempfile.mkdtemp(prefix='egrid_row_hashes_')
+        self._path = os.path.join(self._workdir, 'rows.parquet')
+        self._writer = pq.ParquetWriter(
+            self._path,
+            ROW_HASH_SCHEMA.with_metadata({'source_etag': file_info.etag or ''}),
+            compression=store.config.compression
+        )
+        self.rows = 0
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append loaded rows (output columns plus key_hash and row_hash)"""
+        if df.empty:
+            return
+        self._writer.write_table(pa.Table.from_pandas(
+            df[ROW_HASH_SCHEMA.names], schema=ROW_HASH_SCHEMA, preserve_index=False
+        ))
+        self.rows += len(df)
+
+    def commit(self) -> None:
+        """Upload the rows, replacing the previous version's"""
+        try:
+            self._writer.close()
+            self.store.minio_client.upload_file(
+                self._path, self.store.object_key(self.file_info.key), self.store.bucket
+            )
+            logger.info(f"🧾 Stored {self.rows} row hashes for {self.file_info.key}")
+        finally:
+            shutil.rmtree(self._workdir, ignore_errors=True)
+
+    def abort(self) -> None:
+        """Discard local files; the stored version stays in place"""
+        try:
+            self._writer.close()
+        except Exception:
+            pass
+        shutil.rmtree(self._workdir, ignore_errors=True)
+
+
+class RowHashStore:
+    """Infrastructure adapter for per-source row hash objects
+
+    Layout under the prefix:
+        <url-quoted source key>.parquet
+    with the source ETag the rows were loaded from in the Parquet metadata.
+    """
+
+    def __init__(self, minio_client: MinIOClient, config: Optional[RowHashStoreConfig] = None):
+        self.minio_client = minio_client
+        self.config = config or RowHashStoreConfig()
+        self.bucket = self.config.bucket or minio_client.config.bucket
+
+    def object_key(self, source_key: str) -> str:
+        return f"{self.config.prefix}/{quote(source_key, safe='')}.parquet"
+
+    def open_writer(self, file_info: FileInfo) -> RowHashWriter:
+        return RowHashWriter(self, file_info)
+
+    def load(self, file_info: FileInfo) -> Optional[Tuple[str, pd.DataFrame]]:
+        """ETag and rows stored for a source object, if any"""
+        key = self.object_key(file_info.key)
+        if not any(k == key for k in self.minio_client.iter_keys(key, self.bucket)):
+            return None
+
+        parquet_file = pq.ParquetFile(BytesIO(self.minio_client.get_bytes(key, self.bucket)))
+        metadata = parquet_file.schema_arrow.metadata or {}
+        rows = parquet_file.read(columns=ROW_HASH_SCHEMA.names).to_pandas()
+        return metadata.get(b'source_etag', b'').decode('utf-8'), rows
+
+    def clear(self) -> int:
+        """Forget every stored version, so each source's next load is a full one"""
+        keys = list(self.minio_client.iter_keys(f"{self.config.prefix}/", self.bucket))
+        self.minio_client.delete_keys(keys, self.bucket)
+        return len(keys)
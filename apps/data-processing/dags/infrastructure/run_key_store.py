@@ -0,0 +1,123 @@
+"""
+Infrastructure Layer: Run-wide Key Store
+Unique key hashes loaded by one DAG run, kept in Postgres so every mapped
+batch of the run (on any worker) resolves duplicates against the same set
+"""
+import os
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+import logging
+
+import numpy as np
+from psycopg2.extras import execute_values
+
+from infrastructure.db_client import DatabaseClient
+from infrastructure.key_store import _normalize
+
+logger = logging.getLogger(__name__)
+
+
+class RunKeyStore:
+    """Infrastructure adapter for the etl_run_key table, with the key store interface of SpillingKeyStore
+
+    Hashes are stored as signed BIGINTs with the same 64 bits. hold()
+    serializes a chunk's lookup, load and upsert across the run's batches
+    with a session advisory lock, so two batches cannot both load a key
+    as its first occurrence. close() only releases the connection: the
+    keys stay until clear() at the end of the run.
+    """
+
+    TABLE_NAME = 'etl_run_key'
+    INIT_SCRIPT = '11_create_etl_run_key.sql'
+
+    def __init__(self, db_client: DatabaseClient, run_id: str, retention_days: int = None):
+        self.db_client = db_client
+        self.run_id = run_id
+        # Keys of runs that never reached clear() (e.g. a killed DAG run) are pruned after this long
+        self.retention_days = retention_days or int(os.environ.get('ETL_DEDUP_RUN_KEY_RETENTION_DAYS', '7'))
+        self._connection = None
+
+    def __len__(self) -> int:
+        with self._cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {self.TABLE_NAME} WHERE run_id = %s", (self.run_id,))
+            return cursor.fetchone()[0]
+
+    def lookup(self, hashes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Which hashes the run has loaded, and their values (0.0 where absent)"""
+        signed = _normalize(hashes).view(np.int64).tolist()
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"SELECT key_hash, value FROM {self.TABLE_NAME} WHERE run_id = %s AND key_hash = ANY(%s)",
+                (self.run_id, signed)
+            )
+            stored = dict(cursor.fetchall())
+
+        found = np.fromiter((h in stored for h in signed), dtype=bool, count=len(signed))
+        values = np.fromiter((stored.get(h, 0.0) for h in signed), dtype=np.float64, count=len(signed))
+        return found, values
+
+    def upsert(self, hashes: np.ndarray, values: np.ndarray) -> None:
+        """Insert or overwrite; hashes must be unique within the call"""
+        rows = list(zip(
+            [self.run_id] * len(hashes),
+            _normalize(hashes).view(np.int64).tolist(),
+            np.asarray(values, dtype=np.float64).tolist()
+        ))
+        with self._cursor() as cursor:
+            execute_values(
+                cursor,
+                f"""
+                    INSERT INTO {self.TABLE_NAME} (run_id, key_hash, value) VALUES %s
+                    ON CONFLICT (run_id, key_hash) DO UPDATE SET value = EXCLUDED.value
+                """,
+                rows,
+                page_size=1000
+            )
+
+    @contextmanager
+    def hold(self) -> Iterator[None]:
+        """Keep the run's other batches from resolving keys until the block ends"""
+        with self._cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_lock(hashtext(%s))", (f"{self.TABLE_NAME}:{self.run_id}",))
+        try:
+            yield
+        finally:
+            with self._cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(hashtext(%s))", (f"{self.TABLE_NAME}:{self.run_id}",))
+
+    def clear(self) -> int:
+        """Drop the run's keys, and those of runs older than the retention period"""
+        with self._cursor() as cursor:
+            cursor.execute(
+                f"""
+                    DELETE FROM {self.TABLE_NAME}
+                    WHERE run_id = %s OR created_at < CURRENT_TIMESTAMP - make_interval(days => %s)
+                """,
+                (self.run_id, self.retention_days)
+            )
+            deleted = cursor.rowcount
+        logger.info(f"🔑 Cleared {deleted} run-wide dedup keys of {self.run_id}")
+        return deleted
+
+    def close(self) -> None:
+        """Release the connection (and any lock it holds); the keys stay for the rest of the run"""
+        if self._connection is not None:
+            try:
+                self._connection.close()
+            finally:
+                self._connection = None
+
+    @contextmanager
+    def _cursor(self):
+        if self._connection is None:
+            self.db_client.apply_init_script(self.INIT_SCRIPT)
+            self._connection = self.db_client.engine.raw_connection()
+        cursor = self._connection.cursor()
+        try:
+            yield cursor
+            self._connection.commit()
+        except Exception:
+            self._connection.rollback()
+            raise
+        finally:
+            cursor.close()
@@ -0,0 +1,76 @@
+"""
+Infrastructure Layer: Run Manifest Store
+Writes run manifests to MinIO or a local directory and hands out small references
+"""
+import gzip
+import hashlib
+import json
+import os
+from typing import Any, Dict
+from urllib.parse import urlparse
+import logging
+
+from domain.models.run_manifest import RunManifest
+from infrastructure.minio_client import MinIOClient
+
+logger = logging.getLogger(__name__)
+
+
+class RunManifestConfig:
+    """Configuration for run manifest storage using environment variables"""
+    def __init__(self, default_bucket: str = 'egrid-data'):
+        # s3://<bucket>/<prefix> or file:///<directory>
+        self.base_uri = os.environ.get('ETL_RUN_MANIFEST_URI', f's3://{default_bucket}/_etl/runs')
+
+
+class RunManifestStore:
+    """Infrastructure adapter persisting RunManifest objects by reference
+
+    Only the returned reference ({'uri', 'digest'}) travels through XCom,
+    so per-task overhead stays constant however many files a run has.
+    """
+
+    def __init__(self, minio_client: MinIOClient, config: RunManifestConfig):
+        self.minio_client = minio_client
+        self.config = config
+
+    def save(self, manifest: RunManifest, stage: str) -> Dict[str, str]:
+        """Write a manifest for a pipeline stage and return its reference"""
+        data = gzip.compress(
+            json.dumps(manifest.to_payload(), separators=(',', ':')).encode('utf-8'),
+            mtime=0
+        )
+        digest = hashlib.sha256(data).hexdigest()
+        run_id = manifest.run_id.replace('/', '_').replace(':', '_')
+        uri = f"{self.config.base_uri.rstrip('/')}/{run_id}/{stage}.json.gz"
+
+        parsed = urlparse(uri)
+        if parsed.scheme == 's3':
+            self.minio_client.put_bytes(parsed.path.lstrip('/'), data, bucket=parsed.netloc, content_type='application/gzip')
+        elif parsed.scheme == 'file':
+            os.makedirs(os.path.dirname(parsed.path), exist_ok=True)
+            with open(parsed.path, 'wb') as f:
+                f.write(data)
+        else:
+            raise ValueError(f"Unsupported run manifest URI: {uri}")
+
+        logger.info(f"🧾 Wrote run manifest {uri} ({len(data)} bytes)")
+        return {'uri': uri, 'digest': digest}
+
+    def load(self, reference: Dict[str, Any]) -> RunManifest:
+        """Load and verify a manifest from its reference"""
+        uri = reference['uri']
+        parsed = urlparse(uri)
+        if parsed.scheme == 's3':
+            data = self.minio_client.get_bytes(parsed.path.lstrip('/'), bucket=parsed.netloc)
+        elif parsed.scheme == 'file':
+            with open(parsed.path, 'rb') as f:
+                data = f.read()
+        else:
+            raise ValueError(f"Unsupported run manifest URI: {uri}")
+
+        digest = hashlib.sha256(data).hexdigest()
+        if digest != reference['digest']:
+            raise ValueError(f"Run manifest digest mismatch for {uri}")
+
+        return RunManifest.from_payload(json.loads(gzip.decompress(data)))
@@ -8,6 +8,7 @@ from datetime import datetime, timedelta
 from airflow import DAG
 from airflow.operators.python import PythonOperator
 from airflow.models import Variable
+from airflow.models.param import Param
 import logging
 
 # Import application services (Clean Architecture)
@@ -17,9 +18,17 @@ sys.path.append('/opt/airflow/apps')
 sys.path.append('/opt/airflow/apps/data-processing')
 
 from application.csv_processor import CSVProcessorOrchestrator
+from domain.models.e_grid_data import DeltaStats
 from infrastructure.minio_client import MinIOClient, MinIOConfig
 from infrastructure.rabbitmq_client import RabbitMQClient, RabbitMQConfig
 from infrastructure.db_client import DatabaseClient, DatabaseConfig
+from infrastructure.run_manifest_store import RunManifestStore, RunManifestConfig
+from infrastructure.metrics import PipelineMetrics
+from infrastructure.redis_client import RedisCacheClient, RedisConfig
+from infrastructure.rollup_repository import RollupRepository
+from infrastructure.etl_config import get_pipeline_spec
+from application.cache_sync import CacheSyncService
+from application.chunk_sizing import AdaptiveChunkSizer
 
 logger = logging.getLogger(__name__)
 
@@ -33,76 +42,53 @@ def get_csv_processor() -> CSVProcessorOrchestrator:
     return CSVProcessorOrchestrator(minio_client, rabbitmq_client, db_client)
 
 
+def get_run_manifest_store() -> RunManifestStore:
+    """Factory function for the run manifest store (XCom carries only its references)"""
+    minio_config = MinIOConfig()
+    return RunManifestStore(MinIOClient(minio_config), RunManifestConfig(minio_config.bucket))
+
+
+def get_cache_sync_service() -> CacheSyncService:
+    """Factory function for the API cache sync (same Redis as the backend API)"""
+    return CacheSyncService(RedisCacheClient(RedisConfig()), RollupRepository(DatabaseClient(DatabaseConfig())))
+
+
 # Airflow Task Functions (Thin wrappers around application services)
-def scan_csv_files_task():
+def scan_csv_files_task(**context):
     """Airflow task: Scan for CSV files"""
     logger.info("🔍 Starting file scan task...")
     
+    # Only new or changed objects are emitted (see etl_file_manifest)
     processor = get_csv_processor()
     files = processor.scan_files()
     
-    # Convert to serializable format for XCom
-    file_data = [
-        {
-            'key': f.key,
-            'size': f.size,
-            'last_modified': f.last_modified.isoformat(),
-            'bucket': f.bucket
-        }
-        for f in files
-    ]
+    # Persist the file list once; XCom carries only the reference
+    from domain.models.run_manifest import RunManifest
+    manifest = RunManifest(run_id=context['run_id'], files=files)
+    reference = get_run_manifest_store().save(manifest, 'scan')
     
     logger.info(f"✅ Scan complete: {len(files)} files found")
-    return file_data
+    return {**reference, 'scanned': len(files)}
 
 
 def validate_csv_files_task(**context):
     """Airflow task: Validate CSV files"""
     logger.info("🔍 Starting file validation task...")
     
-    # Get files from previous task
-    file_data = context['task_instance'].xcom_pull(task_ids='scan_csv_files')
-    
-    # Convert back to domain objects
-    from domain.models.e_grid_data import FileInfo
-    files = [
-        FileInfo(
-            key=f['key'],
-            size=f['size'],
-            last_modified=datetime.fromisoformat(f['last_modified']),
-            bucket=f['bucket']
-        )
-        for f in file_data
-    ]
+    # Load the run manifest written by the scan task
+    store = get_run_manifest_store()
+    manifest = store.load(context['task_instance'].xcom_pull(task_ids='scan_csv_files'))
     
     processor = get_csv_processor()
-    valid_files, invalid_files = processor.validate_files(files)
-    
-    # Store results for next task
-    valid_data = [
-        {
-            'key': f.key,
-            'size': f.size,
-            'last_modified': f.last_modified.isoformat(),
-            'bucket': f.bucket
-        }
-        for f in valid_files
-    ]
+    manifest.valid_files, manifest.invalid_files = processor.validate_files(manifest.files)
+    reference = store.save(manifest, 'validate')
     
-    invalid_data = [
-        {
-            'key': f.key,
-            'size': f.size,
-            'last_modified': f.last_modified.isoformat(),
-            'bucket': f.bucket
-        }
-        for f in invalid_files
-    ]
-    
-    context['task_instance'].xcom_push(key='valid_files', value=valid_data)
-    context['task_instance'].xcom_push(key='invalid_files', value=invalid_data)
-    
-    result = {'valid': len(valid_files), 'invalid': len(invalid_files)}
+    result = {
+        **reference,
+        'scanned': len(manifest.files),
+        'valid': len(manifest.valid_files),
+        'invalid': len(manifest.invalid_files)
+    }
     logger.info(f"✅ Validation complete: {result}")
     return result
 
@@ -111,86 +97,149 @@ def create_processing_batches_task(**context):
     """Airflow task: Create processing batches"""
     logger.info("🔄 Creating processing batches...")
     
-    # Get valid files from previous task
-    valid_data = context['task_instance'].xcom_pull(
-        task_ids='validate_csv_files', 
-        key='valid_files'
-    )
+    # Load the run manifest written by the validation task
+    store = get_run_manifest_store()
+    manifest = store.load(context['task_instance'].xcom_pull(task_ids='validate_csv_files'))
     
-    # Convert back to domain objects
-    from domain.models.e_grid_data import FileInfo
-    valid_files = [
-        FileInfo(
-            key=f['key'],
-            size=f['size'],
-            last_modified=datetime.fromisoformat(f['last_modified']),
-            bucket=f['bucket']
-        )
-        for f in valid_data
+    processor = get_csv_processor()
+    manifest.batches = processor.create_batches(manifest.valid_files)
+    reference = store.save(manifest, 'batches')
+    
+    logger.info(f"📊 Created {len(manifest.batches)} processing batches")
+    # One small reference per batch, so the process task can be mapped over them
+    return [
+        {'uri': reference['uri'], 'digest': reference['digest'], 'batch_index': i}
+        for i in range(len(manifest.batches))
     ]
+
+
+def batch_op_kwargs(batch_reference):
+    """Map one batch reference to the kwargs of a mapped process task"""
+    return {'batch_reference': batch_reference}
+
+
+def process_csv_data_task(batch_reference, **context):
+    """Airflow task: Process one CSV batch (mapped once per ProcessingBatch)"""
+    manifest = get_run_manifest_store().load(batch_reference)
+    batch = manifest.get_batch(batch_reference['batch_index'])
+    if batch is None:
+        raise ValueError(f"Batch {batch_reference['batch_index']} not found in {batch_reference['uri']}")
+    
+    logger.info(f"🌊 Processing {batch.batch_id}: {len(batch.files)} files...")
     
     processor = get_csv_processor()
-    batches = processor.create_batches(valid_files)
+    # Duplicate keys are resolved across all mapped batches of the run, cleared by finalize_bulk_load
+    processor.share_duplicate_keys(context['run_id'])
+    # Start from the chunk size the previous run settled on
+    last_report = json.loads(Variable.get('last_etl_report', default_var='{}'))
+    processor.chunk_sizer.seed(last_report.get('chunk_sizes', {}).get('final_rows', 0))
+    try:
+        records_processed = processor.process_file_batch(batch)
+    finally:
+        processor.close()
     
-    # Convert batches to serializable format
-    batch_data = [
-        {
-            'batch_id': batch.batch_id,
-            'files': [
-                {
-                    'key': f.key,
-                    'size': f.size,
-                    'last_modified': f.last_modified.isoformat(),
-                    'bucket': f.bucket
-                }
-                for f in batch.files
-            ],
-            'estimated_records': batch.estimated_records
-        }
-        for batch in batches
-    ]
+    logger.info(f"🎉 {batch.batch_id} complete! Records: {records_processed}")
+    return {
+        'batch_id': batch.batch_id,
+        'files': len(batch.files),
+        'total_records': records_processed,
+        'rows_dead_lettered': processor.rows_dead_lettered,
+        'chunk_sizes': processor.chunk_sizer.summary(),
+        'delta': processor.delta_stats.to_dict(),
+        # (state, year) pairs written, so only those rollup partitions are refreshed
+        'partitions': sorted([state, year] for state, year in processor.affected_partitions)
+    }
+
+
+def prepare_bulk_load_task(**context):
+    """Airflow task: Defer secondary indexes when this run's load is large for the table"""
+    references = context['task_instance'].xcom_pull(task_ids='create_processing_batches') or []
+    batches = get_run_manifest_store().load(references[0]).batches if references else []
+    
+    decision = get_csv_processor().prepare_bulk_load(batches)
+    logger.info(f"📇 Load policy: {json.dumps(decision)}")
+    return decision
+
+
+def finalize_bulk_load_task(**context):
+    """Airflow task: Rebuild deferred indexes and ANALYZE what this run loaded (also after failures)"""
+    partitions = changed_partitions(context)
     
-    logger.info(f"📊 Created {len(batches)} processing batches")
-    return batch_data
+    processor = get_csv_processor()
+    result = processor.finish_bulk_load(sorted(partitions))
+    result['dedup_keys_cleared'] = processor.clear_duplicate_keys(context['run_id'])
+    logger.info(f"📇 Load finalized: {json.dumps(result)}")
+    return result
+
+
+def changed_partitions(context, source_task='process_csv_data'):
+    """(state, year) partitions written by the source task (all mapped instances) of this run"""
+    results = context['task_instance'].xcom_pull(task_ids=source_task) or []
+    if isinstance(results, dict):
+        results = [results]
+    return {
+        (state, year)
+        for result in results if result
+        for state, year in result.get('partitions', [])
+    }
 
 
-def process_csv_data_task(**context):
-    """Airflow task: Process CSV data"""
-    logger.info("🌊 Starting CSV data processing...")
+def refresh_rollups_task(source_task='process_csv_data', **context):
+    """Airflow task: Refresh the API rollups for partitions touched by this run"""
+    partitions = changed_partitions(context, source_task)
     
-    # Get batches from previous task
-    batch_data = context['task_instance'].xcom_pull(task_ids='create_processing_batches')
+    logger.info(f"🧮 Refreshing rollups for {len(partitions)} partitions...")
+    processor = get_csv_processor()
+    refreshed = processor.refresh_rollups(sorted(partitions))
     
-    # Convert back to domain objects
-    from domain.models.e_grid_data import FileInfo, ProcessingBatch
+    logger.info(f"✅ Rollups refreshed: {refreshed} partitions")
+    return {'partitions_refreshed': refreshed}
+
+
+def sync_api_cache_task(source_task='process_csv_data', **context):
+    """Airflow task: Invalidate and re-warm API cache entries for partitions touched by this run"""
+    partitions = changed_partitions(context, source_task)
+    
+    logger.info(f"🔄 Syncing API cache for {len(partitions)} partitions...")
+    result = get_cache_sync_service().sync(sorted(partitions))
     
+    logger.info(f"✅ API cache synced: {json.dumps(result)}")
+    return result
+
+
+def reload_year_partition_task(**context):
+    """Airflow task: Rebuild one year partition of egrid_data and swap it in, or roll it back"""
+    year = int(context['params']['year'])
     processor = get_csv_processor()
-    total_records_processed = 0
     
-    for batch_info in batch_data:
-        # Reconstruct batch object
-        files = [
-            FileInfo(
-                key=f['key'],
-                size=f['size'],
-                last_modified=datetime.fromisoformat(f['last_modified']),
-                bucket=f['bucket']
-            )
-            for f in batch_info['files']
-        ]
-        
-        batch = ProcessingBatch(
-            batch_id=batch_info['batch_id'],
-            files=files,
-            estimated_records=batch_info['estimated_records']
-        )
-        
-        # Process batch
-        records_processed = processor.process_file_batch(batch)
-        total_records_processed += records_processed
+    if context['params'].get('rollback'):
+        logger.info(f"⏪ Rolling back year {year}...")
+        result = processor.rollback_year(year)
+    else:
+        logger.info(f"🧱 Reloading year {year}...")
+        result = processor.reload_year(year)
     
-    logger.info(f"🎉 Processing complete! Total records: {total_records_processed}")
-    return {'total_records': total_records_processed}
+    logger.info(f"✅ Year {year} now served by {result['partition']} (replaced {result['replaced']})")
+    return {**result, 'partitions': [list(partition) for partition in result['partitions']]}
+
+
+def restore_from_snapshot_task(**context):
+    """Airflow task: Reload egrid_data from the Parquet snapshot, optionally only some years/states"""
+    years = context['params'].get('years') or None
+    states = context['params'].get('states') or None
+    logger.info(f"🧊 Restoring from snapshot (years: {years or 'all'}, states: {states or 'all'})...")
+    
+    processor = get_csv_processor()
+    load_result = processor.restore_from_snapshot(years, states)
+    
+    logger.info(f"✅ Restore complete! Records: {load_result.total_loaded()}")
+    return {
+        'total_records': load_result.total_loaded(),
+        'inserted': load_result.inserted,
+        'updated': load_result.updated,
+        'failed': load_result.failed,
+        'partitions': sorted([state, year] for state, year in processor.affected_partitions)
+    }
 
 
 def generate_report_task(**context):
@@ -198,9 +247,21 @@ def generate_report_task(**context):
     logger.info("📊 Generating processing report...")
     
     # Get results from previous tasks
-    scan_result = context['task_instance'].xcom_pull(task_ids='scan_csv_files')
     validation_result = context['task_instance'].xcom_pull(task_ids='validate_csv_files')
-    processing_result = context['task_instance'].xcom_pull(task_ids='process_csv_data')
+    # Mapped task: one result per batch
+    batch_results = context['task_instance'].xcom_pull(task_ids='process_csv_data') or []
+    total_records = sum(result.get('total_records', 0) for result in batch_results if result)
+    rows_dead_lettered = sum(result.get('rows_dead_lettered', 0) for result in batch_results if result)
+    chunk_sizes = AdaptiveChunkSizer.combine([result.get('chunk_sizes') for result in batch_results if result])
+    delta = DeltaStats()
+    for result in batch_results:
+        if result and result.get('delta'):
+            delta.add(DeltaStats(**result['delta']))
+    
+    # Run duration from the DAG run start, so overlap with the next schedule is visible
+    dag_run = context['dag_run']
+    started_at = dag_run.start_date or dag_run.execution_date
+    duration_minutes = (datetime.now(started_at.tzinfo) - started_at).total_seconds() / 60
     
     # Create report using application service
     from domain.models.e_grid_data import ProcessingReport
@@ -208,11 +269,19 @@ def generate_report_task(**context):
     report = ProcessingReport(
         pipeline_run_id=context['run_id'],
         execution_date=context['execution_date'],
-        files_scanned=len(scan_result) if scan_result else 0,
+        files_scanned=validation_result.get('scanned', 0) if validation_result else 0,
         files_validated=validation_result.get('valid', 0) if validation_result else 0,
         files_invalid=validation_result.get('invalid', 0) if validation_result else 0,
-        total_records_processed=processing_result.get('total_records', 0) if processing_result else 0,
-        status='completed'
+        total_records_processed=total_records,
+        status='completed',
+        duration_minutes=round(duration_minutes, 2),
+        rows_dead_lettered=rows_dead_lettered,
+        chunk_sizes=chunk_sizes,
+        delta=delta.to_dict(),
+        load_policy={
+            **(context['task_instance'].xcom_pull(task_ids='prepare_bulk_load') or {}),
+            **(context['task_instance'].xcom_pull(task_ids='finalize_bulk_load') or {})
+        }
     )
     
     # Store report for monitoring
@@ -224,10 +293,17 @@ def generate_report_task(**context):
         'files_invalid': report.files_invalid,
         'total_records_processed': report.total_records_processed,
         'success_rate': report.success_rate(),
-        'status': report.status
+        'status': report.status,
+        'duration_minutes': report.duration_minutes,
+        'rows_dead_lettered': report.rows_dead_lettered,
+        'chunk_sizes': report.chunk_sizes,
+        'delta': report.delta,
+        'load_policy': report.load_policy,
+        'batches_processed': len(batch_results)
     }
     
     Variable.set('last_etl_report', json.dumps(report_dict))
+    PipelineMetrics().push_report(report, len(batch_results))
     
     logger.info(f"✅ Report generated: {json.dumps(report_dict, indent=2)}")
     return report_dict
@@ -244,13 +320,8 @@ default_args = {
     'retry_delay': timedelta(minutes=5),
 }
 
-# Load configuration from JSON file
-config_path = os.path.join(os.path.dirname(__file__), 'config', 'etl_config.json')
-with open(config_path, 'r') as f:
-    configs = json.load(f)
-
-# Get schedule from config (default to hourly if not found)
-schedule_interval = configs[0].get('schedule_interval', '0 */1 * * *') if configs else '0 */1 * * *'
+# Compile the pipeline spec from config/etl_config.json; a bad config fails at DAG parse time
+schedule_interval = get_pipeline_spec().schedule_interval
 
 dag = DAG(
     'process_csv_data_pipeline',
@@ -281,17 +352,125 @@ batch_task = PythonOperator(
     dag=dag,
 )
 
-process_task = PythonOperator(
+# One mapped task instance per ProcessingBatch, so batches run on all available workers
+process_task = PythonOperator.partial(
     task_id='process_csv_data',
     python_callable=process_csv_data_task,
+    max_active_tis_per_dag=int(os.environ.get('ETL_PROCESS_PARALLELISM', '4')),
+    dag=dag,
+).expand(op_kwargs=batch_task.output.map(batch_op_kwargs))
+
+prepare_load_task = PythonOperator(
+    task_id='prepare_bulk_load',
+    python_callable=prepare_bulk_load_task,
+    dag=dag,
+)
+
+finalize_load_task = PythonOperator(
+    task_id='finalize_bulk_load',
+    python_callable=finalize_bulk_load_task,
+    trigger_rule='all_done',  # Deferred indexes are rebuilt even when a batch failed
+    dag=dag,
+)
+
+rollup_task = PythonOperator(
+    task_id='refresh_rollups',
+    python_callable=refresh_rollups_task,
+    trigger_rule='none_failed',  # Also runs when there were no batches (builds rollups once)
+    dag=dag,
+)
+
+cache_sync_task = PythonOperator(
+    task_id='sync_api_cache',
+    python_callable=sync_api_cache_task,
+    trigger_rule='none_failed',
     dag=dag,
 )
 
 report_task = PythonOperator(
     task_id='generate_report',
     python_callable=generate_report_task,
+    trigger_rule='none_failed',  # Still report when there were no batches to map
     dag=dag,
 )
 
 # Task Dependencies (Clean workflow)
-scan_task >> validate_task >> batch_task >> process_task >> report_task 
\ No newline at end of file
+scan_task >> validate_task >> batch_task >> prepare_load_task >> process_task >> finalize_load_task >> rollup_task >> cache_sync_task >> report_task
+# Finalize also runs after a failed batch; the rollups and report still wait on the batches themselves
+process_task >> rollup_task
+
+# Manually triggered full reload of one year, swapped in as a partition (or rolled back)
+reload_dag = DAG(
+    'reload_egrid_year_partition',
+    default_args={**default_args, 'retries': 0},
+    description='Rebuild one year of egrid_data off to the side and swap its partition in atomically',
+    schedule_interval=None,
+    catchup=False,
+    max_active_runs=1,
+    params={
+        'year': Param(datetime.now().year - 1, type='integer', minimum=1990, maximum=2030),
+        # Reattach the year's previous generation instead of reloading it
+        'rollback': Param(False, type='boolean'),
+    },
+    tags=['etl', 'plant-analytics', 'clean-architecture', 'maintenance'],
+)
+
+reload_task = PythonOperator(
+    task_id='reload_year_partition',
+    python_callable=reload_year_partition_task,
+    dag=reload_dag,
+)
+
+reload_rollup_task = PythonOperator(
+    task_id='refresh_rollups',
+    python_callable=refresh_rollups_task,
+    op_kwargs={'source_task': 'reload_year_partition'},
+    dag=reload_dag,
+)
+
+reload_cache_sync_task = PythonOperator(
+    task_id='sync_api_cache',
+    python_callable=sync_api_cache_task,
+    op_kwargs={'source_task': 'reload_year_partition'},
+    dag=reload_dag,
+)
+
+reload_task >> reload_rollup_task >> reload_cache_sync_task
+
+# Manually triggered reload of egrid_data from the Parquet snapshot (ETL_SNAPSHOT_ENABLED), without reparsing CSVs
+restore_dag = DAG(
+    'restore_egrid_from_snapshot',
+    default_args={**default_args, 'retries': 0},
+    description='Reload egrid_data from the Parquet snapshot, optionally limited to some years and states',
+    schedule_interval=None,
+    catchup=False,
+    max_active_runs=1,
+    params={
+        # Empty restores every year / state in the snapshot manifest
+        'years': Param([], type='array', items={'type': 'integer', 'minimum': 1990, 'maximum': 2030}),
+        'states': Param([], type='array', items={'type': 'string', 'minLength': 2, 'maxLength': 2}),
+    },
+    tags=['etl', 'plant-analytics', 'clean-architecture', 'maintenance'],
+)
+
+restore_task = PythonOperator(
+    task_id='restore_from_snapshot',
+    python_callable=restore_from_snapshot_task,
+    dag=restore_dag,
+)
+
+restore_rollup_task = PythonOperator(
+    task_id='refresh_rollups',
+    python_callable=refresh_rollups_task,
+    op_kwargs={'source_task': 'restore_from_snapshot'},
+    dag=restore_dag,
+)
+
+restore_cache_sync_task = PythonOperator(
+    task_id='sync_api_cache',
+    python_callable=sync_api_cache_task,
+    op_kwargs={'source_task': 'restore_from_snapshot'},
+    dag=restore_dag,
+)
+
+restore_task >> restore_rollup_task >> restore_cache_sync_task
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# DAG code imports domain, application and infrastructure as top-level packages, as Airflow loads it
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'dags'))
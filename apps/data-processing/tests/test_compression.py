@@ -0,0 +1,74 @@
+import bz2
+import gzip
+import io
+
+import pytest
+
+from domain.models.e_grid_data import CSVCompression
+from infrastructure.compression import DecompressingReader, decompress_prefix
+
+CSV = b''.join(b'gen-%d,2023,TX,Plant %d,%d.5\n' % (i, i, i) for i in range(5000))
+HALF = CSV.index(b'\n', len(CSV) // 2) + 1
+
+
+def compress(codec, data):
+    if codec == CSVCompression.GZIP:
+        return gzip.compress(data)
+    if codec == CSVCompression.BZ2:
+        return bz2.compress(data)
+    zstandard = pytest.importorskip('zstandard')
+    return zstandard.ZstdCompressor().compress(data)
+
+
+@pytest.fixture(params=[CSVCompression.GZIP, CSVCompression.BZ2, CSVCompression.ZSTD])
+def codec(request):
+    return request.param
+
+
+def test_reads_the_whole_stream_in_small_pieces(codec):
+    data = compress(codec, CSV)
+    reader = DecompressingReader(io.BytesIO(data), codec, read_size=1000)
+
+    assert reader.read() == CSV
+    assert reader.bytes_in == len(data)
+
+
+def test_concatenated_members_are_read_one_after_the_other(codec):
+    data = compress(codec, CSV[:HALF]) + compress(codec, CSV[HALF:])
+
+    assert DecompressingReader(io.BytesIO(data), codec, read_size=777).read() == CSV
+
+
+def test_lines_read_through_a_buffered_reader_match_the_source(codec):
+    reader = io.BufferedReader(DecompressingReader(io.BytesIO(compress(codec, CSV)), codec), buffer_size=4096)
+
+    assert list(reader) == CSV.splitlines(keepends=True)
+
+
+def test_a_stream_cut_short_raises(codec):
+    data = compress(codec, CSV)
+
+    with pytest.raises(EOFError):
+        DecompressingReader(io.BytesIO(data[:len(data) // 2]), codec).read()
+
+
+def test_prefix_of_a_compressed_object_decompresses_to_a_prefix_of_the_csv(codec):
+    # bz2 and zstd only yield whole blocks, so the prefix must hold at least one (bz2: up to 900 kB of input)
+    large = CSV * 10
+    data = compress(codec, large)
+    prefix = decompress_prefix(codec, data[:-100])
+
+    assert prefix
+    assert large.startswith(prefix)
+
+
+def test_close_closes_the_source():
+    source = io.BytesIO(gzip.compress(CSV))
+    DecompressingReader(source, CSVCompression.GZIP).close()
+
+    assert source.closed
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError):
+        DecompressingReader(io.BytesIO(b''), 'lz4')
@@ -0,0 +1,69 @@
+import pytest
+
+from infrastructure.db_client import DatabaseClient
+
+
+class RowError(Exception):
+    pass
+
+
+class WrappedRowError(Exception):
+    """Stands in for SQLAlchemy errors, which carry the driver error as orig"""
+    def __init__(self, orig):
+        super().__init__('wrapped')
+        self.orig = orig
+
+
+def attempts_failing_on(bad_rows, error=lambda row: RowError(f"row {row} violates a constraint\nDETAIL: ...")):
+    """attempt(start, stop) that merges a range unless it holds a bad row, recording every call"""
+    calls = []
+
+    def attempt(start, stop):
+        calls.append((start, stop))
+        bad = [row for row in bad_rows if start <= row < stop]
+        if bad:
+            raise error(bad[0])
+        return stop - start, 0
+
+    return attempt, calls
+
+
+def test_a_clean_batch_is_merged_in_one_attempt():
+    attempt, calls = attempts_failing_on([])
+
+    assert DatabaseClient._bisect(attempt, 10, (RowError,)) == (10, 0, [])
+    assert calls == [(0, 10)]
+
+
+def test_only_the_offending_rows_are_rejected():
+    attempt, calls = attempts_failing_on([3, 6])
+    inserted, updated, failures = DatabaseClient._bisect(attempt, 8, (RowError,))
+
+    assert (inserted, updated) == (6, 0)
+    assert failures == [(3, 'row 3 violates a constraint'), (6, 'row 6 violates a constraint')]
+    merged = [call for call in calls if not any(call[0] <= row < call[1] for row in (3, 6))]
+    # Ranges are merged in their original row order
+    assert merged == sorted(merged)
+    assert sum(stop - start for start, stop in merged) == 6
+
+
+def test_every_row_failing_is_reported_row_by_row():
+    attempt, _ = attempts_failing_on(range(4))
+    inserted, _, failures = DatabaseClient._bisect(attempt, 4, (RowError,))
+
+    assert inserted == 0
+    assert [position for position, _ in failures] == [0, 1, 2, 3]
+
+
+def test_the_driver_error_message_is_reported_when_wrapped():
+    attempt, _ = attempts_failing_on([0], error=lambda row: WrappedRowError(RowError('duplicate key')))
+
+    assert DatabaseClient._bisect(attempt, 1, (WrappedRowError,))[2] == [(0, 'duplicate key')]
+
+
+def test_errors_that_are_not_about_rows_propagate():
+    def attempt(start, stop):
+        raise ConnectionError('server closed the connection')
+
+    with pytest.raises(ConnectionError):
+        DatabaseClient._bisect(attempt, 4, (RowError,))
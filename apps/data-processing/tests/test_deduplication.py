@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from application.deduplication import ChunkDeduplicator
+from domain.models.e_grid_data import DuplicatePolicy
+from infrastructure.key_store import SpillingKeyStore
+
+
+def chunk(*rows):
+    """Rows of (gen_id, net_generation), all in the same plant, state and year"""
+    return pd.DataFrame({
+        'gen_id': [gen_id for gen_id, _ in rows],
+        'year': 2023,
+        'state': 'TX',
+        'plant_name': 'Plant',
+        'net_generation': [float(value) for _, value in rows],
+    })
+
+
+def load(deduplicator, df):
+    outcome = deduplicator.apply(df)
+    deduplicator.commit(outcome)
+    return outcome
+
+
+def test_keep_first_drops_repeats_within_and_across_chunks():
+    deduplicator = ChunkDeduplicator(DuplicatePolicy.KEEP_FIRST)
+    first = load(deduplicator, chunk(('a', 1), ('b', 2), ('a', 3)))
+    second = load(deduplicator, chunk(('b', 4), ('c', 5)))
+
+    assert first.records[['gen_id', 'net_generation']].values.tolist() == [['a', 1.0], ['b', 2.0]]
+    assert first.duplicates == 1
+    assert second.records['gen_id'].tolist() == ['c']
+    assert second.duplicates == 1
+    assert second.corrections == 0
+
+
+def test_keep_last_resends_a_key_loaded_earlier_as_a_correction():
+    deduplicator = ChunkDeduplicator(DuplicatePolicy.KEEP_LAST)
+    first = load(deduplicator, chunk(('a', 1), ('b', 2), ('a', 3)))
+    second = load(deduplicator, chunk(('b', 4), ('c', 5)))
+
+    assert first.records[['gen_id', 'net_generation']].values.tolist() == [['b', 2.0], ['a', 3.0]]
+    assert second.records[['gen_id', 'net_generation']].values.tolist() == [['b', 4.0], ['c', 5.0]]
+    assert second.corrections == 1
+    assert second.seen.tolist() == [True, False]
+
+
+def test_sum_adds_up_repeats_within_and_across_chunks():
+    deduplicator = ChunkDeduplicator(DuplicatePolicy.SUM)
+    first = load(deduplicator, chunk(('a', 1), ('b', 2), ('a', 3)))
+    second = load(deduplicator, chunk(('a', 10), ('c', 5)))
+
+    assert first.records[['gen_id', 'net_generation']].values.tolist() == [['a', 4.0], ['b', 2.0]]
+    assert second.records[['gen_id', 'net_generation']].values.tolist() == [['a', 14.0], ['c', 5.0]]
+    assert second.corrections == 1
+
+
+def test_keys_of_an_uncommitted_chunk_stay_unseen():
+    deduplicator = ChunkDeduplicator(DuplicatePolicy.KEEP_FIRST)
+    deduplicator.apply(chunk(('a', 1)))  # Chunk failed to load, never committed
+
+    assert deduplicator.apply(chunk(('a', 2))).records['gen_id'].tolist() == ['a']
+
+
+def test_rows_rejected_by_the_database_are_not_committed():
+    deduplicator = ChunkDeduplicator(DuplicatePolicy.KEEP_FIRST)
+    outcome = deduplicator.apply(chunk(('a', 1), ('b', 2)))
+    deduplicator.commit(outcome, failed_positions=[1])
+
+    assert deduplicator.apply(chunk(('a', 3), ('b', 4))).records['gen_id'].tolist() == ['b']
+
+
+def test_keys_survive_a_spill_to_disk(tmp_path):
+    store = SpillingKeyStore(max_memory_keys=2, spill_dir=str(tmp_path))
+    deduplicator = ChunkDeduplicator(DuplicatePolicy.SUM, key_store=store)
+    load(deduplicator, chunk(('a', 1), ('b', 2)))
+    load(deduplicator, chunk(('c', 3), ('d', 4)))
+    outcome = load(deduplicator, chunk(('a', 10), ('d', 10)))
+
+    assert store.spilled
+    assert outcome.records['net_generation'].tolist() == [11.0, 14.0]
+    deduplicator.reset()
+    assert len(store) == 0
+
+
+class SharedKeyStore(SpillingKeyStore):
+    """Stands in for the run-wide store: close() releases the store but keeps its keys"""
+
+    def __init__(self):
+        super().__init__(max_memory_keys=1000)
+        self.holds = 0
+
+    def hold(self):
+        self.holds += 1
+        return super().hold()
+
+    def close(self):
+        pass
+
+
+def test_sum_continues_across_batches_sharing_a_run_store():
+    store = SharedKeyStore()
+    first_batch = ChunkDeduplicator(DuplicatePolicy.SUM, store)
+    load(first_batch, chunk(('a', 1)))
+    first_batch.reset()
+
+    second_batch = ChunkDeduplicator(DuplicatePolicy.SUM, store)
+    with second_batch.hold():
+        outcome = load(second_batch, chunk(('a', 2)))
+
+    assert outcome.records['net_generation'].tolist() == [3.0]
+    assert outcome.corrections == 1
+    assert store.holds == 1
+
+
+def test_keep_last_does_not_lock_the_shared_store():
+    store = SharedKeyStore()
+    with ChunkDeduplicator(DuplicatePolicy.KEEP_LAST, store).hold():
+        pass
+
+    assert store.holds == 0
+
+
+def test_key_hashes_ignore_dtype_differences_between_transform_modes():
+    deduplicator = ChunkDeduplicator()
+    as_int = chunk(('a', 1))
+    as_text = as_int.assign(year='2023')
+
+    assert np.array_equal(deduplicator.hash_keys(as_int), deduplicator.hash_keys(as_text))
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        ChunkDeduplicator('keep_any')
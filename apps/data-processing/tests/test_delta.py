@@ -0,0 +1,188 @@
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from application.deduplication import ChunkDeduplicator
+from application.delta import RowDeltaPlanner
+from domain.models.e_grid_data import FileInfo
+from infrastructure.manifest_repository import FileManifestRepository
+
+FILE = FileInfo(key='raw/egrid.csv', size=1, last_modified=datetime(2025, 1, 1), bucket='egrid-data', etag='v2')
+hash_keys = ChunkDeduplicator().hash_keys
+
+
+def rows(*values):
+    """Output rows of (gen_id, net_generation) in one plant, state and year"""
+    return pd.DataFrame({
+        'gen_id': [gen_id for gen_id, _ in values],
+        'year': 2023,
+        'state': 'TX',
+        'plant_name': 'Plant',
+        'net_generation': [float(value) for _, value in values],
+    })
+
+
+def stored(*values):
+    df = rows(*values)
+    return df.assign(key_hash=hash_keys(df), row_hash=RowDeltaPlanner.hash_rows(df))
+
+
+class FakeWriter:
+    def __init__(self):
+        self.written = []
+        self.committed = False
+        self.aborted = False
+
+    def write(self, df):
+        self.written.append(df)
+
+    def commit(self):
+        self.committed = True
+
+    def abort(self):
+        self.aborted = True
+
+
+class FakeStore:
+    def __init__(self, version=None):
+        self.version = version
+        self.writer = None
+
+    def load(self, file_info):
+        return self.version
+
+    def open_writer(self, file_info):
+        self.writer = FakeWriter()
+        return self.writer
+
+
+class FakeDatabase:
+    def __init__(self, stored_values=None):
+        self.deleted = None
+        # net_generation per gen_id as the table holds it, for stored_matches
+        self.stored_values = stored_values or {}
+
+    def stored_matches(self, df, table_name, key_columns):
+        return np.array([
+            self.stored_values.get(gen_id) == value
+            for gen_id, value in zip(df['gen_id'], df['net_generation'])
+        ])
+
+    def delete_matching_records(self, df, table_name, key_columns):
+        self.deleted = df
+        return len(df)
+
+
+def load_through(planner, df):
+    """Run one chunk through the planner like the loaders do, with no duplicates"""
+    deduplicator = ChunkDeduplicator()
+    chunk = planner.filter(df, deduplicator.apply(df))
+    planner.commit(chunk)
+    return chunk
+
+
+def entry(status, etag='v1'):
+    return {'status': status, 'etag': etag}
+
+
+def test_without_a_store_every_row_passes_through():
+    planner = RowDeltaPlanner(None, FILE)
+    chunk = load_through(planner, rows(('a', 1), ('b', 2)))
+
+    assert len(chunk.records) == 2
+    assert planner.finish(FakeDatabase(), 'egrid_data') == set()
+
+
+def test_delta_load_sends_only_inserts_and_updates_and_deletes_removed_keys():
+    store = FakeStore(('v1', stored(('a', 1), ('b', 2), ('c', 3))))
+    planner = RowDeltaPlanner(store, FILE, entry(FileManifestRepository.STATUS_LOADED), hash_keys=hash_keys)
+    chunk = load_through(planner, rows(('a', 1), ('b', 20), ('d', 4)))
+    database = FakeDatabase()
+    partitions = planner.finish(database, 'egrid_data')
+
+    assert chunk.records['gen_id'].tolist() == ['b', 'd']
+    assert (chunk.inserted, chunk.updated, chunk.unchanged) == (1, 1, 1)
+    assert database.deleted['gen_id'].tolist() == ['c']
+    assert 'key_hash' not in database.deleted.columns
+    assert partitions == {('TX', 2023)}
+    assert planner.stats.files_delta == 1
+    assert store.writer.committed
+    assert sum(len(df) for df in store.writer.written) == 3
+
+
+def test_unchanged_rows_another_source_rewrote_are_sent_again():
+    store = FakeStore(('v1', stored(('a', 1), ('b', 2))))
+    # A year reload or another file left 'b' at 5 since this file's previous version loaded
+    database = FakeDatabase({'a': 1.0, 'b': 5.0})
+    planner = RowDeltaPlanner(
+        store, FILE, entry(FileManifestRepository.STATUS_LOADED), hash_keys=hash_keys, db_client=database
+    )
+    chunk = load_through(planner, rows(('a', 1), ('b', 2)))
+
+    assert chunk.records['gen_id'].tolist() == ['b']
+    assert (chunk.inserted, chunk.updated, chunk.unchanged) == (0, 1, 1)
+
+
+def test_untrusted_version_loads_in_full_but_still_deletes_removed_keys():
+    # A failed load kept the stored version; the next run must still apply its deletes
+    store = FakeStore(('v1', stored(('a', 1), ('b', 2), ('c', 3))))
+    planner = RowDeltaPlanner(store, FILE, entry(FileManifestRepository.STATUS_FAILED, etag='v2'), hash_keys=hash_keys)
+    chunk = load_through(planner, rows(('a', 1), ('b', 2)))
+    database = FakeDatabase()
+    planner.finish(database, 'egrid_data')
+
+    assert len(chunk.records) == 2
+    assert planner.stats.files_full == 1
+    assert database.deleted['gen_id'].tolist() == ['c']
+
+
+def test_first_version_of_a_file_is_stored_without_deletes():
+    store = FakeStore()
+    planner = RowDeltaPlanner(store, FILE, None, hash_keys=hash_keys)
+    load_through(planner, rows(('a', 1)))
+    database = FakeDatabase()
+
+    assert planner.finish(database, 'egrid_data') == set()
+    assert database.deleted is None
+    assert store.writer.committed
+
+
+def test_rows_rejected_by_the_database_are_not_stored():
+    store = FakeStore()
+    planner = RowDeltaPlanner(store, FILE, None, hash_keys=hash_keys)
+    df = rows(('a', 1), ('b', 2), ('c', 3))
+    deduplicator = ChunkDeduplicator()
+    chunk = planner.filter(df, deduplicator.apply(df))
+    planner.commit(chunk, failed_positions=[1])
+
+    assert store.writer.written[0]['gen_id'].tolist() == ['a', 'c']
+
+
+def test_keys_loaded_earlier_in_the_batch_are_always_sent():
+    store = FakeStore(('v1', stored(('a', 1))))
+    planner = RowDeltaPlanner(store, FILE, entry(FileManifestRepository.STATUS_LOADED), hash_keys=hash_keys)
+    df = rows(('a', 1))
+    deduplicator = ChunkDeduplicator()
+    deduplicator.commit(deduplicator.apply(df))  # Same key loaded from another file of the batch
+    chunk = planner.filter(df, deduplicator.apply(df))
+
+    assert chunk.records['gen_id'].tolist() == ['a']
+    assert chunk.unchanged == 0
+
+
+def test_abort_keeps_the_stored_version():
+    store = FakeStore(('v1', stored(('a', 1))))
+    planner = RowDeltaPlanner(store, FILE, entry(FileManifestRepository.STATUS_LOADED), hash_keys=hash_keys)
+    load_through(planner, rows(('b', 2)))
+    planner.abort()
+
+    assert store.writer.aborted
+    assert not store.writer.committed
+
+
+def test_row_hashes_ignore_differences_below_the_stored_precision():
+    assert np.array_equal(
+        RowDeltaPlanner.hash_rows(rows(('a', 1.001))),
+        RowDeltaPlanner.hash_rows(rows(('a', 1.0)))
+    )
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+
+from infrastructure.key_store import InMemoryKeyStore, SQLiteKeyStore, SpillingKeyStore
+
+
+def random_hashes(count, seed=0):
+    return np.random.default_rng(seed).integers(0, np.iinfo(np.uint64).max, size=count, dtype=np.uint64, endpoint=True)
+
+
+def test_in_memory_store_grows_past_its_initial_capacity():
+    store = InMemoryKeyStore(initial_capacity=16)
+    hashes = random_hashes(5000)
+    store.upsert(hashes, np.arange(5000, dtype=np.float64))
+
+    found, values = store.lookup(hashes)
+    assert len(store) == 5000
+    assert found.all()
+    assert np.array_equal(values, np.arange(5000))
+
+
+def test_in_memory_store_overwrites_existing_keys():
+    store = InMemoryKeyStore()
+    store.upsert(np.array([1, 2], dtype=np.uint64), np.array([1.0, 2.0]))
+    store.upsert(np.array([2, 3], dtype=np.uint64), np.array([20.0, 3.0]))
+
+    found, values = store.lookup(np.array([1, 2, 3, 4], dtype=np.uint64))
+    assert len(store) == 3
+    assert found.tolist() == [True, True, True, False]
+    assert values.tolist() == [1.0, 20.0, 3.0, 0.0]
+
+
+def test_in_memory_store_accepts_a_zero_hash():
+    store = InMemoryKeyStore()
+    store.upsert(np.array([0], dtype=np.uint64), np.array([7.0]))
+
+    found, values = store.lookup(np.array([0], dtype=np.uint64))
+    assert found.tolist() == [True]
+    assert values.tolist() == [7.0]
+
+
+def test_sqlite_store_round_trips_unsigned_hashes(tmp_path):
+    store = SQLiteKeyStore(str(tmp_path))
+    hashes = np.array([7, 2 ** 63 - 1, 2 ** 63, 2 ** 64 - 1], dtype=np.uint64)
+    store.upsert(hashes, np.array([1.0, 2.0, 3.0, 4.0]))
+    store.upsert(hashes[2:], np.array([30.0, 40.0]))
+
+    found, values = store.lookup(np.append(hashes, np.uint64(5)))
+    assert len(store) == 4
+    assert found.tolist() == [True, True, True, True, False]
+    assert values.tolist() == [1.0, 2.0, 30.0, 40.0, 0.0]
+    store.close()
+
+
+def test_sqlite_store_looks_up_more_keys_than_one_query_binds(tmp_path):
+    store = SQLiteKeyStore(str(tmp_path))
+    hashes = random_hashes(SQLiteKeyStore.QUERY_BATCH_SIZE * 3 + 7)
+    store.upsert(hashes, np.ones(len(hashes)))
+
+    found, _ = store.lookup(np.concatenate([hashes, random_hashes(10, seed=1)]))
+    assert found[:len(hashes)].all()
+    assert not found[len(hashes):].any()
+    store.close()
+
+
+def test_spilling_store_moves_to_sqlite_and_keeps_every_key(tmp_path):
+    store = SpillingKeyStore(max_memory_keys=100, spill_dir=str(tmp_path))
+    first, second = random_hashes(80), random_hashes(80, seed=1)
+    store.upsert(first, np.full(80, 1.0))
+    assert not store.spilled
+
+    store.upsert(second, np.full(80, 2.0))
+    assert store.spilled
+    assert len(store) == 160
+    found, values = store.lookup(np.concatenate([first, second]))
+    assert found.all()
+    assert values.tolist() == [1.0] * 80 + [2.0] * 80
+
+
+def test_spilling_store_close_removes_the_spill_file_and_forgets_keys(tmp_path):
+    store = SpillingKeyStore(max_memory_keys=1, spill_dir=str(tmp_path))
+    store.upsert(np.array([1, 2, 3], dtype=np.uint64), np.ones(3))
+    assert store.spilled
+    assert os.listdir(tmp_path)
+
+    store.close()
+    assert not store.spilled
+    assert len(store) == 0
+    assert not os.listdir(tmp_path)
+    assert not store.lookup(np.array([1], dtype=np.uint64))[0].any()
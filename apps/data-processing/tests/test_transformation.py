@@ -0,0 +1,30 @@
+import pandas as pd
+import pytest
+
+from application.csv_processor import DataTransformationService
+
+service = DataTransformationService()
+
+
+def source_frame(**overrides):
+    """One valid source row keyed by the spec's source column names, minus any column set to None"""
+    values = {'gen_id': 'G1', 'year': '2023', 'state': 'TX', 'plant_name': 'Plant', 'net_generation': '5'}
+    values.update(overrides)
+    return pd.DataFrame({
+        service.spec.source_column(column): [value] for column, value in values.items() if value is not None
+    })
+
+
+@pytest.mark.parametrize('mode', ['row', 'vectorized'])
+def test_both_transform_modes_accept_a_valid_row(mode):
+    accepted, _ = service.transform(source_frame(), mode)
+
+    assert accepted[['gen_id', 'year', 'state']].values.tolist() == [['G1', 2023, 'TX']]
+
+
+@pytest.mark.parametrize('mode', ['row', 'vectorized'])
+def test_both_transform_modes_reject_a_row_without_a_year(mode):
+    accepted, rejected = service.transform(source_frame(year=None), mode)
+
+    assert accepted.empty
+    assert sum(rejected.values()) == 1
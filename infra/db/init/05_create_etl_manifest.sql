@@ -0,0 +1,31 @@
+-- Table: etl_file_manifest (one row per ingested object, used to skip unchanged files)
+
+CREATE TABLE IF NOT EXISTS etl_file_manifest (
+    bucket VARCHAR(255) NOT NULL,
+    object_key VARCHAR(1024) NOT NULL,
+    etag VARCHAR(255),
+    size_bytes BIGINT NOT NULL,
+    last_modified TIMESTAMP WITH TIME ZONE,
+    status VARCHAR(20) NOT NULL,
+    rows_loaded BIGINT NOT NULL DEFAULT 0,
+    rows_inserted BIGINT NOT NULL DEFAULT 0,
+    rows_updated BIGINT NOT NULL DEFAULT 0,
+    rows_skipped BIGINT NOT NULL DEFAULT 0,
+    rows_rejected BIGINT NOT NULL DEFAULT 0,
+    shards_total INTEGER NOT NULL DEFAULT 1,
+    shards_done INTEGER NOT NULL DEFAULT 0,
+    -- Indexes of the shards loaded and of those whose last attempt failed
+    loaded_shards INTEGER[] NOT NULL DEFAULT '{}',
+    failed_shards INTEGER[] NOT NULL DEFAULT '{}',
+    started_at TIMESTAMP WITHOUT TIME ZONE,
+    finished_at TIMESTAMP WITHOUT TIME ZONE,
+    duration_ms BIGINT,
+    error_message TEXT,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    -- Constraints
+    CONSTRAINT pk_etl_file_manifest PRIMARY KEY (bucket, object_key),
+    CONSTRAINT chk_manifest_status CHECK (status IN ('processing', 'loaded', 'failed'))
+);
+
+CREATE INDEX IF NOT EXISTS idx_etl_file_manifest_status ON etl_file_manifest(status);
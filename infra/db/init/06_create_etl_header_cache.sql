@@ -0,0 +1,7 @@
+-- Table: etl_header_cache (parsed CSV header per object ETag, lets validation skip MinIO reads)
+
+CREATE TABLE IF NOT EXISTS etl_header_cache (
+    etag VARCHAR(255) PRIMARY KEY,
+    columns JSONB NOT NULL,
+    cached_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,57 @@
+-- Rollups of egrid_data read by the backend API, refreshed per (state, year) after each load.
+-- In egrid_top_plants, scope_state '*' means all states and scope_year 0 means all years.
+
+CREATE TABLE IF NOT EXISTS egrid_top_plants (
+    scope_state CHARACTER VARYING NOT NULL,
+    scope_year INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    egrid_id INTEGER NOT NULL,
+    gen_id CHARACTER VARYING NOT NULL,
+    year INTEGER NOT NULL,
+    state CHARACTER VARYING NOT NULL,
+    plant_name CHARACTER VARYING NOT NULL,
+    net_generation NUMERIC(20,2) NOT NULL,
+
+    -- Constraints
+    CONSTRAINT pk_egrid_top_plants PRIMARY KEY (scope_state, scope_year, rank)
+);
+
+CREATE TABLE IF NOT EXISTS egrid_state_year_totals (
+    state CHARACTER VARYING NOT NULL,
+    year INTEGER NOT NULL,
+    generator_count BIGINT NOT NULL,
+    total_net_generation NUMERIC(24,2) NOT NULL,
+    max_net_generation NUMERIC(20,2) NOT NULL,
+
+    -- Constraints
+    CONSTRAINT pk_egrid_state_year_totals PRIMARY KEY (state, year)
+);
+
+-- Also the distinct state list: a state has a row only while it has data
+CREATE TABLE IF NOT EXISTS egrid_state_totals (
+    state CHARACTER VARYING PRIMARY KEY,
+    year_count INTEGER NOT NULL,
+    generator_count BIGINT NOT NULL,
+    total_net_generation NUMERIC(24,2) NOT NULL
+);
+
+-- Also the distinct year list: a year has a row only while it has data
+CREATE TABLE IF NOT EXISTS egrid_year_totals (
+    year INTEGER PRIMARY KEY,
+    state_count INTEGER NOT NULL,
+    generator_count BIGINT NOT NULL,
+    total_net_generation NUMERIC(24,2) NOT NULL
+);
+
+-- Single row; the API falls back to egrid_data until it exists or when a limit exceeds top_k
+CREATE TABLE IF NOT EXISTS egrid_rollup_status (
+    id INTEGER PRIMARY KEY DEFAULT 1,
+    top_k INTEGER NOT NULL,
+    refreshed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    -- Constraints
+    CONSTRAINT chk_egrid_rollup_status_single_row CHECK (id = 1)
+);
+
+-- Partition-local scans for the refresh
+CREATE INDEX IF NOT EXISTS idx_egrid_data_state_year ON egrid_data(state, year, net_generation DESC);
@@ -0,0 +1,20 @@
+-- Table: etl_chunk_checkpoint (load position per object/shard, committed with each chunk so retries resume)
+
+CREATE TABLE IF NOT EXISTS etl_chunk_checkpoint (
+    bucket VARCHAR(255) NOT NULL,
+    object_key VARCHAR(1024) NOT NULL,
+    shard_index INTEGER NOT NULL DEFAULT 0,
+    etag VARCHAR(255),
+    rows_done BIGINT NOT NULL DEFAULT 0,
+    byte_offset BIGINT,
+    chunks_done INTEGER NOT NULL DEFAULT 0,
+    digest VARCHAR(64) NOT NULL DEFAULT '',
+    rows_inserted BIGINT NOT NULL DEFAULT 0,
+    rows_updated BIGINT NOT NULL DEFAULT 0,
+    rows_skipped BIGINT NOT NULL DEFAULT 0,
+    rows_failed BIGINT NOT NULL DEFAULT 0,
+    rows_rejected BIGINT NOT NULL DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    CONSTRAINT pk_etl_chunk_checkpoint PRIMARY KEY (bucket, object_key, shard_index)
+);
@@ -0,0 +1,43 @@
+-- Partition egrid_data by year: one partition per year allowed by chk_year (1990-2030).
+-- Full reloads of a year are built in a standalone table and swapped in by the ETL
+-- (see YearPartitionManager). Does nothing if egrid_data is already partitioned; on an
+-- existing database run it once in a maintenance window, since it copies every row.
+
+DO $$
+DECLARE
+    partition_year INTEGER;
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = 'egrid_data'::regclass) THEN
+        RETURN;
+    END IF;
+
+    ALTER TABLE egrid_data RENAME TO egrid_data_heap;
+    ALTER TABLE egrid_data_heap RENAME CONSTRAINT egrid_data_pkey TO egrid_data_heap_pkey;
+    ALTER TABLE egrid_data_heap RENAME CONSTRAINT uk_egrid_data_unique TO uk_egrid_data_heap_unique;
+    DROP INDEX IF EXISTS idx_egrid_data_state, idx_egrid_data_year, idx_egrid_data_net_generation, idx_egrid_data_state_year;
+
+    -- Unique constraints must include the partition key, so the primary key becomes (id, year)
+    CREATE TABLE egrid_data (
+        LIKE egrid_data_heap INCLUDING DEFAULTS INCLUDING CONSTRAINTS,
+        CONSTRAINT egrid_data_pkey PRIMARY KEY (id, year),
+        CONSTRAINT uk_egrid_data_unique UNIQUE (gen_id, year, state, plant_name)
+    ) PARTITION BY RANGE (year);
+
+    FOR partition_year IN 1990..2030 LOOP
+        EXECUTE format(
+            'CREATE TABLE egrid_data_y%s PARTITION OF egrid_data FOR VALUES FROM (%s) TO (%s)',
+            partition_year, partition_year, partition_year + 1
+        );
+    END LOOP;
+
+    INSERT INTO egrid_data SELECT * FROM egrid_data_heap;
+    ALTER SEQUENCE egrid_data_id_seq OWNED BY egrid_data.id;
+    DROP TABLE egrid_data_heap;
+
+    -- Built after the copy; each is created on every partition
+    CREATE INDEX idx_egrid_data_state ON egrid_data(state);
+    CREATE INDEX idx_egrid_data_year ON egrid_data(year);
+    CREATE INDEX idx_egrid_data_net_generation ON egrid_data(net_generation DESC);
+    -- Rollup refresh and API fallback (07_create_egrid_rollups.sql)
+    CREATE INDEX idx_egrid_data_state_year ON egrid_data(state, year, net_generation DESC);
+END $$;
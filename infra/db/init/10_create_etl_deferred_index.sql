@@ -0,0 +1,9 @@
+-- Table: etl_deferred_index (secondary indexes dropped for a large bulk load, pending rebuild)
+
+CREATE TABLE IF NOT EXISTS etl_deferred_index (
+    index_name VARCHAR(63) PRIMARY KEY,
+    table_name VARCHAR(63) NOT NULL,
+    definition TEXT NOT NULL,
+    concurrently BOOLEAN NOT NULL DEFAULT FALSE,
+    deferred_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,11 @@
+-- Table: etl_run_key (unique key hashes loaded by a DAG run, shared by its mapped batches for run-wide dedup)
+
+CREATE TABLE IF NOT EXISTS etl_run_key (
+    run_id VARCHAR(250) NOT NULL,
+    key_hash BIGINT NOT NULL,
+    value DOUBLE PRECISION NOT NULL,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    -- Constraints
+    CONSTRAINT pk_etl_run_key PRIMARY KEY (run_id, key_hash)
+);